@@ -8,8 +8,11 @@ import os
 import subprocess
 import sys
 import threading
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Iterator
 
 # Detect Windows OEM codepage as default for subprocess output decoding
 if sys.platform == "win32":
@@ -21,13 +24,26 @@ else:
 import boto3
 from botocore.exceptions import ClientError, NoCredentialsError, ProfileNotFound
 
+from .aws_clients import clients
 from .aws_config import AWSCfg
-from .constants import COMMON_SVCS, PROFILE_NAME_RE, REGIONS, SVC, make_default_svc
+from .compact_graph import CompactGraph
+from .constants import (
+    COMMON_SVCS, LAYOUT_CACHE_DIR, PROFILE_NAME_RE, REGIONS, SVC, make_default_svc,
+)
 from .event_bus import events
+from .graph_codec import encode_graph
+from .inventory import InventoryDiscovery, services_for_types
 from .diagram_generator import AlgorithmicLayoutEngine, DrawioXmlGenerator, ReactFlowConverter
 from .diagram_llm import llm_enhance_layout
-from .infra_discovery import InfraDiscoveryService
+from .diagram_viewport import LOD_NODE_THRESHOLD, VIEWPORT_CACHE_ENTRIES, DiagramViewport
+from .layout_cache import INCREMENTAL_MAX_CHANGE, LayoutCache, graph_key
+from .infra_discovery import DEFAULT_SCAN_WORKERS, InfraDiscoveryService, scanner_names
 from .llm_service import build_system_prompt, create_provider
+from .scan_control import DEFAULT_SCAN_TIMEOUT, ScanControl
+from .scan_metrics import merge_metrics, summarize
+from .scan_orchestrator import FleetScanner, MultiRegionScanner
+from .scan_scheduler import DEFAULT_SCHEDULE_INTERVAL, MIN_SCHEDULE_INTERVAL, ScanScheduler
+from .scan_store import DEFAULT_SNAPSHOT_TTL, SnapshotPolicy, SnapshotStore
 from .state_manager import StateManager
 
 
@@ -38,6 +54,23 @@ class ApiService:
         self._active = self.mgr.active()
         self._creds: dict = {}
         self._init_creds()
+        # Last scanned graph per profile, so diagrams reopen without rescanning
+        self._infra_graphs: dict = {}
+        self._scan_profiles: dict[str, str] = {}  # scan_id -> profile, for stored graphs only
+        self._scan_payloads: dict[str, bytes] = {}  # scan_id -> encoded wire payload
+        # Running scans: scan_id -> control, and each profile's latest infra_scan/rescan
+        self._running_scans: dict[str, ScanControl] = {}
+        self._profile_scans: dict[str, str] = {}
+        self._infra_lock = threading.Lock()
+        self.snapshots = SnapshotStore()
+        self._account_ids: dict[str, str] = {}
+        # Layouts by graph content; opt-in disk tier survives restarts
+        self.layout_cache = LayoutCache(
+            disk_dir=LAYOUT_CACHE_DIR if self.store.data.get("layout_cache_on_disk") else None)
+        # Level-of-detail indexes of the latest large diagrams, by view key
+        self._viewports: OrderedDict[str, DiagramViewport] = OrderedDict()
+        # Started and stopped by the FastAPI lifespan
+        self.scheduler = ScanScheduler(self._run_scheduled_scan, self._scan_schedules)
 
     def _get_encoding(self) -> str:
         return self.store.data.get("terminal_encoding", "") or _DEFAULT_ENCODING
@@ -96,6 +129,7 @@ class ApiService:
                 for k, v in SVC.items()
             },
             "has_llm_configured": self._has_llm_configured(),
+            "scan_cache_ttl": self._scan_cache_ttl(),
         }
 
     def get_logo(self) -> str | None:
@@ -149,6 +183,7 @@ class ApiService:
         self.mgr.profiles.pop(name, None)
         self.store.unset_profile_cat(name)
         self.mgr.save()
+        self.snapshots.invalidate(name)
         return {"ok": True}
 
     def activate(self, name: str) -> dict:
@@ -293,8 +328,7 @@ class ApiService:
             found = []
             src = "offline"
             try:
-                s = boto3.Session(profile_name=profile)
-                ce = s.client("ce", region_name="us-east-1")
+                ce = clients.client(profile, "ce", "us-east-1")
                 end = datetime.now().date()
                 start = end - timedelta(days=30)
                 r = ce.get_cost_and_usage(
@@ -316,8 +350,7 @@ class ApiService:
 
             if not found:
                 try:
-                    s = boto3.Session(profile_name=profile)
-                    s.client("sts").get_caller_identity()
+                    clients.client(profile, "sts").get_caller_identity()
                     for sn in COMMON_SVCS:
                         if sn in SVC:
                             found.append({"name": sn, "cost": None})
@@ -342,8 +375,7 @@ class ApiService:
     def _bg_identity(self, profile: str):
         def _go():
             try:
-                s = boto3.Session(profile_name=profile)
-                i = s.client("sts").get_caller_identity()
+                i = clients.client(profile, "sts").get_caller_identity()
                 events.send("identity", {"account": i.get("Account", ""), "arn": i.get("Arn", ""), "error": None})
             except Exception as e:
                 events.send("identity", {"account": "", "arn": "", "error": str(e)[:80]})
@@ -353,8 +385,7 @@ class ApiService:
     def get_cost(self, profile: str, year: int, month: int) -> dict:
         def _go():
             try:
-                s = boto3.Session(profile_name=profile)
-                ce = s.client("ce", region_name="us-east-1")
+                ce = clients.client(profile, "ce", "us-east-1")
                 start = f"{year:04d}-{month:02d}-01"
                 end = f"{year + 1:04d}-01-01" if month == 12 else f"{year:04d}-{month + 1:02d}-01"
                 r = ce.get_cost_and_usage(
@@ -387,8 +418,7 @@ class ApiService:
     def _bg_badge(self, profile: str):
         def _go():
             try:
-                s = boto3.Session(profile_name=profile)
-                ce = s.client("ce", region_name="us-east-1")
+                ce = clients.client(profile, "ce", "us-east-1")
                 end = datetime.now().date()
                 start = end - timedelta(days=30)
                 r = ce.get_cost_and_usage(
@@ -575,43 +605,410 @@ class ApiService:
 
     # --- Infrastructure Diagram ---
 
+    def _scan_cache_ttl(self) -> float:
+        return self.store.data.get("scan_cache_ttl", DEFAULT_SNAPSHOT_TTL)
+
+    def set_scan_cache_ttl(self, ttl: float) -> dict:
+        if ttl < 0:
+            return {"error": "TTL must be zero (disabled) or positive."}
+        self.store.data["scan_cache_ttl"] = ttl
+        self.store.save()
+        return {"ok": True, "ttl": ttl}
+
+    def set_layout_cache(self, on_disk: bool) -> dict:
+        self.store.data["layout_cache_on_disk"] = on_disk
+        self.store.save()
+        self.layout_cache.disk_dir = LAYOUT_CACHE_DIR if on_disk else None
+        return {"ok": True, **self.layout_cache.stats()}
+
+    def _account_id(self, profile: str, session, region: str) -> str:
+        """Resolve (and remember) the account behind a profile."""
+        if self._account_ids.get(profile):
+            return self._account_ids[profile]
+        try:
+            ident = session.client("sts", region_name=region).get_caller_identity()
+            account_id = ident.get("Account", "")
+        except Exception:
+            account_id = ""
+        if account_id:
+            self._account_ids[profile] = account_id
+        return account_id
+
     def infra_scan(self, profile: str | None = None, region: str | None = None,
-                   services: list[str] | None = None) -> dict:
+                   services: list[str] | None = None, regions: list[str] | None = None,
+                   max_age: float | None = None, limits: dict[str, int] | None = None,
+                   timeout: float | None = None, mode: str = "detailed",
+                   config_aggregator: str | None = None) -> dict:
+        """Start a scan of ``profile``.
+
+        ``mode="inventory"`` builds a quick first-pass graph from the Tagging API (or
+        the AWS Config aggregator ``config_aggregator``); expand it with infra_expand.
+        """
         profile = profile or self._active
         prof = self.mgr.profiles.get(profile, {})
         region = region or prof.get("region", "us-east-1")
+        regions = [r for r in (regions or []) if r in REGIONS]
+        # Snapshots younger than max_age are served instead of rescanning; 0 forces a rescan
+        max_age = self._scan_cache_ttl() if max_age is None else max_age
+        if limits:
+            # Snapshots were listed under other limits; scan afresh (still stored)
+            max_age = 0
+        scan_id, control = self._start_scan(profile, timeout)
+        callback = self._scan_callback(scan_id)
 
         def _go():
             try:
-                session = boto3.Session(profile_name=profile)
-                # Resolve account ID
-                try:
-                    ident = session.client("sts", region_name=region).get_caller_identity()
-                    account_id = ident.get("Account", "")
-                except Exception:
-                    account_id = ""
-
-                discovery = InfraDiscoveryService(
-                    session=session, region=region,
-                    event_callback=lambda evt, data: events.send(evt, data),
-                )
-                graph = discovery.scan_all(selected_services=services)
+                session = clients.session_for(profile)
+                account_id = self._account_id(profile, session, region)
+                snapshots = SnapshotPolicy(self.snapshots, profile, account_id, max_age)
+
+                if mode == "inventory":
+                    graph = InventoryDiscovery(
+                        session=session, regions=regions or [region], event_callback=callback,
+                        aggregator=config_aggregator, control=control, account_id=account_id,
+                    ).scan()
+                else:
+                    graph = self._scan_regions(
+                        session, regions or [region], services, account_id, snapshots,
+                        control, callback, stream_deltas=True, limits=limits,
+                    )
                 graph.profile = profile
                 graph.account_id = account_id
-                events.send("infra_scan_complete", graph.to_dict())
+                self._finish_scan(scan_id, profile, graph, control)
             except Exception as e:
                 events.send("infra_scan_complete", {
                     "resources": {}, "edges": [], "scan_errors": [{"service": "init", "error": str(e)[:200]}],
-                    "profile": profile, "region": region, "account_id": "",
+                    "profile": profile, "region": region, "account_id": "", "scan_id": scan_id,
                 })
+            finally:
+                self._end_scan(scan_id)
 
         threading.Thread(target=_go, daemon=True).start()
+        return {"ok": True, "scan_id": scan_id}
+
+    @staticmethod
+    def _scan_regions(session, regions: list[str], services: list[str] | None, account_id: str,
+                      snapshots: SnapshotPolicy, control: ScanControl, callback=None,
+                      stream_deltas: bool = False, limits: dict[str, int] | None = None):
+        """Detailed scan of one region, or of several with MultiRegionScanner."""
+        if len(regions) > 1:
+            return MultiRegionScanner(
+                session=session, regions=regions, event_callback=callback,
+                account_key=account_id, snapshots=snapshots, stream_deltas=stream_deltas,
+                limits=limits, control=control,
+            ).scan(selected_services=services)
+        return InfraDiscoveryService(
+            session=session, region=regions[0], event_callback=callback,
+            max_workers=DEFAULT_SCAN_WORKERS, snapshots=snapshots,
+            stream_deltas=stream_deltas, limits=limits, control=control,
+        ).scan_all(selected_services=services)
+
+    def infra_rescan(self, profile: str | None = None, services: list[str] | None = None) -> dict:
+        """Rescan only ``services`` and splice them into the stored graph for ``profile``."""
+        profile = profile or self._active
+        with self._infra_lock:
+            stored = self._infra_graphs.get(profile)
+        if stored is None:
+            return {"error": f"No scan stored for profile {profile}. Run a full scan first."}
+        services = [s for s in (services or []) if s in scanner_names()]
+        if not services:
+            return {"error": "No known services selected for rescan."}
+        regions = stored.scan_meta.get("regions") or [stored.region]
+        scan_id, control = self._start_scan(profile)
+        callback = self._scan_callback(scan_id)
+
+        def _go():
+            try:
+                session = clients.session_for(profile)
+                # max_age=0: never serve snapshots, but store the fresh fragments
+                snapshots = SnapshotPolicy(self.snapshots, profile, stored.account_id, 0)
+                if len(regions) > 1:
+                    fresh = MultiRegionScanner(
+                        session=session, regions=regions, event_callback=callback,
+                        account_key=stored.account_id, snapshots=snapshots, control=control,
+                    ).scan(selected_services=services, resolve_links=False)
+                else:
+                    fresh = InfraDiscoveryService(
+                        session=session, region=regions[0], event_callback=callback,
+                        max_workers=DEFAULT_SCAN_WORKERS, snapshots=snapshots, control=control,
+                    ).scan_all(selected_services=services, resolve_links=False)
+                graph = stored.to_graph()
+                graph.replace_services(services, fresh)
+                graph.scan_meta["metrics"] = merge_metrics(
+                    graph.scan_meta.get("metrics", {}), fresh.scan_meta.get("metrics", {}))
+                inventory = graph.scan_meta.get("inventory")
+                if inventory is not None:
+                    graph.scan_meta["inventory"] = {
+                        **inventory, "expanded": sorted({*inventory["expanded"], *services}),
+                    }
+                self._finish_scan(scan_id, profile, graph, control)
+            except Exception as e:
+                # The stored graph is unchanged; point the client back at it
+                events.send("infra_scan_complete", {
+                    **self._scan_ref(stored),
+                    "scan_errors": stored.scan_errors + [{"service": "init", "error": str(e)[:200]}],
+                })
+            finally:
+                self._end_scan(scan_id)
+
+        threading.Thread(target=_go, daemon=True).start()
+        return {"ok": True, "services": services, "scan_id": scan_id}
+
+    def infra_expand(self, profile: str | None = None,
+                     resource_types: list[str] | None = None) -> dict:
+        """Run the detailed scanners behind ``resource_types`` on a stored (inventory) graph."""
+        services = services_for_types(resource_types or [])
+        if not services:
+            return {"error": "No detailed scanner covers the selected resource types."}
+        return self.infra_rescan(profile, services)
+
+    def fleet_scan(self, profiles: list[str] | None = None, category_id: str | None = None,
+                   regions: list[str] | None = None, services: list[str] | None = None) -> dict:
+        names = list(profiles or [])
+        if category_id:
+            names += self.store.profiles_in_cat(category_id)
+        names = [n for n in dict.fromkeys(names) if n in self.mgr.profiles]
+        if not names:
+            return {"error": "No profiles selected for fleet scan."}
+        regions = [r for r in (regions or []) if r in REGIONS]
+        targets = {
+            n: regions or [self.mgr.profiles[n].get("region", "us-east-1")]
+            for n in names
+        }
+
+        # Fleet scans are not tied to one profile: they neither cancel nor get
+        # cancelled by the profile scans
+        scan_id, control = self._start_scan(None)
+        callback = self._scan_callback(scan_id)
+
+        def _go():
+            try:
+                scanner = FleetScanner(
+                    session_factory=clients.session_for,
+                    profiles=targets,
+                    event_callback=callback,
+                    on_result=self._store_graph,
+                    snapshot_store=self.snapshots, max_age=self._scan_cache_ttl(),
+                    control=control,
+                )
+                summary = scanner.scan(selected_services=services)
+                callback("fleet_scan_complete", {"accounts": list(summary.values())})
+            finally:
+                self._end_scan(scan_id)
+
+        threading.Thread(target=_go, daemon=True).start()
+        return {"ok": True, "profiles": names, "scan_id": scan_id}
+
+    def _start_scan(self, profile: str | None,
+                    timeout: float | None = None) -> tuple[str, ScanControl]:
+        """Register a running scan; a newer scan of the same profile cancels the older one."""
+        scan_id = uuid.uuid4().hex[:16]
+        control = ScanControl(timeout or DEFAULT_SCAN_TIMEOUT)
+        with self._infra_lock:
+            if profile is not None:
+                previous = self._running_scans.get(self._profile_scans.get(profile))
+                if previous is not None:
+                    previous.cancel("Superseded by a newer scan")
+                self._profile_scans[profile] = scan_id
+            self._running_scans[scan_id] = control
+        return scan_id, control
+
+    def _end_scan(self, scan_id: str):
+        with self._infra_lock:
+            self._running_scans.pop(scan_id, None)
+
+    @staticmethod
+    def _scan_callback(scan_id: str):
+        def _callback(event: str, data: dict):
+            events.send(event, {**data, "scan_id": scan_id})
+        return _callback
+
+    def _finish_scan(self, scan_id: str, profile: str, graph, control: ScanControl):
+        """Store a finished (or stopped) scan's graph and announce it.
+
+        Cancelled and timed-out scans keep their partial results, unless a newer
+        scan of the profile has superseded them.
+        """
+        graph.scan_meta["status"] = control.state() or "complete"
+        with self._infra_lock:
+            superseded = self._profile_scans.get(profile) != scan_id
+        if superseded:
+            return
+        stored = self._store_graph(profile, graph, scan_id)
+        events.send("infra_scan_complete", self._scan_ref(stored))
+
+    def cancel_scan(self, scan_id: str) -> dict:
+        with self._infra_lock:
+            control = self._running_scans.get(scan_id)
+        if control is None:
+            return {"error": f"No running scan {scan_id}"}
+        control.cancel("Scan cancelled by user")
         return {"ok": True}
 
+    def _store_graph(self, profile: str, graph, scan_id: str | None = None) -> CompactGraph:
+        # Stored graphs are only served or expanded again for a rescan: keep them compact
+        if isinstance(graph, CompactGraph):
+            compact = graph
+        else:
+            compact = CompactGraph.from_graph(graph)
+            # Lets scheduled rescans tell whether anything changed
+            compact.scan_meta["content_hash"] = compact.content_hash()
+        compact.scan_id = scan_id or uuid.uuid4().hex[:16]
+        with self._infra_lock:
+            previous = self._infra_graphs.get(profile)
+        compact.scan_meta.pop("diff", None)
+        if previous is not None:
+            # Small changes are laid out incrementally from the previous graph's layout
+            diff = compact.diff_from(
+                previous, max(1, int(len(compact) * INCREMENTAL_MAX_CHANGE)))
+            if diff is not None:
+                compact.scan_meta["diff"] = {
+                    "base": graph_key(previous.scan_meta.get("content_hash", ""),
+                                      len(previous), len(previous.edge_src)),
+                    **diff,
+                }
+        with self._infra_lock:
+            previous = self._infra_graphs.get(profile)
+            if previous is not None:
+                self._scan_profiles.pop(previous.scan_id, None)
+                self._scan_payloads.pop(previous.scan_id, None)
+            self._infra_graphs[profile] = compact
+            self._scan_profiles[compact.scan_id] = profile
+        return compact
+
+    @staticmethod
+    def _scan_ref(graph: CompactGraph) -> dict:
+        """Small event payload pointing at a stored graph; clients fetch it by scan_id."""
+        return {
+            "scan_id": graph.scan_id,
+            "profile": graph.profile,
+            "region": graph.region,
+            "account_id": graph.account_id,
+            "resource_count": len(graph),
+            "edge_count": len(graph.edge_src),
+            "scan_errors": graph.scan_errors,
+            # Metrics can run to many KB for large scans: served by get_scan_metrics
+            "scan_meta": {k: v for k, v in graph.scan_meta.items() if k != "metrics"},
+        }
+
+    def get_latest_scan(self, profile: str | None = None) -> dict:
+        """Reference to the stored graph of ``profile`` (e.g. from a scheduled scan)."""
+        profile = profile or self._active
+        with self._infra_lock:
+            graph = self._infra_graphs.get(profile)
+        if graph is None:
+            return {"error": f"No scan stored for profile {profile}."}
+        return self._scan_ref(graph)
+
+    # --- Scheduled scans ---
+
+    def _scan_schedules(self) -> list[dict]:
+        return [s for s in self.store.data.get("scan_schedules", []) if s["profile"] in self.mgr.profiles]
+
+    def get_scan_schedules(self) -> dict:
+        return {
+            "schedules": self.store.data.get("scan_schedules", []),
+            "status": self.scheduler.status(),
+        }
+
+    def set_scan_schedules(self, schedules: list[dict]) -> dict:
+        cleaned = []
+        for sched in schedules:
+            profile = sched.get("profile")
+            if profile not in self.mgr.profiles:
+                return {"error": f"Unknown profile: {profile}"}
+            interval = sched.get("interval") or DEFAULT_SCHEDULE_INTERVAL
+            if interval < MIN_SCHEDULE_INTERVAL:
+                return {"error": f"Interval must be at least {MIN_SCHEDULE_INTERVAL:g} seconds."}
+            services = [s for s in (sched.get("services") or []) if s in scanner_names()]
+            cleaned.append({
+                "profile": profile,
+                "regions": [r for r in (sched.get("regions") or []) if r in REGIONS],
+                "services": services or None,
+                "interval": interval,
+            })
+        self.store.data["scan_schedules"] = cleaned
+        self.store.save()
+        return {"ok": True, "schedules": cleaned}
+
+    def _run_scheduled_scan(self, job: dict, root: ScanControl):
+        """Rescan a scheduled profile; store and announce the graph only if it changed.
+
+        Fresh fragments always go to the snapshot store, so interactive scans
+        within the snapshot TTL are served from them. A scan the user starts
+        meanwhile wins: the scheduled run then keeps nothing but its snapshots.
+        """
+        profile = job["profile"]
+        scan_id = uuid.uuid4().hex[:16]
+        control = root.child(DEFAULT_SCAN_TIMEOUT)
+        with self._infra_lock:
+            latest = self._profile_scans.get(profile)
+            if latest in self._running_scans:
+                return
+            self._running_scans[scan_id] = control
+        try:
+            session = clients.session_for(profile)
+            regions = job.get("regions") or [self.mgr.profiles[profile].get("region", "us-east-1")]
+            account_id = self._account_id(profile, session, regions[0])
+            snapshots = SnapshotPolicy(self.snapshots, profile, account_id, 0)
+            graph = self._scan_regions(session, regions, job.get("services"), account_id,
+                                       snapshots, control)
+            if control.state():
+                return
+            graph.profile = profile
+            graph.account_id = account_id
+            graph.scan_meta["status"] = "complete"
+            graph.scan_meta["scheduled"] = True
+            compact = CompactGraph.from_graph(graph)
+            compact.scan_meta["content_hash"] = compact.content_hash()
+            with self._infra_lock:
+                if self._profile_scans.get(profile) != latest:
+                    return
+                previous = self._infra_graphs.get(profile)
+            if previous is not None and \
+                    previous.scan_meta.get("content_hash") == compact.scan_meta["content_hash"]:
+                return
+            stored = self._store_graph(profile, compact, scan_id)
+            events.send("infra_graph_changed", self._scan_ref(stored))
+        finally:
+            self._end_scan(scan_id)
+
+    def get_scan_metrics(self, scan_id: str) -> dict:
+        """API call metrics of a stored scan: a summary plus the full per-operation breakdown."""
+        with self._infra_lock:
+            graph = self._infra_graphs.get(self._scan_profiles.get(scan_id))
+        if graph is None:
+            return {"error": f"Scan {scan_id} not found"}
+        metrics = graph.scan_meta.get("metrics", {})
+        return {"scan_id": scan_id, "summary": summarize(metrics), "metrics": metrics}
+
+    def get_infra_scan(self, scan_id: str) -> bytes | None:
+        """Gzip-compressed wire payload (see graph_codec) of a stored scan, or None."""
+        with self._infra_lock:
+            payload = self._scan_payloads.get(scan_id)
+            graph = self._infra_graphs.get(self._scan_profiles.get(scan_id))
+        if payload is not None or graph is None:
+            return payload
+        payload = encode_graph(graph)
+        with self._infra_lock:
+            # Only cache it if the scan was not replaced while encoding
+            if scan_id in self._scan_profiles:
+                self._scan_payloads[scan_id] = payload
+        return payload
+
+    def get_infra_graph(self, profile: str) -> dict:
+        with self._infra_lock:
+            graph = self._infra_graphs.get(profile)
+        if graph is None:
+            return {"error": f"No scan stored for profile {profile}."}
+        return graph.to_dict()
+
     def generate_diagram(self, graph: dict, layout_mode: str = "algorithmic",
-                         fmt: str = "reactflow", llm_result: dict | None = None) -> dict:
-        engine = AlgorithmicLayoutEngine()
-        positions, collapse_map, visible_resources = engine.layout(graph)
+                         fmt: str = "reactflow", llm_result: dict | None = None,
+                         lod: bool = False) -> dict:
+        # Cached by content: toggling output formats or reopening reuses the layout
+        positions, collapse_map, visible_resources = self.layout_cache.layout(
+            graph, AlgorithmicLayoutEngine())
 
         if fmt == "drawio":
             generator = DrawioXmlGenerator()
@@ -623,8 +1020,40 @@ class ApiService:
         result = converter.convert(graph, positions, collapse_map,
                                    llm_result=llm_result,
                                    visible_resources=visible_resources)
+        if lod and len(result["nodes"]) > LOD_NODE_THRESHOLD:
+            # Too many nodes for one response: serve an overview, then viewport queries
+            viewport = DiagramViewport(result, positions)
+            key = uuid.uuid4().hex[:16]
+            with self._infra_lock:
+                self._viewports[key] = viewport
+                while len(self._viewports) > VIEWPORT_CACHE_ENTRIES:
+                    self._viewports.popitem(last=False)
+            return {**viewport.overview(), "view": {"key": key, **viewport.info()}}
         return result
 
+    def diagram_viewport(self, key: str, x: float, y: float, width: float, height: float,
+                         zoom: float) -> dict:
+        """Nodes and edges of a large diagram (see generate_diagram ``lod``) within a rectangle."""
+        with self._infra_lock:
+            viewport = self._viewports.get(key)
+            if viewport is not None:
+                self._viewports.move_to_end(key)
+        if viewport is None:
+            return {"error": f"Diagram view {key} expired."}
+        return viewport.query(x, y, max(0.0, width), max(0.0, height), max(zoom, 0.01))
+
+    def export_drawio(self, graph: dict, compressed: bool = False) -> Iterator[str]:
+        """The .drawio document for ``graph`` as a stream of XML chunks.
+
+        The layout is computed (or fetched from the cache) before returning, so
+        only the XML is produced while the caller consumes the stream.
+        """
+        positions, collapse_map, visible_resources = self.layout_cache.layout(
+            graph, AlgorithmicLayoutEngine())
+        return DrawioXmlGenerator().stream(graph, positions, collapse_map,
+                                           visible_resources=visible_resources,
+                                           compressed=compressed)
+
     def infra_llm_layout(self, graph: dict) -> dict:
         llm_cfg = self.store.data.get("llm_config", {})
         default = llm_cfg.get("default_provider")
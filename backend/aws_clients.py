@@ -0,0 +1,87 @@
+"""Process-wide pool of boto3 sessions and clients.
+
+Building a boto3 Session parses the AWS config files, and building a client loads
+the service model and endpoint rules — both far slower than the API call that
+usually follows. Clients are thread-safe once built, so one client per
+(profile, service, region) is shared by cost lookups, badges, identity checks
+and scans alike, reusing its HTTP connection pool. The pool is cleared whenever
+AWSCfg reloads or saves the config files.
+"""
+
+import threading
+from collections import OrderedDict
+
+import boto3
+
+DEFAULT_MAX_CLIENTS = 256
+
+
+class PooledSession:
+    """Session-shaped view of the pool for one profile (what scanners expect)."""
+
+    def __init__(self, pool: "ClientPool", profile: str):
+        self.pool = pool
+        self.profile_name = profile
+
+    @property
+    def region_name(self) -> str | None:
+        return self.pool.session(self.profile_name).region_name
+
+    def client(self, service_name: str, region_name: str | None = None):
+        return self.pool.client(self.profile_name, service_name, region_name)
+
+
+class ClientPool:
+    """Thread-safe LRU cache of boto3 clients keyed by (profile, service, region)."""
+
+    def __init__(self, max_clients: int = DEFAULT_MAX_CLIENTS):
+        self.max_clients = max_clients
+        self._sessions: dict[str, boto3.Session] = {}
+        self._session_locks: dict[str, threading.Lock] = {}
+        self._clients: OrderedDict[tuple, object] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def session(self, profile: str) -> boto3.Session:
+        with self._lock:
+            if profile not in self._sessions:
+                self._sessions[profile] = boto3.Session(profile_name=profile or None)
+                self._session_locks[profile] = threading.Lock()
+            return self._sessions[profile]
+
+    def session_for(self, profile: str) -> PooledSession:
+        return PooledSession(self, profile)
+
+    def client(self, profile: str, service_name: str, region_name: str | None = None):
+        key = (profile, service_name, region_name)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                return client
+        session = self.session(profile)
+        # Sessions are not thread-safe; build one profile's clients one at a time
+        with self._session_locks[profile]:
+            with self._lock:
+                client = self._clients.get(key)
+            if client is None:
+                client = session.client(service_name, region_name=region_name)
+        with self._lock:
+            client = self._clients.setdefault(key, client)
+            self._clients.move_to_end(key)
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+        return client
+
+    def invalidate(self, profile: str | None = None):
+        """Drop cached sessions and clients, for one profile or all of them."""
+        with self._lock:
+            if profile is None:
+                self._sessions.clear()
+                self._clients.clear()
+                return
+            self._sessions.pop(profile, None)
+            for key in [k for k in self._clients if k[0] == profile]:
+                del self._clients[key]
+
+
+clients = ClientPool()
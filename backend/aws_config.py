@@ -7,6 +7,7 @@ import configparser
 import shutil
 from datetime import datetime
 
+from .aws_clients import clients
 from .constants import AWS_DIR, CONFIG_FILE, CREDENTIALS_FILE
 
 
@@ -17,6 +18,7 @@ class AWSCfg:
 
     def load(self):
         self.profiles = {}
+        clients.invalidate()
         cfg = configparser.ConfigParser()
         crd = configparser.ConfigParser()
         if CONFIG_FILE.exists():
@@ -99,6 +101,7 @@ class AWSCfg:
             c.write(f)
         with open(CREDENTIALS_FILE, "w") as f:
             cr.write(f)
+        clients.invalidate()
 
     def active(self) -> str:
         import os
@@ -0,0 +1,300 @@
+"""Micro-benchmarks for the infrastructure graph pipeline on synthetic accounts.
+
+    python -m backend.benchmarks graph --resources 100000
+    python -m backend.benchmarks codec --resources 100000
+    python -m backend.benchmarks layout --resources 50000
+    python -m backend.benchmarks drawio --resources 50000
+    python -m backend.benchmarks viewport --resources 50000
+    python -m backend.benchmarks relayout --resources 50000
+
+Synthetic graphs mimic a large multi-region account: VPCs with subnets, EC2
+instances spread across them with security groups and volumes, Lambda functions,
+queues and tables, with "contains"/"attached_to"/"triggers" edges between them.
+"""
+
+import argparse
+import gc
+import gzip
+import json
+import random
+import time
+import tracemalloc
+
+from .compact_graph import CompactGraph
+from .diagram_generator import AlgorithmicLayoutEngine, DrawioXmlGenerator, ReactFlowConverter
+from .diagram_viewport import DiagramViewport
+from .graph_codec import decode_graph, encode_graph
+from .infra_discovery import DiscoveredResource, InfraGraph
+
+_REGIONS = ("us-east-1", "us-west-2", "eu-west-1", "eu-central-1", "ap-southeast-2")
+
+
+def synthetic_graph(n_resources: int, seed: int = 7) -> InfraGraph:
+    """Build an InfraGraph of roughly ``n_resources`` resources."""
+    rnd = random.Random(seed)
+    graph = InfraGraph(region="multi-region")
+    n_vpcs = max(1, n_resources // 2000)
+    subnets: list[tuple[str, str]] = []
+
+    def add(rid, rtype, service, region, props=None, tags=None):
+        graph.add_resource(DiscoveredResource(
+            id=rid, arn=f"arn:aws:{service.lower()}:{region}:123456789012:{rid}",
+            resource_type=rtype, service=service, name=rid, region=region,
+            properties=props or {}, tags=tags or {},
+        ))
+
+    for v in range(n_vpcs):
+        region = _REGIONS[v % len(_REGIONS)]
+        vpc = f"{region}/vpc-{v:05x}"
+        add(vpc, "vpc", "VPC", region, {"cidr": "10.0.0.0/16", "state": "available"})
+        add(f"{region}/igw-{v:05x}", "internet_gateway", "VPC", region)
+        graph.add_edge(vpc, f"{region}/igw-{v:05x}", "attached_to", "IGW")
+        for s in range(6):
+            sid = f"{region}/subnet-{v:05x}{s}"
+            add(sid, "subnet", "VPC", region,
+                {"cidr": f"10.0.{s}.0/24", "az": f"{region}{'abc'[s % 3]}", "vpc_id": vpc},
+                {"Name": f"{'public' if s < 2 else 'private'}-{s}"})
+            graph.add_edge(vpc, sid, "contains", "subnet")
+            subnets.append((sid, vpc))
+
+    last_fn = ""
+    i = 0
+    while len(graph.resources) < n_resources:
+        sid, vpc = subnets[rnd.randrange(len(subnets))]
+        region = sid.split("/")[0]
+        kind = rnd.random()
+        if kind < 0.55:
+            iid = f"{region}/i-{i:08x}"
+            sg = f"{region}/sg-{i % 500:05x}"
+            if sg not in graph.resources:
+                add(sg, "security_group", "EC2", region, {"vpc_id": vpc, "description": "app"})
+            add(iid, "ec2_instance", "EC2", region,
+                {"instance_type": "m5.large", "state": "running", "vpc_id": vpc, "subnet_id": sid,
+                 "private_ip": f"10.0.{i % 250}.{i % 200}", "security_groups": [sg]},
+                {"Name": f"app-{i % 300}", "team": f"team-{i % 12}", "env": "prod"})
+            graph.add_edge(sid, iid, "contains", "instance")
+            graph.add_edge(iid, sg, "attached_to", "SG")
+            if rnd.random() < 0.5:
+                vol = f"{region}/vol-{i:08x}"
+                add(vol, "ebs_volume", "EC2", region, {"size_gb": 100, "volume_type": "gp3"})
+                graph.add_edge(iid, vol, "attached_to", "EBS")
+        elif kind < 0.8:
+            fn = f"{region}/fn-{i}"
+            add(fn, "lambda_function", "Lambda", region,
+                {"runtime": "python3.12", "memory": 512, "vpc_subnet_ids": [sid]})
+            graph.add_edge(sid, fn, "contains", "Lambda")
+            last_fn = fn
+        elif kind < 0.9:
+            q = f"{region}/sqs-q{i}"
+            add(q, "sqs_queue", "SQS", region, {"approx_messages": 0})
+            if last_fn:
+                graph.add_edge(q, last_fn, "triggers", "SQS")
+        else:
+            add(f"{region}/table-{i}", "dynamodb_table", "DynamoDB", region,
+                {"status": "ACTIVE", "billing_mode": "PAY_PER_REQUEST"})
+        i += 1
+    return graph
+
+
+def _measure(build) -> tuple[object, int, float]:
+    """(result, retained bytes, seconds) for calling ``build``."""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    retained, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained, elapsed
+
+
+def _measure_peak(build) -> tuple[object, int, float]:
+    """(result, peak bytes allocated meanwhile, seconds) for calling ``build``."""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak, elapsed
+
+
+def _timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bench_graph(n_resources: int):
+    graph, graph_bytes, build_s = _measure(lambda: synthetic_graph(n_resources))
+    # Built from its own graph, which is then dropped: nothing shared with ``graph``
+    compact, compact_bytes, _ = _measure(
+        lambda: CompactGraph.from_graph(synthetic_graph(n_resources)))
+    _, _, convert_s = _measure(lambda: CompactGraph.from_graph(graph))
+    assert compact.to_dict() == graph.to_dict()
+
+    print(f"resources={len(graph.resources)} edges={len(graph.edges)}")
+    print(f"{'':14}{'memory MB':>12}{'to_dict s':>12}")
+    print(f"{'InfraGraph':14}{graph_bytes / 1e6:12.1f}{_timed(graph.to_dict):12.3f}"
+          f"   (built in {build_s:.2f}s)")
+    print(f"{'CompactGraph':14}{compact_bytes / 1e6:12.1f}{_timed(compact.to_dict):12.3f}"
+          f"   (converted in {convert_s:.2f}s)")
+
+
+def bench_codec(n_resources: int):
+    graph = synthetic_graph(n_resources)
+    compact = CompactGraph.from_graph(graph)
+    plain = json.dumps(graph.to_dict()).encode()
+    started = time.perf_counter()
+    payload = encode_graph(compact)
+    encode_s = time.perf_counter() - started
+    assert decode_graph(payload) == json.loads(plain)
+
+    print(f"resources={len(graph.resources)} edges={len(graph.edges)}")
+    print(f"{'':22}{'size MB':>10}")
+    print(f"{'to_dict JSON':22}{len(plain) / 1e6:10.2f}")
+    print(f"{'to_dict JSON, gzip':22}{len(gzip.compress(plain)) / 1e6:10.2f}")
+    print(f"{'wire format':22}{len(payload) / 1e6:10.2f}   (encoded in {encode_s:.2f}s)")
+
+
+def bench_layout(n_resources: int):
+    """Layout time at 1/4, 1/2 and all of ``n_resources``: linear layout keeps µs per item flat."""
+    engine = AlgorithmicLayoutEngine()
+    print(f"{'resources':>10}{'edges':>10}{'layout s':>10}{'µs/(N+E)':>10}{'nodes':>8}")
+    for n in (n_resources // 4, n_resources // 2, n_resources):
+        graph = synthetic_graph(n).to_dict()
+        items = len(graph["resources"]) + len(graph["edges"])
+        positions, _, _ = engine.layout(graph)
+        elapsed = _timed(lambda: engine.layout(graph))
+        print(f"{len(graph['resources']):>10}{len(graph['edges']):>10}{elapsed:>10.3f}"
+              f"{elapsed / items * 1e6:>10.2f}{len(positions):>8}")
+
+
+def bench_drawio(n_resources: int):
+    """Peak memory and time of the draw.io export, whole document vs consumed chunk by chunk."""
+    graph = synthetic_graph(n_resources).to_dict()
+    positions, collapse_map, visible = AlgorithmicLayoutEngine().layout(graph)
+    generator = DrawioXmlGenerator()
+
+    def streamed(compressed: bool) -> int:
+        return sum(len(chunk) for chunk in generator.stream(
+            graph, positions, collapse_map, visible, compressed=compressed))
+
+    print(f"resources={len(graph['resources'])} cells={len(positions)}")
+    print(f"{'':22}{'size MB':>10}{'peak MB':>10}{'s':>8}")
+    for label, export in (
+        ("generate", lambda: len(generator.generate(graph, positions, collapse_map, visible))),
+        ("stream", lambda: streamed(False)),
+        ("stream, compressed", lambda: streamed(True)),
+    ):
+        size, peak, elapsed = _measure_peak(export)
+        print(f"{label:22}{size / 1e6:10.2f}{peak / 1e6:10.1f}{elapsed:8.2f}")
+
+
+def bench_viewport(n_resources: int):
+    """Response size of the full React Flow diagram vs level-of-detail views, and query time."""
+    graph = synthetic_graph(n_resources).to_dict()
+    positions, collapse_map, visible = AlgorithmicLayoutEngine().layout(graph)
+    diagram = ReactFlowConverter().convert(graph, positions, collapse_map,
+                                           visible_resources=visible)
+    started = time.perf_counter()
+    viewport = DiagramViewport(diagram, positions)
+    index_s = time.perf_counter() - started
+    x0, y0, x1, y1 = viewport.bounds
+
+    print(f"resources={len(graph['resources'])} indexed in {index_s:.3f}s")
+    print(f"{'':26}{'nodes':>8}{'edges':>8}{'JSON MB':>9}{'ms':>8}")
+    print(f"{'full diagram':26}{len(diagram['nodes']):>8}{len(diagram['edges']):>8}"
+          f"{len(json.dumps(diagram)) / 1e6:9.2f}")
+    for label, view in (
+        ("overview", viewport.overview),
+        ("1600x900 at zoom 1", lambda: viewport.query(x0, y0, 1600, 900, 1.0)),
+        ("whole diagram at zoom 0.1", lambda: viewport.query(x0, y0, x1 - x0, y1 - y0, 0.1)),
+    ):
+        elapsed = _timed(view)
+        result = view()
+        print(f"{label:26}{len(result['nodes']):>8}{len(result['edges']):>8}"
+              f"{len(json.dumps(result)) / 1e6:9.2f}{elapsed * 1e3:8.1f}")
+
+
+def bench_relayout(n_resources: int, changes: int = 3):
+    """Incremental relayout vs full layout after a few connected additions and removals.
+
+    Both must show the same nodes: a new resource with an edge stays individual
+    instead of joining a collapsed group.
+    """
+    base = synthetic_graph(n_resources)
+    dropped = {r.id for r in base.resources.values() if r.resource_type == "ebs_volume"}
+    dropped = set(sorted(dropped)[:changes])
+    graph = InfraGraph(region=base.region)
+    for r in base.resources.values():
+        if r.id not in dropped:
+            graph.add_resource(r)
+    for e in base.edges:
+        if e.source_id not in dropped and e.target_id not in dropped:
+            graph.add_edge(e.source_id, e.target_id, e.edge_type, e.label)
+    subnet = next(r.id for r in graph.resources.values() if r.resource_type == "subnet")
+    region = subnet.split("/")[0]
+    queues = [r.id for r in graph.resources.values() if r.resource_type == "sqs_queue"]
+    for k in range(changes):
+        fn = f"{region}/fn-added-{k}"
+        graph.add_resource(DiscoveredResource(
+            id=fn, arn=f"arn:aws:lambda:{region}:123456789012:{fn}",
+            resource_type="lambda_function", service="Lambda", name=fn, region=region,
+            properties={"runtime": "python3.12", "memory": 512, "vpc_subnet_ids": [subnet]},
+        ))
+        graph.add_edge(subnet, fn, "contains", "Lambda")
+        graph.add_edge(queues[k % len(queues)], fn, "triggers", "SQS")
+
+    diff = CompactGraph.from_graph(graph).diff_from(CompactGraph.from_graph(base), max_changes=100)
+    engine = AlgorithmicLayoutEngine()
+    previous = engine.layout(base.to_dict())
+    graph_dict = graph.to_dict()
+    _, _, full_visible = engine.layout(graph_dict)
+    _, _, visible = engine.relayout(previous, graph_dict, diff)
+    assert set(visible) == set(full_visible), sorted(set(visible) ^ set(full_visible))[:10]
+
+    print(f"resources={len(graph_dict['resources'])} added={len(diff['added'])} "
+          f"removed={len(diff['removed'])} visible={len(visible)}")
+    print(f"{'full layout s':18}{_timed(lambda: engine.layout(graph_dict)):10.3f}")
+    print(f"{'relayout s':18}{_timed(lambda: engine.relayout(previous, graph_dict, diff)):10.3f}")
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="python -m backend.benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+    p_graph = sub.add_parser("graph", help="InfraGraph vs CompactGraph memory and to_dict time")
+    p_graph.add_argument("--resources", type=int, default=100_000)
+    p_codec = sub.add_parser("codec", help="Scan graph wire payload size vs plain JSON")
+    p_codec.add_argument("--resources", type=int, default=100_000)
+    p_layout = sub.add_parser("layout", help="AlgorithmicLayoutEngine scaling")
+    p_layout.add_argument("--resources", type=int, default=50_000)
+    p_drawio = sub.add_parser("drawio", help="draw.io export memory: whole vs streamed")
+    p_drawio.add_argument("--resources", type=int, default=50_000)
+    p_viewport = sub.add_parser("viewport", help="Level-of-detail diagram views vs the full diagram")
+    p_viewport.add_argument("--resources", type=int, default=50_000)
+    p_relayout = sub.add_parser("relayout", help="Incremental relayout vs full layout")
+    p_relayout.add_argument("--resources", type=int, default=50_000)
+    args = parser.parse_args(argv)
+
+    if args.bench == "graph":
+        bench_graph(args.resources)
+    elif args.bench == "codec":
+        bench_codec(args.resources)
+    elif args.bench == "layout":
+        bench_layout(args.resources)
+    elif args.bench == "drawio":
+        bench_drawio(args.resources)
+    elif args.bench == "viewport":
+        bench_viewport(args.resources)
+    elif args.bench == "relayout":
+        bench_relayout(args.resources)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""Compact in-memory form of an InfraGraph, for graphs the server keeps around.
+
+A scanned InfraGraph is built for mutation: one dataclass per resource and edge,
+per-resource dicts, and indexes. Graphs that are only stored and served (the last
+scan per profile, fleet results) are converted to a CompactGraph instead:
+
+- resources are slotted records whose type/service/region strings are interned,
+  and empty property/tag dicts are not stored at all;
+- edges are parallel arrays of integer node indices, with edge types and labels
+  as indices into small string tables;
+- links keep only their interned fields; they are re-resolved on to_graph().
+
+to_dict() produces the same payload as InfraGraph.to_dict().
+"""
+
+import hashlib
+import json
+import sys
+from array import array
+
+from .infra_discovery import DiscoveredResource, InfraGraph, ResourceLink
+
+# Properties that change between scans of unchanged infrastructure (counters,
+# live state), by resource type; content_hash leaves them out
+VOLATILE_PROPERTIES = {
+    "sqs_queue": frozenset({"approx_messages"}),
+    "dynamodb_table": frozenset({"item_count", "size_bytes"}),
+    "log_group": frozenset({"stored_bytes"}),
+    "ecs_cluster": frozenset({"running_tasks"}),
+    "ecs_service": frozenset({"running_count"}),
+    "cloudwatch_alarm": frozenset({"state"}),
+}
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _intern_props(props: dict) -> dict | None:
+    if not props:
+        return None
+    return {sys.intern(k): _intern(v) for k, v in props.items()}
+
+
+class StringTable:
+    """Append-only table of distinct strings, addressed by index."""
+
+    __slots__ = ("strings", "_index")
+
+    def __init__(self):
+        self.strings: list[str] = []
+        self._index: dict[str, int] = {}
+
+    def add(self, value: str) -> int:
+        idx = self._index.get(value)
+        if idx is None:
+            idx = self._index[value] = len(self.strings)
+            self.strings.append(sys.intern(value))
+        return idx
+
+    def __getitem__(self, idx: int) -> str:
+        return self.strings[idx]
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+
+class CompactResource:
+    __slots__ = ("id", "arn", "resource_type", "service", "name", "region", "properties", "tags")
+
+    def __init__(self, r: DiscoveredResource):
+        self.id = r.id
+        self.arn = r.arn
+        self.resource_type = sys.intern(r.resource_type)
+        self.service = sys.intern(r.service)
+        self.name = r.name
+        self.region = sys.intern(r.region)
+        self.properties = _intern_props(r.properties)
+        self.tags = _intern_props(r.tags)
+
+    def to_resource(self) -> DiscoveredResource:
+        return DiscoveredResource(
+            id=self.id, arn=self.arn, resource_type=self.resource_type,
+            service=self.service, name=self.name, region=self.region,
+            properties=dict(self.properties or {}), tags=dict(self.tags or {}),
+        )
+
+
+class CompactGraph:
+    """Read-mostly InfraGraph snapshot with array-backed edges."""
+
+    __slots__ = ("resources", "node_index", "edge_src", "edge_dst", "edge_type", "edge_label",
+                 "types", "labels", "links", "scan_errors", "scan_meta",
+                 "profile", "region", "account_id", "scan_id")
+
+    def __init__(self):
+        self.resources: list[CompactResource] = []
+        self.node_index: dict[str, int] = {}
+        self.edge_src = array("I")
+        self.edge_dst = array("I")
+        self.edge_type = array("H")  # index into self.types
+        self.edge_label = array("I")  # index into self.labels
+        self.types = StringTable()
+        self.labels = StringTable()
+        self.links: list[tuple] = []
+        self.scan_errors: list[dict] = []
+        self.scan_meta: dict = {}
+        self.profile = ""
+        self.region = ""
+        self.account_id = ""
+        self.scan_id = ""  # set when the server stores the graph
+
+    @classmethod
+    def from_graph(cls, graph: InfraGraph) -> "CompactGraph":
+        cg = cls()
+        with graph._lock:
+            for rid, r in graph.resources.items():
+                cg.node_index[rid] = len(cg.resources)
+                cg.resources.append(CompactResource(r))
+            for e in graph.edges:
+                src = cg.node_index.get(e.source_id)
+                dst = cg.node_index.get(e.target_id)
+                if src is None or dst is None:
+                    continue
+                cg.edge_src.append(src)
+                cg.edge_dst.append(dst)
+                cg.edge_type.append(cg.types.add(e.edge_type))
+                cg.edge_label.append(cg.labels.add(e.label))
+            cg.links = [
+                tuple(_intern(v) for v in (lk.source, lk.target, lk.edge_type, lk.label,
+                                           lk.source_kind, lk.target_kind, lk.service))
+                for lk in graph.links
+            ]
+            cg.scan_errors = list(graph.scan_errors)
+            cg.scan_meta = dict(graph.scan_meta)
+        cg.profile, cg.region, cg.account_id = graph.profile, graph.region, graph.account_id
+        return cg
+
+    def __len__(self) -> int:
+        return len(self.resources)
+
+    def edges(self):
+        """Iterate edges as (source_id, target_id, edge_type, label)."""
+        ids = [cr.id for cr in self.resources]
+        types, labels = self.types.strings, self.labels.strings
+        for src, dst, edge_type, label in zip(self.edge_src, self.edge_dst,
+                                              self.edge_type, self.edge_label):
+            yield ids[src], ids[dst], types[edge_type], labels[label]
+
+    def content_hash(self) -> str:
+        """SHA-256 over resources and edges, independent of scan order and metadata.
+
+        Two scans of unchanged infrastructure hash alike: errors, metrics and
+        other scan_meta do not count, nor do VOLATILE_PROPERTIES.
+        """
+        h = hashlib.sha256()
+        for cr in sorted(self.resources, key=lambda cr: cr.id):
+            properties = cr.properties
+            volatile = VOLATILE_PROPERTIES.get(cr.resource_type)
+            if volatile and properties:
+                properties = {k: v for k, v in properties.items() if k not in volatile}
+            h.update(json.dumps(
+                [cr.id, cr.arn, cr.resource_type, cr.service, cr.name, cr.region,
+                 properties, cr.tags],
+                sort_keys=True, default=str, separators=(",", ":"),
+            ).encode())
+            h.update(b"\n")
+        for edge in sorted(self.edges()):
+            h.update("\x1f".join(edge).encode())
+            h.update(b"\n")
+        return h.hexdigest()
+
+    def diff_from(self, base: "CompactGraph", max_changes: int) -> dict | None:
+        """Resources added and removed since ``base``, for incremental relayout.
+
+        Also lists the new "contains" edges into added resources as [parent,
+        child] pairs, and as ``connected`` both ends of the other edges that
+        touch an added resource (the layout never collapses those). None when
+        more than ``max_changes`` resources changed.
+        """
+        added = [rid for rid in self.node_index if rid not in base.node_index]
+        removed = [rid for rid in base.node_index if rid not in self.node_index]
+        if len(added) + len(removed) > max_changes:
+            return None
+        new_ids = set(added)
+        contains = []
+        connected = set()
+        for src, dst, edge_type, _ in self.edges():
+            if edge_type == "contains":
+                if dst in new_ids:
+                    contains.append([src, dst])
+            elif src in new_ids or dst in new_ids:
+                connected.update((src, dst))
+        return {"added": added, "removed": removed, "contains": contains,
+                "connected": sorted(connected)}
+
+    def to_graph(self) -> InfraGraph:
+        """Expand back into a mutable InfraGraph (links resolved against it again)."""
+        graph = InfraGraph(
+            scan_errors=list(self.scan_errors), scan_meta=dict(self.scan_meta),
+            profile=self.profile, region=self.region, account_id=self.account_id,
+        )
+        for cr in self.resources:
+            graph.add_resource(cr.to_resource())
+        for src, dst, edge_type, label in self.edges():
+            graph.add_edge(src, dst, edge_type, label)
+        graph.links = [ResourceLink(*fields) for fields in self.links]
+        # Marks links whose edge already exists as resolved; adds no duplicates
+        graph.resolve_links()
+        return graph
+
+    def to_dict(self, include_links: bool = False) -> dict:
+        ids = [cr.id for cr in self.resources]
+        types, labels = self.types.strings, self.labels.strings
+        d = {
+            "resources": {
+                cr.id: {
+                    "id": cr.id, "arn": cr.arn, "resource_type": cr.resource_type,
+                    "service": cr.service, "name": cr.name, "region": cr.region,
+                    "properties": cr.properties or {}, "tags": cr.tags or {},
+                }
+                for cr in self.resources
+            },
+            "edges": [
+                {"source_id": ids[src], "target_id": ids[dst], "edge_type": types[edge_type],
+                 "label": labels[label]}
+                for src, dst, edge_type, label in zip(self.edge_src, self.edge_dst,
+                                                      self.edge_type, self.edge_label)
+            ],
+            "scan_errors": self.scan_errors,
+            "scan_meta": self.scan_meta,
+            "profile": self.profile,
+            "region": self.region,
+            "account_id": self.account_id,
+        }
+        if include_links:
+            keys = ("source", "target", "edge_type", "label", "source_kind", "target_kind",
+                    "service")
+            d["links"] = [dict(zip(keys, fields)) for fields in self.links]
+        return d
+
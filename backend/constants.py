@@ -8,6 +8,8 @@ AWS_DIR = Path.home() / ".aws"
 CONFIG_FILE = AWS_DIR / "config"
 CREDENTIALS_FILE = AWS_DIR / "credentials"
 STATE_FILE = AWS_DIR / "profile-manager.json"
+SCAN_DB_FILE = AWS_DIR / "profile-manager-scans.db"
+LAYOUT_CACHE_DIR = AWS_DIR / "profile-manager-layouts"
 
 REGIONS = [
     "us-east-1", "us-east-2", "us-west-1", "us-west-2",
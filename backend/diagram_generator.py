@@ -8,9 +8,12 @@ Based on AWS official architecture diagram standards (2023+):
 - draw.io export with mxgraph.aws4 shapes
 """
 
+import base64
 import re
-import xml.etree.ElementTree as ET
+import zlib
 from collections import defaultdict
+from typing import Iterable, Iterator
+from urllib.parse import quote
 
 
 # ---------------------------------------------------------------------------
@@ -145,6 +148,10 @@ DRAWIO_SHAPES = {
 }
 
 
+# draw.io export streams in chunks of about this many characters
+DRAWIO_CHUNK_CHARS = 64 * 1024
+
+
 # ---------------------------------------------------------------------------
 # Resource Collapsing — reduces 200+ resources to readable count
 # ---------------------------------------------------------------------------
@@ -165,6 +172,22 @@ def _extract_prefix(name: str) -> str:
     return name[:10] if len(name) > 10 else name
 
 
+# Tags that name the workload a resource belongs to, checked in order (case-insensitive)
+GROUP_TAG_KEYS = (
+    "app", "application", "service", "project", "component", "team",
+    "aws:cloudformation:stack-name",
+)
+
+
+def _group_key(resource: dict) -> tuple[str, str]:
+    """(tag key, value) of the first workload tag present, else ("", name prefix)."""
+    tags = {k.lower(): (k, v) for k, v in (resource.get("tags") or {}).items() if v}
+    for key in GROUP_TAG_KEYS:
+        if key in tags:
+            return tags[key]
+    return "", _extract_prefix(resource["name"])
+
+
 # Service-level display names for collapsed groups
 _SERVICE_DISPLAY = {
     "iam_role": "IAM Roles",
@@ -178,58 +201,64 @@ _SERVICE_DISPLAY = {
 }
 
 
-def _make_collapsed_node(rtype: str, prefix: str, group: list[tuple[str, dict]]) -> dict:
-    """Create a single collapsed node representing a group of similar resources."""
+def _make_collapsed_node(rtype: str, prefix: str, group: list[tuple[str, dict]],
+                         tag_key: str = "") -> dict:
+    """Create a single collapsed node representing a group of similar resources.
+
+    With ``tag_key`` the group shares that tag and ``prefix`` is its value.
+    """
     representative = group[0][1]
-    collapsed_id = f"collapsed_{rtype}_{prefix}"
     service_label = _SERVICE_DISPLAY.get(rtype, rtype.replace("_", " "))
-    display_name = f"{prefix}\u2026 ({len(group)})" if prefix else f"{service_label} ({len(group)})"
+    properties = {
+        **representative.get("properties", {}),
+        "_collapsed": True,
+        "_count": len(group),
+        "_children": [rid for rid, _ in group],
+    }
+    if tag_key:
+        collapsed_id = f"collapsed_{rtype}_{tag_key}_{prefix}"
+        display_name = f"{prefix} ({len(group)})"
+        properties["_group_tag"] = {tag_key: prefix}
+    else:
+        collapsed_id = f"collapsed_{rtype}_{prefix}"
+        display_name = f"{prefix}\u2026 ({len(group)})" if prefix else f"{service_label} ({len(group)})"
     return collapsed_id, {
         **representative,
         "id": collapsed_id,
         "name": display_name,
-        "properties": {
-            **representative.get("properties", {}),
-            "_collapsed": True,
-            "_count": len(group),
-            "_children": [rid for rid, _ in group],
-        },
+        "properties": properties,
     }
 
 
-def _collapse_resources(resources: dict, edges: list) -> tuple[dict, dict]:
+def _collapse_resources(resources: dict, edges: list,
+                        connected_ids: set | None = None) -> tuple[dict, dict]:
     """Aggressively collapse similar resources for readable diagrams.
 
     Strategy:
     1. Resources with direct edges (non-contains) stay individual — they're "important"
     2. For each resource type with many unconnected items:
-       a. Group by name prefix → collapse groups of 2+
+       a. Group by workload tag (GROUP_TAG_KEYS), else by name prefix →
+          collapse groups of 2+
        b. Any remaining ungrouped items → collapse into catch-all per type
     3. Target: <50 visible resource nodes
 
+    ``connected_ids`` (endpoints of non-contains edges) is derived from
+    ``edges`` unless the caller already has it (see _LayoutIndex).
+
     Returns (visible_resources, collapse_map).
     """
-    # Find resources with direct non-contains edges
-    connected_ids = set()
-    for e in edges:
-        if e["edge_type"] != "contains":
-            connected_ids.add(e["source_id"])
-            connected_ids.add(e["target_id"])
-
-    # Group non-structural resources by type
-    type_groups: dict[str, list[tuple[str, dict]]] = defaultdict(list)
-    for rid, r in resources.items():
-        if r["resource_type"] in STRUCTURAL_TYPES:
-            continue
-        type_groups[r["resource_type"]].append((rid, r))
+    if connected_ids is None:
+        connected_ids = _LayoutIndex(resources, edges).connected_ids
 
+    # Structural resources stay as-is; the rest is grouped by type
     visible = {}
     collapse_map = {}
-
-    # Keep all structural resources as-is
+    type_groups: dict[str, list[tuple[str, dict]]] = defaultdict(list)
     for rid, r in resources.items():
         if r["resource_type"] in STRUCTURAL_TYPES:
             visible[rid] = r
+        else:
+            type_groups[r["resource_type"]].append((rid, r))
 
     for rtype, items in type_groups.items():
         # Very small groups — keep individual
@@ -239,11 +268,12 @@ def _collapse_resources(resources: dict, edges: list) -> tuple[dict, dict]:
             continue
 
         # Split: connected stay individual, unconnected get collapsed
-        connected = [(rid, r) for rid, r in items if rid in connected_ids]
-        unconnected = [(rid, r) for rid, r in items if rid not in connected_ids]
-
-        for rid, r in connected:
-            visible[rid] = r
+        unconnected = []
+        for rid, r in items:
+            if rid in connected_ids:
+                visible[rid] = r
+            else:
+                unconnected.append((rid, r))
 
         if len(unconnected) <= 2:
             for rid, r in unconnected:
@@ -255,11 +285,10 @@ def _collapse_resources(resources: dict, edges: list) -> tuple[dict, dict]:
         MAX_GROUPS_PER_TYPE = 3
         service_label = _SERVICE_DISPLAY.get(rtype, rtype.replace("_", " "))
 
-        # Group unconnected by prefix
-        prefix_groups: dict[str, list[tuple[str, dict]]] = defaultdict(list)
+        # Group unconnected by workload tag, or name prefix when untagged
+        prefix_groups: dict[tuple[str, str], list[tuple[str, dict]]] = defaultdict(list)
         for rid, r in unconnected:
-            prefix = _extract_prefix(r["name"])
-            prefix_groups[prefix].append((rid, r))
+            prefix_groups[_group_key(r)].append((rid, r))
 
         # Count how many groups of 2+ we'd create
         big_groups = [g for g in prefix_groups.values() if len(g) >= 2]
@@ -273,9 +302,10 @@ def _collapse_resources(resources: dict, edges: list) -> tuple[dict, dict]:
                 collapse_map[rid] = collapsed_id
         else:
             ungrouped: list[tuple[str, dict]] = []
-            for prefix, group in prefix_groups.items():
+            for (tag_key, prefix), group in prefix_groups.items():
                 if len(group) >= 2:
-                    collapsed_id, collapsed_node = _make_collapsed_node(rtype, prefix, group)
+                    collapsed_id, collapsed_node = _make_collapsed_node(
+                        rtype, prefix, group, tag_key=tag_key)
                     visible[collapsed_id] = collapsed_node
                     for rid, _ in group:
                         collapse_map[rid] = collapsed_id
@@ -302,25 +332,48 @@ def _collapse_resources(resources: dict, edges: list) -> tuple[dict, dict]:
 # Subnet classification
 # ---------------------------------------------------------------------------
 
-def _is_public_subnet(resource: dict, edges: list, resources: dict) -> bool:
-    """Determine if a subnet is public based on name or attached IGW."""
+def _is_public_subnet(resource: dict, igw_vpcs: set) -> bool:
+    """Determine if a subnet is public based on name or an IGW attached to its VPC."""
     name = resource.get("name", "").lower()
     if any(kw in name for kw in ("public", "pub-", "dmz", "external")):
         return True
     if any(kw in name for kw in ("private", "priv-", "internal", "data")):
         return False
-    # Check if any IGW is connected via the same VPC
-    vpc_id = resource.get("properties", {}).get("vpc_id", "")
-    if vpc_id:
+    return resource.get("properties", {}).get("vpc_id", "") in igw_vpcs
+
+
+class _LayoutIndex:
+    """Everything the layout needs from the edge list, gathered in one pass.
+
+    - ``connected_ids``: endpoints of non-contains edges (never collapsed)
+    - ``igw_vpcs``: ``vpc_id`` properties found on "attached_to" edges that
+      involve an internet gateway (either end)
+    - ``contains``: (parent, child) pairs of "contains" edges, in edge order
+    """
+
+    __slots__ = ("connected_ids", "igw_vpcs", "contains")
+
+    def __init__(self, resources: dict, edges: list):
+        self.connected_ids: set[str] = set()
+        self.igw_vpcs: set[str] = set()
+        self.contains: list[tuple[str, str]] = []
         for e in edges:
-            if e["edge_type"] == "attached_to":
-                src = resources.get(e["source_id"], {})
-                tgt = resources.get(e["target_id"], {})
-                if src.get("resource_type") == "internet_gateway" or tgt.get("resource_type") == "internet_gateway":
-                    igw_vpc = src.get("properties", {}).get("vpc_id", "") or tgt.get("properties", {}).get("vpc_id", "")
-                    if igw_vpc == vpc_id:
-                        return True
-    return False
+            src, tgt = e["source_id"], e["target_id"]
+            edge_type = e["edge_type"]
+            if edge_type == "contains":
+                self.contains.append((src, tgt))
+                continue
+            self.connected_ids.add(src)
+            self.connected_ids.add(tgt)
+            if edge_type != "attached_to":
+                continue
+            src_r = resources.get(src, {})
+            tgt_r = resources.get(tgt, {})
+            if "internet_gateway" in (src_r.get("resource_type"), tgt_r.get("resource_type")):
+                igw_vpc = (src_r.get("properties", {}).get("vpc_id", "")
+                           or tgt_r.get("properties", {}).get("vpc_id", ""))
+                if igw_vpc:
+                    self.igw_vpcs.add(igw_vpc)
 
 
 # ---------------------------------------------------------------------------
@@ -351,19 +404,38 @@ class AlgorithmicLayoutEngine:
         5: 0,      # Ops (positioned dynamically)
     }
 
+    VPC_GAP_Y = 40  # between stacked VPCs (incremental layout)
+    GLOBAL_STEP_Y = NODE_H + NODE_GAP_Y * 3  # zone 0 column spacing
+
+    # Part of the layout cache key: bump when the algorithm changes
+    LAYOUT_VERSION = 2
+
+    def options(self) -> dict:
+        """Everything besides the graph that determines the layout."""
+        return {
+            "version": self.LAYOUT_VERSION,
+            "node": [self.NODE_W, self.NODE_H, self.NODE_GAP_X, self.NODE_GAP_Y],
+            "pad": [self.PAD, self.PAD_TOP],
+            "zone_gap": self.ZONE_GAP,
+            "collapse": {"group_tags": list(GROUP_TAG_KEYS)},
+        }
+
     def layout(self, graph_dict: dict) -> tuple[dict, dict, dict]:
         """Returns (positions_dict, collapse_map, visible_resources)."""
         resources = graph_dict.get("resources", {})
         edges = graph_dict.get("edges", [])
 
         if not resources:
-            return {}, {}
+            return {}, {}, {}
+
+        # Step 0: One pass over the edges; everything below is linear in N + E
+        index = _LayoutIndex(resources, edges)
 
         # Step 1: Collapse similar resources
-        visible, collapse_map = _collapse_resources(resources, edges)
+        visible, collapse_map = _collapse_resources(resources, edges, index.connected_ids)
 
         # Step 2: Build containment (VPC -> subnet -> resources)
-        vpc_subnets, subnet_resources = self._build_containment(visible, edges)
+        vpc_subnets, subnet_resources = self._build_containment(visible, index.contains)
 
         # Step 3: Classify non-contained resources by zone
         contained_ids = set()
@@ -392,7 +464,7 @@ class AlgorithmicLayoutEngine:
 
         for vpc_id, subnet_ids in vpc_subnets.items():
             vpc_pos = self._layout_vpc(
-                vpc_id, subnet_ids, subnet_resources, visible, edges, resources
+                vpc_id, subnet_ids, subnet_resources, visible, index.igw_vpcs
             )
             # Offset VPC to its position
             for nid, pos in vpc_pos.items():
@@ -418,7 +490,7 @@ class AlgorithmicLayoutEngine:
                 "width": self.NODE_W, "height": self.NODE_H,
                 "group": None, "is_container": False,
             }
-            y_global += self.NODE_H + self.NODE_GAP_Y * 3
+            y_global += self.GLOBAL_STEP_Y
 
         # Layout zones outside VPC (stacked in columns right of VPC)
         # Zone 3 (data outside VPC): S3, DynamoDB etc that aren't in subnets
@@ -453,35 +525,49 @@ class AlgorithmicLayoutEngine:
 
         return positions, collapse_map, visible
 
-    def _build_containment(self, resources: dict, edges: list):
-        """Build VPC -> subnet -> resource containment from edges."""
+    def relayout(self, previous: tuple[dict, dict, dict], graph_dict: dict,
+                 diff: dict) -> tuple[dict, dict, dict]:
+        """Update ``previous`` (a layout() result) for ``diff`` without moving existing nodes.
+
+        ``diff`` lists the resource IDs ``added`` to and ``removed`` from the
+        graph the previous layout was made for, plus the new ``contains`` edges
+        as [parent, child] pairs and the ``connected`` endpoints of other
+        edges touching added resources (derived from the graph's edges when
+        absent). Removed nodes leave a gap; new ones go into a free slot of
+        their subnet, their collapsed group (unless connected, as in
+        _collapse_resources) or the end of their zone column; connected
+        resources leave their collapsed group the same way. Only the
+        containers that must make room grow, and anything below them inside
+        their parent shifts down by the same amount. ``previous`` is left
+        untouched.
+        """
+        if diff.get("connected") is None:
+            added = set(diff.get("added", []))
+            connected: set[str] = set()
+            for e in graph_dict.get("edges", []):
+                if e["edge_type"] != "contains" and (e["source_id"] in added or e["target_id"] in added):
+                    connected.update((e["source_id"], e["target_id"]))
+            diff = {**diff, "connected": connected}
+        return _IncrementalLayout(self, previous, graph_dict.get("resources", {})).apply(diff)
+
+    def _build_containment(self, resources: dict, contains: list[tuple[str, str]]):
+        """Build VPC -> subnet -> resource containment from "contains" pairs."""
         vpc_subnets: dict[str, list[str]] = defaultdict(list)
         subnet_resources: dict[str, list[str]] = defaultdict(list)
 
-        # VPC contains subnet
-        for e in edges:
-            if e["edge_type"] != "contains":
-                continue
-            src = resources.get(e["source_id"])
-            tgt = resources.get(e["target_id"])
-            if not src or not tgt:
-                continue
-            if src.get("resource_type") == "vpc" and tgt.get("resource_type") == "subnet":
-                vpc_subnets[e["source_id"]].append(e["target_id"])
-
-        # Assign non-structural resources to subnets based on "contains" edges
-        # or infer from VPC/subnet properties
+        # VPC contains subnet; subnet contains non-structural resources
         resource_subnet = {}
-        for e in edges:
-            if e["edge_type"] != "contains":
-                continue
-            src = resources.get(e["source_id"])
-            tgt = resources.get(e["target_id"])
+        for src_id, tgt_id in contains:
+            src = resources.get(src_id)
+            tgt = resources.get(tgt_id)
             if not src or not tgt:
                 continue
-            if src.get("resource_type") == "subnet" and tgt.get("resource_type") not in STRUCTURAL_TYPES:
-                subnet_resources[e["source_id"]].append(e["target_id"])
-                resource_subnet[e["target_id"]] = e["source_id"]
+            src_type, tgt_type = src.get("resource_type"), tgt.get("resource_type")
+            if src_type == "vpc" and tgt_type == "subnet":
+                vpc_subnets[src_id].append(tgt_id)
+            elif src_type == "subnet" and tgt_type not in STRUCTURAL_TYPES:
+                subnet_resources[src_id].append(tgt_id)
+                resource_subnet[tgt_id] = src_id
 
         # Also check resources that reference a subnet via properties
         for rid, r in resources.items():
@@ -495,8 +581,7 @@ class AlgorithmicLayoutEngine:
         return vpc_subnets, subnet_resources
 
     def _layout_vpc(self, vpc_id: str, subnet_ids: list[str],
-                    subnet_resources: dict, visible: dict, edges: list,
-                    all_resources: dict) -> dict:
+                    subnet_resources: dict, visible: dict, igw_vpcs: set) -> dict:
         """Layout a VPC with its subnets and contained resources."""
         positions = {}
         vpc_res = visible[vpc_id]
@@ -508,7 +593,7 @@ class AlgorithmicLayoutEngine:
             s = visible.get(sid)
             if not s:
                 continue
-            if _is_public_subnet(s, edges, all_resources):
+            if _is_public_subnet(s, igw_vpcs):
                 public_subnets.append(sid)
             else:
                 private_subnets.append(sid)
@@ -620,6 +705,273 @@ class AlgorithmicLayoutEngine:
         return positions
 
 
+class _IncrementalLayout:
+    """One relayout() run: copy-on-write edits of a previous layout."""
+
+    def __init__(self, engine: AlgorithmicLayoutEngine, previous: tuple[dict, dict, dict],
+                 resources: dict):
+        positions, collapse_map, visible = previous
+        self.e = engine
+        self.resources = resources
+        # Shallow copies; a position or collapsed node is copied before it changes
+        self.positions = dict(positions)
+        self.collapse_map = dict(collapse_map)
+        self.visible = dict(visible)
+        self._children: dict[str | None, list[str]] | None = None
+        self._columns: dict[int, tuple[float, float]] | None = None
+
+    # -- indexes, built on first use --
+
+    @property
+    def children(self) -> dict[str | None, list[str]]:
+        """Container ID (None: top level) -> IDs of the nodes placed in it."""
+        if self._children is None:
+            self._children = defaultdict(list)
+            for nid, pos in self.positions.items():
+                self._children[pos.get("group")].append(nid)
+        return self._children
+
+    @property
+    def columns(self) -> dict[int, tuple[float, float]]:
+        """Zone -> (x, bottom) of its column of top-level nodes."""
+        if self._columns is None:
+            self._columns = {}
+            for nid in self.children[None]:
+                pos = self.positions[nid]
+                r = self.visible.get(nid)
+                if pos.get("is_container") or r is None:
+                    continue
+                zone = RESOURCE_TYPE_ZONE.get(r["resource_type"], 3)
+                x, bottom = self._columns.get(zone, (pos["x"], 0))
+                self._columns[zone] = (x, max(bottom, pos["y"] + pos["height"]))
+        return self._columns
+
+    def _edit(self, nid: str) -> dict:
+        pos = dict(self.positions[nid])
+        self.positions[nid] = pos
+        return pos
+
+    def _place(self, nid: str, pos: dict):
+        self.positions[nid] = pos
+        self.children[pos.get("group")].append(nid)
+
+    def _descendants(self, nid: str) -> list[str]:
+        out, stack = [], [nid]
+        while stack:
+            for child in self.children.get(stack.pop(), []):
+                out.append(child)
+                stack.append(child)
+        return out
+
+    # -- diff application --
+
+    def apply(self, diff: dict) -> tuple[dict, dict, dict]:
+        # Nodes that stay keep their place but show their current data
+        for rid in self.visible:
+            r = self.resources.get(rid)
+            if r is not None:
+                self.visible[rid] = r
+        removed = set(diff.get("removed", []))
+        parents = {child: parent for parent, child in diff.get("contains", [])}
+        self.connected = set(diff.get("connected", ()))
+        orphans: list[str] = []
+        for rid in removed:
+            orphans += self._remove(rid)
+        # Collapsed resources that gained an edge are shown individually
+        ungrouped = [rid for rid in self.connected
+                     if rid in self.collapse_map and rid not in removed]
+        for rid in ungrouped:
+            self._leave_group(rid)
+        added = [rid for rid in dict.fromkeys([*diff.get("added", []), *orphans, *ungrouped])
+                 if rid in self.resources and rid not in removed and rid not in self.positions
+                 and rid not in self.collapse_map]
+        # Containers first, so their contents have somewhere to go
+        rank = {"vpc": 0, "subnet": 1}
+        added.sort(key=lambda rid: rank.get(self.resources[rid]["resource_type"], 2))
+        for rid in added:
+            self._add(rid, parents.get(rid))
+        return self.positions, self.collapse_map, self.visible
+
+    def _leave_group(self, rid: str):
+        """Take ``rid`` out of its collapsed group, dropping the group once empty."""
+        cid = self.collapse_map.pop(rid, None)
+        if cid is not None and cid in self.visible:
+            node = self.visible[cid]
+            members = [c for c in node["properties"]["_children"] if c != rid]
+            if members:
+                self._set_members(cid, members)
+            else:
+                self.visible.pop(cid)
+                self._unplace(cid)
+
+    def _remove(self, rid: str) -> list[str]:
+        """Drop ``rid``; returns the still-present nodes that were placed inside it."""
+        self._leave_group(rid)
+        self.visible.pop(rid, None)
+        if rid not in self.positions:
+            return []
+        orphans = [nid for nid in self._descendants(rid) if nid in self.resources]
+        for nid in [*self._descendants(rid), rid]:
+            self._unplace(nid)
+        return orphans
+
+    def _unplace(self, nid: str):
+        pos = self.positions.pop(nid, None)
+        if pos is not None:
+            siblings = self.children.get(pos.get("group"), [])
+            if nid in siblings:
+                siblings.remove(nid)
+
+    def _set_members(self, cid: str, members: list[str]):
+        node = dict(self.visible[cid])
+        node["properties"] = {**node["properties"], "_children": members, "_count": len(members)}
+        node["name"] = re.sub(r"\(\d+\)$", f"({len(members)})", node["name"])
+        self.visible[cid] = node
+
+    def _add(self, rid: str, parent: str | None):
+        r = self.resources[rid]
+        rtype = r["resource_type"]
+        props = r.get("properties", {})
+        if rtype == "vpc":
+            self.visible[rid] = r
+            self._add_vpc(rid)
+            return
+        if rtype == "subnet":
+            self.visible[rid] = r
+            vpc_id = props.get("vpc_id") or parent
+            if vpc_id in self.positions:
+                self._add_subnet(rid, vpc_id)
+            return
+        if rtype in STRUCTURAL_TYPES:
+            self.visible[rid] = r  # never positioned
+            return
+        cid = None if rid in self.connected else self._collapsed_group(r)
+        if cid is not None:
+            self.collapse_map[rid] = cid
+            self._set_members(cid, [*self.visible[cid]["properties"]["_children"], rid])
+            return
+        self.visible[rid] = r
+        subnet_id = parent if parent in self.positions else props.get("subnet_id", "")
+        subnet = self.positions.get(subnet_id)
+        if subnet is not None and subnet.get("group_type", "").endswith("subnet"):
+            self._add_to_subnet(rid, subnet_id)
+        else:
+            self._add_to_column(rid, RESOURCE_TYPE_ZONE.get(rtype, 3))
+
+    def _collapsed_group(self, r: dict) -> str | None:
+        rtype = r["resource_type"]
+        tag_key, value = _group_key(r)
+        group_id = f"collapsed_{rtype}_{tag_key}_{value}" if tag_key else f"collapsed_{rtype}_{value}"
+        for cid in (group_id, f"collapsed_{rtype}_"):
+            if cid in self.visible:
+                return cid
+        return None
+
+    def _node(self, x: float, y: float, group: str | None) -> dict:
+        return {"x": x, "y": y, "width": self.e.NODE_W, "height": self.e.NODE_H,
+                "group": group, "is_container": False}
+
+    def _add_vpc(self, vpc_id: str):
+        vpcs = [self.positions[n] for n in self.children[None]
+                if self.positions[n].get("group_type") == "vpc"]
+        y = max((p["y"] + p["height"] + self.e.VPC_GAP_Y for p in vpcs), default=50)
+        self._place(vpc_id, {"x": 300, "y": y, "width": 400, "height": 200, "group": None,
+                             "is_container": True, "group_type": "vpc"})
+
+    def _add_subnet(self, subnet_id: str, vpc_id: str):
+        e = self.e
+        vpc = self.positions[vpc_id]
+        subnets = [self.positions[n] for n in self.children[vpc_id]]
+        # A new AZ row under the existing ones
+        y = max((p["y"] + p["height"] + e.NODE_GAP_Y for p in subnets), default=vpc["y"] + e.PAD_TOP)
+        # The VPC has an IGW if the previous layout made a subnet public
+        # without its name saying so
+        igw_vpcs = set()
+        for n in self.children[vpc_id]:
+            sibling = self.visible.get(n)
+            if sibling and self.positions[n].get("group_type") == "public-subnet" \
+                    and not _is_public_subnet({"name": sibling.get("name", "")}, set()):
+                igw_vpcs.add(vpc_id)
+                break
+        public = _is_public_subnet(self.resources[subnet_id], igw_vpcs)
+        self._place(subnet_id, {
+            "x": vpc["x"] + e.PAD, "y": y, "width": 200, "height": 120, "group": vpc_id,
+            "is_container": True, "group_type": "public-subnet" if public else "private-subnet",
+        })
+        self._fit(vpc_id)
+
+    def _add_to_subnet(self, rid: str, subnet_id: str):
+        e = self.e
+        sub = self.positions[subnet_id]
+        step_x, step_y = e.NODE_W + e.NODE_GAP_X, e.NODE_H + e.NODE_GAP_Y
+        cols = max(1, min(3, int((sub["width"] - 2 * e.PAD + e.NODE_GAP_X) // step_x)))
+        taken = {
+            (round((p["x"] - sub["x"] - e.PAD) / step_x), round((p["y"] - sub["y"] - e.PAD_TOP) / step_y))
+            for p in (self.positions[n] for n in self.children[subnet_id])
+        }
+        slot = 0
+        while (slot % cols, slot // cols) in taken:
+            slot += 1
+        x = sub["x"] + e.PAD + (slot % cols) * step_x
+        y = sub["y"] + e.PAD_TOP + (slot // cols) * step_y
+        self._place(rid, self._node(x, y, subnet_id))
+        self._fit(subnet_id)
+
+    def _add_to_column(self, rid: str, zone: int):
+        e = self.e
+        step = e.GLOBAL_STEP_Y if zone == 0 else e.NODE_H + e.NODE_GAP_Y
+        if zone in self.columns:
+            x, bottom = self.columns[zone]
+            y = bottom + step - e.NODE_H
+        elif zone == 0:
+            x, y = 50, 80
+        else:
+            # A new column right of everything at the top level
+            right = max((self.positions[n]["x"] + self.positions[n]["width"]
+                         for n in self.children[None]), default=300)
+            x, y = right + e.ZONE_GAP, 80
+        self._place(rid, self._node(x, y, None))
+        self.columns[zone] = (x, y + e.NODE_H)
+
+    # -- growing containers --
+
+    def _fit(self, cid: str):
+        """Grow container ``cid`` to enclose its children, making room below it."""
+        e = self.e
+        pos = self.positions[cid]
+        bottom = max((self.positions[n]["y"] + self.positions[n]["height"]
+                      for n in self.children[cid]), default=pos["y"])
+        # As in _layout_vpc, a VPC keeps a row gap below its last AZ row
+        pad = e.PAD + (e.NODE_GAP_Y if pos.get("group_type") == "vpc" else 0)
+        needed = bottom + pad - (pos["y"] + pos["height"])
+        if needed > 0:
+            self._grow(cid, needed)
+
+    def _grow(self, cid: str, dh: float):
+        e = self.e
+        pos = self._edit(cid)
+        old_bottom = pos["y"] + pos["height"]
+        pos["height"] += dh
+        parent = pos.get("group")
+        gap = e.NODE_GAP_Y if parent else e.VPC_GAP_Y
+        # Containers below this one (in the same parent, overlapping horizontally)
+        below = [
+            n for n in self.children[parent]
+            if n != cid and self.positions[n].get("is_container")
+            and self.positions[n]["y"] >= old_bottom
+            and self.positions[n]["x"] < pos["x"] + pos["width"]
+            and pos["x"] < self.positions[n]["x"] + self.positions[n]["width"]
+        ]
+        if below:
+            shift = old_bottom + dh + gap - min(self.positions[n]["y"] for n in below)
+            if shift > 0:
+                for n in below:
+                    for moved in [n, *self._descendants(n)]:
+                        self._edit(moved)["y"] += shift
+        if parent in self.positions:
+            self._fit(parent)
+
+
 # ---------------------------------------------------------------------------
 # React Flow Converter
 # ---------------------------------------------------------------------------
@@ -750,30 +1102,50 @@ class ReactFlowConverter:
 # ---------------------------------------------------------------------------
 
 class DrawioXmlGenerator:
-    """Generate .drawio (mxfile) XML from graph + positions."""
+    """Generate .drawio (mxfile) XML from graph + positions.
+
+    stream() yields the document in chunks of about ``chunk_chars`` characters
+    while it walks the layout, so an export never holds more than one chunk of
+    XML; generate() joins them. With ``compressed``, the diagram is written in
+    draw.io's compressed form (base64 of the raw-deflated, URI-encoded
+    mxGraphModel), which draw.io opens like the plain one.
+    """
 
     def generate(self, graph_dict: dict, positions: dict, collapse_map: dict = None,
-                 visible_resources: dict | None = None) -> str:
-        resources = visible_resources or graph_dict.get("resources", {})
+                 visible_resources: dict | None = None, compressed: bool = False) -> str:
+        return "".join(self.stream(graph_dict, positions, collapse_map,
+                                   visible_resources=visible_resources, compressed=compressed))
+
+    def stream(self, graph_dict: dict, positions: dict, collapse_map: dict = None,
+               visible_resources: dict | None = None, compressed: bool = False,
+               chunk_chars: int = DRAWIO_CHUNK_CHARS) -> Iterator[str]:
+        cells = self._model(graph_dict, positions, collapse_map or {},
+                            visible_resources or graph_dict.get("resources", {}))
+        if compressed:
+            yield "<?xml version='1.0' encoding='utf-8'?>\n<mxfile compressed=\"true\">"
+            yield '<diagram name="AWS Architecture">'
+            yield from _deflate_base64(_chunked(cells, chunk_chars))
+        else:
+            yield "<?xml version='1.0' encoding='utf-8'?>\n<mxfile>"
+            yield '<diagram name="AWS Architecture">'
+            yield from _chunked(cells, chunk_chars)
+        yield "</diagram></mxfile>"
+
+    def _model(self, graph_dict: dict, positions: dict, collapse_map: dict,
+               resources: dict) -> Iterator[str]:
+        """The mxGraphModel element, one cell at a time."""
         edges_raw = graph_dict.get("edges", [])
-        collapse_map = collapse_map or {}
-
-        mxfile = ET.Element("mxfile")
-        diagram = ET.SubElement(mxfile, "diagram", name="AWS Architecture")
-        model = ET.SubElement(diagram, "mxGraphModel",
-                              dx="1422", dy="762", grid="1", gridSize="10",
-                              guides="1", tooltips="1", connect="1", arrows="1",
-                              fold="1", page="1", pageScale="1",
-                              pageWidth="1920", pageHeight="1080")
-        root = ET.SubElement(model, "root")
-        ET.SubElement(root, "mxCell", id="0")
-        ET.SubElement(root, "mxCell", id="1", parent="0")
+
+        yield ('<mxGraphModel dx="1422" dy="762" grid="1" gridSize="10" guides="1" '
+               'tooltips="1" connect="1" arrows="1" fold="1" page="1" pageScale="1" '
+               'pageWidth="1920" pageHeight="1080"><root>'
+               '<mxCell id="0" /><mxCell id="1" parent="0" />')
 
         cell_id = 2
         rid_to_cell: dict[str, str] = {}
 
         # Containers first
-        for rid, pos in sorted(positions.items(), key=lambda x: 0 if x[1].get("is_container") else 1):
+        for rid, pos in positions.items():
             if not pos.get("is_container"):
                 continue
             r = resources.get(rid)
@@ -794,14 +1166,7 @@ class DrawioXmlGenerator:
                 f"fillColor=none;strokeColor={color};fontColor={color};"
                 f"fontSize=12;fontStyle=1;"
             )
-
-            cell = ET.SubElement(root, "mxCell",
-                                 id=cid, value=r["name"], style=style,
-                                 vertex="1", parent=parent)
-            ET.SubElement(cell, "mxGeometry",
-                          x=str(pos["x"]), y=str(pos["y"]),
-                          width=str(pos["width"]), height=str(pos["height"]),
-                          **{"as": "geometry"})
+            yield _vertex_cell(cid, r["name"], style, parent, pos)
 
         # Regular nodes
         for rid, pos in positions.items():
@@ -829,14 +1194,7 @@ class DrawioXmlGenerator:
                 f"verticalLabelPosition=bottom;verticalAlign=top;"
                 f"align=center;fontSize=10;"
             )
-
-            cell = ET.SubElement(root, "mxCell",
-                                 id=cid, value=r["name"], style=style,
-                                 vertex="1", parent=parent)
-            ET.SubElement(cell, "mxGeometry",
-                          x=str(pos["x"]), y=str(pos["y"]),
-                          width=str(pos["width"]), height=str(pos["height"]),
-                          **{"as": "geometry"})
+            yield _vertex_cell(cid, r["name"], style, parent, pos)
 
         # Edges
         seen_edges = set()
@@ -865,10 +1223,58 @@ class DrawioXmlGenerator:
             elif e["edge_type"] == "routes_to":
                 style += f"strokeColor={AWS_COLORS['galaxy']};"
 
-            cell = ET.SubElement(root, "mxCell",
-                                 id=eid, value=e.get("label", ""), style=style,
-                                 edge="1", parent="1",
-                                 source=src_cell, target=tgt_cell)
-            ET.SubElement(cell, "mxGeometry", relative="1", **{"as": "geometry"})
-
-        return ET.tostring(mxfile, encoding="unicode", xml_declaration=True)
+            yield (f'<mxCell id="{eid}" value="{_xml_attr(e.get("label", ""))}" '
+                   f'style="{_xml_attr(style)}" edge="1" parent="1" '
+                   f'source="{src_cell}" target="{tgt_cell}">'
+                   f'<mxGeometry relative="1" as="geometry" /></mxCell>')
+
+        yield "</root></mxGraphModel>"
+
+
+# Same escaping as ElementTree applies to attribute values
+_XML_ATTR_ESCAPES = str.maketrans({
+    "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;",
+    "\r": "&#13;", "\n": "&#10;", "\t": "&#09;",
+})
+# Characters JavaScript's encodeURIComponent leaves alone (besides alphanumerics)
+_URI_COMPONENT_SAFE = "-_.!~*'()"
+
+
+def _xml_attr(value) -> str:
+    return str(value).translate(_XML_ATTR_ESCAPES)
+
+
+def _vertex_cell(cid: str, value, style: str, parent: str, pos: dict) -> str:
+    return (f'<mxCell id="{cid}" value="{_xml_attr(value)}" style="{_xml_attr(style)}" '
+            f'vertex="1" parent="{parent}">'
+            f'<mxGeometry x="{pos["x"]}" y="{pos["y"]}" '
+            f'width="{pos["width"]}" height="{pos["height"]}" as="geometry" /></mxCell>')
+
+
+def _chunked(fragments: Iterable[str], chunk_chars: int) -> Iterator[str]:
+    """Join small fragments into chunks of at least ``chunk_chars`` characters."""
+    buf: list[str] = []
+    size = 0
+    for fragment in fragments:
+        buf.append(fragment)
+        size += len(fragment)
+        if size >= chunk_chars:
+            yield "".join(buf)
+            buf.clear()
+            size = 0
+    if buf:
+        yield "".join(buf)
+
+
+def _deflate_base64(chunks: Iterable[str]) -> Iterator[str]:
+    """draw.io's diagram compression, incrementally: base64(deflateRaw(encodeURIComponent(xml)))."""
+    deflate = zlib.compressobj(9, zlib.DEFLATED, -15)
+    pending = b""
+    for chunk in chunks:
+        pending += deflate.compress(quote(chunk, safe=_URI_COMPONENT_SAFE).encode("ascii"))
+        # Encode whole 3-byte groups so no padding appears mid-stream
+        cut = len(pending) - len(pending) % 3
+        if cut:
+            yield base64.b64encode(pending[:cut]).decode("ascii")
+            pending = pending[cut:]
+    yield base64.b64encode(pending + deflate.flush()).decode("ascii")
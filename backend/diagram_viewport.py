@@ -0,0 +1,245 @@
+"""Level-of-detail views of a laid-out diagram, for React Flow on large graphs.
+
+ReactFlowConverter returns every visible node and edge at once, and React Flow
+slows down badly past a few thousand nodes. DiagramViewport indexes a converted
+diagram by the layout's (absolute) positions in a uniform grid and answers
+"what is in this rectangle at this zoom" with only that:
+
+- at ``LOD_DETAIL_ZOOM`` and above: the nodes whose box intersects the
+  rectangle, and the edges whose bounding box does, plus whatever those need to
+  render (edge endpoints, and the containers of every returned node);
+- below it: the containers, with the leaf nodes inside each container replaced
+  by aggregate nodes, one per grid cell of ``LOD_AGGREGATE_PX`` screen pixels,
+  labelled with their count and dominant service. Edges are rerouted to the
+  aggregates and merged.
+
+Items spanning more than ``GRID_MAX_CELLS`` cells (long edges, big VPCs) are
+kept in a side list that is scanned on every query instead of being copied into
+hundreds of cells.
+"""
+
+import math
+from collections import Counter, defaultdict
+
+from .diagram_generator import SERVICE_COLORS, SERVICE_ICONS
+
+GRID_CELL = 400  # px in layout coordinates
+GRID_MAX_CELLS = 64  # items spanning more cells go to the side list
+LOD_DETAIL_ZOOM = 0.5  # below this zoom leaves are aggregated
+LOD_AGGREGATE_PX = 240  # aggregate cell size on screen
+LOD_NODE_THRESHOLD = 2000  # diagrams with more nodes are served by viewport
+OVERVIEW_SCREEN_PX = (1600, 900)  # nominal screen size for the initial overview
+VIEWPORT_CACHE_ENTRIES = 4  # diagrams kept for viewport queries
+
+
+def _intersects(box: tuple, rect: tuple) -> bool:
+    return box[0] <= rect[2] and box[2] >= rect[0] and box[1] <= rect[3] and box[3] >= rect[1]
+
+
+class GridIndex:
+    """Uniform-grid spatial index of integer item ids by bounding box."""
+
+    def __init__(self, cell: float = GRID_CELL):
+        self.cell = cell
+        self._cells: dict[tuple[int, int], list[int]] = defaultdict(list)
+        self._wide: list[int] = []
+        self._boxes: dict[int, tuple] = {}
+
+    def _span(self, box: tuple) -> tuple[int, int, int, int]:
+        c = self.cell
+        return (math.floor(box[0] / c), math.floor(box[1] / c),
+                math.floor(box[2] / c), math.floor(box[3] / c))
+
+    def insert(self, item: int, box: tuple):
+        self._boxes[item] = box
+        x0, y0, x1, y1 = self._span(box)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > GRID_MAX_CELLS:
+            self._wide.append(item)
+            return
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self._cells[(cx, cy)].append(item)
+
+    def query(self, rect: tuple) -> set[int]:
+        """Ids of the items whose box intersects ``rect`` (x0, y0, x1, y1)."""
+        boxes = self._boxes
+        found = {item for item in self._wide if _intersects(boxes[item], rect)}
+        x0, y0, x1, y1 = self._span(rect)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self._cells):
+            # Rectangle larger than the occupied grid: walk the cells instead
+            cells = [items for (cx, cy), items in self._cells.items()
+                     if x0 <= cx <= x1 and y0 <= cy <= y1]
+        else:
+            cells = [self._cells[key] for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1)
+                     if (key := (cx, cy)) in self._cells]
+        for items in cells:
+            for item in items:
+                if item not in found and _intersects(boxes[item], rect):
+                    found.add(item)
+        return found
+
+
+class DiagramViewport:
+    """Viewport queries over one ReactFlowConverter result and its layout positions.
+
+    Returned node and edge dicts are shared with the converted diagram: treat
+    them as read-only.
+    """
+
+    def __init__(self, diagram: dict, positions: dict):
+        self.nodes: list[dict] = diagram["nodes"]
+        self.edges: list[dict] = diagram["edges"]
+        order = {node["id"]: i for i, node in enumerate(self.nodes)}
+        self._parent = [order.get(node.get("parentId"), -1) for node in self.nodes]
+        self._container = [node["type"] == "awsGroup" for node in self.nodes]
+        self._boxes = []
+        for node in self.nodes:
+            pos = positions[node["id"]]
+            self._boxes.append((pos["x"], pos["y"], pos["x"] + pos["width"], pos["y"] + pos["height"]))
+
+        self._node_index = GridIndex()
+        for i, box in enumerate(self._boxes):
+            self._node_index.insert(i, box)
+
+        # Edges by the box between their endpoints' centres
+        self._ends: list[tuple[int, int]] = []
+        self._edge_index = GridIndex()
+        for j, edge in enumerate(self.edges):
+            s, t = order.get(edge["source"]), order.get(edge["target"])
+            if s is None or t is None:
+                self._ends.append((-1, -1))  # never returned
+                continue
+            self._ends.append((s, t))
+            (sx, sy), (tx, ty) = self._center(s), self._center(t)
+            self._edge_index.insert(j, (min(sx, tx), min(sy, ty), max(sx, tx), max(sy, ty)))
+
+        tops = [box for box, parent in zip(self._boxes, self._parent) if parent < 0] or [(0, 0, 0, 0)]
+        self.bounds = (min(b[0] for b in tops), min(b[1] for b in tops),
+                       max(b[2] for b in tops), max(b[3] for b in tops))
+
+    def _center(self, i: int) -> tuple[float, float]:
+        x0, y0, x1, y1 = self._boxes[i]
+        return (x0 + x1) / 2, (y0 + y1) / 2
+
+    def info(self) -> dict:
+        return {"bounds": list(self.bounds), "total_nodes": len(self.nodes),
+                "total_edges": len(self.edges), "detail_zoom": LOD_DETAIL_ZOOM}
+
+    def overview(self, screen: tuple[float, float] = OVERVIEW_SCREEN_PX) -> dict:
+        """The whole diagram at the zoom that fits it on a ``screen`` (width, height) in pixels."""
+        x0, y0, x1, y1 = self.bounds
+        zoom = min(1.0, screen[0] / max(1.0, x1 - x0), screen[1] / max(1.0, y1 - y0))
+        return self.query(x0, y0, x1 - x0, y1 - y0, zoom)
+
+    def query(self, x: float, y: float, width: float, height: float, zoom: float) -> dict:
+        """Nodes and edges for the layout-coordinate rectangle at ``zoom``."""
+        rect = (x, y, x + width, y + height)
+        if zoom >= LOD_DETAIL_ZOOM:
+            return self._detail(rect)
+        return self._aggregated(rect, zoom)
+
+    def _with_ancestors(self, ids: set[int]) -> set[int]:
+        for i in list(ids):
+            parent = self._parent[i]
+            while parent >= 0 and parent not in ids:
+                ids.add(parent)
+                parent = self._parent[parent]
+        return ids
+
+    def _detail(self, rect: tuple) -> dict:
+        shown = self._node_index.query(rect)
+        edge_ids = sorted(self._edge_index.query(rect))
+        for j in edge_ids:
+            shown.update(self._ends[j])
+        self._with_ancestors(shown)
+        return {
+            "nodes": [self.nodes[i] for i in sorted(shown)],
+            "edges": [self.edges[j] for j in edge_ids],
+            "lod": "detail",
+        }
+
+    def _aggregated(self, rect: tuple, zoom: float) -> dict:
+        hits = self._node_index.query(rect)
+        shown = {i for i in hits if self._container[i]}
+        self._with_ancestors(shown)
+
+        # Leaves bucketed by container and aggregate cell
+        cell = LOD_AGGREGATE_PX / zoom
+        buckets: dict[tuple, list[int]] = defaultdict(list)
+        for i in hits:
+            if not self._container[i]:
+                cx, cy = self._center(i)
+                buckets[(self._parent[i], math.floor(cx / cell), math.floor(cy / cell))].append(i)
+
+        nodes = [self.nodes[i] for i in sorted(shown)]
+        stand_in: dict[int, str] = {}  # leaf -> id of the node standing in for it
+        for key, members in buckets.items():
+            if len(members) == 1:
+                i = members[0]
+                nodes.append(self.nodes[i])
+                stand_in[i] = self.nodes[i]["id"]
+                continue
+            node = self._aggregate_node(key, members)
+            nodes.append(node)
+            for i in members:
+                stand_in[i] = node["id"]
+        for i in shown:
+            stand_in[i] = self.nodes[i]["id"]
+
+        # Edges rerouted to the stand-ins, merged per pair
+        merged: dict[tuple[str, str], list[int]] = defaultdict(list)
+        for j in self._edge_index.query(rect):
+            s, t = self._ends[j]
+            src, tgt = stand_in.get(s), stand_in.get(t)
+            if src and tgt and src != tgt:
+                merged[(src, tgt)].append(j)
+        edges = []
+        for (src, tgt), edge_ids in merged.items():
+            first = self.edges[min(edge_ids)]
+            if len(edge_ids) == 1 and (first["source"], first["target"]) == (src, tgt):
+                edges.append(first)
+                continue
+            edges.append({
+                "id": f"lod:{src}->{tgt}",
+                "source": src,
+                "target": tgt,
+                "type": "smoothstep",
+                "animated": False,
+                "label": str(len(edge_ids)) if len(edge_ids) > 1 else first.get("label", ""),
+                "style": {"stroke": "#666666", "strokeWidth": 1.5},
+                "data": {"edgeType": "aggregate", "count": len(edge_ids)},
+            })
+        return {"nodes": nodes, "edges": edges, "lod": "aggregate"}
+
+    def _aggregate_node(self, key: tuple, members: list[int]) -> dict:
+        parent, cx, cy = key
+        services: Counter = Counter()
+        for i in members:
+            data = self.nodes[i]["data"]
+            services[data["service"]] += data.get("count", 1)
+        service, _ = services.most_common(1)[0]
+        count = sum(services.values())
+        boxes = [self._boxes[i] for i in members]
+        x0, y0 = min(b[0] for b in boxes), min(b[1] for b in boxes)
+        parent_id = self.nodes[parent]["id"] if parent >= 0 else ""
+        label = f"{count} {service}" if len(services) == 1 else f"{count} resources"
+        node = {
+            "id": f"lod:{parent_id}:{cx}:{cy}",
+            "type": "awsResource",
+            "position": {"x": x0, "y": y0},
+            "data": {
+                "label": label,
+                "resourceType": "aggregate",
+                "service": service,
+                "serviceColor": SERVICE_COLORS.get(service, "#71717a"),
+                "icon": SERVICE_ICONS.get(service, "\u2601\uFE0F"),
+                "count": count,
+                "collapsed": True,
+                "properties": {"services": dict(services)},
+                "tags": {},
+            },
+        }
+        if parent_id:
+            node["parentId"] = parent_id
+            node["extent"] = "parent"
+        return node
@@ -45,9 +45,10 @@ class EventBus:
 
     # --- Broadcast ---
     def send(self, event: str, data: dict):
+        # Serialize once; the WebSocket envelope reuses the encoded data
         msg = json.dumps(data)
         sse_msg = f"event: {event}\ndata: {msg}\n\n"
-        ws_msg = json.dumps({"event": event, "data": data})
+        ws_msg = f'{{"event": {json.dumps(event)}, "data": {msg}}}'
 
         with self.lock:
             for q in self.sse_clients:
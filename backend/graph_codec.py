@@ -0,0 +1,113 @@
+"""Compact wire format for scan graphs, served by scan ID instead of over the event stream.
+
+The payload is a JSON document (encoded with orjson when it is installed),
+gzip-compressed:
+
+    {
+      "v": 1,
+      "strings": [...],                  # resource types, services, regions, edge types/labels
+      "resources": [[id, arn, type, service, name, region, properties, tags], ...],
+      "edges": [src, dst, type, label, src, dst, type, label, ...],
+      "scan_errors": [...], "scan_meta": {...}, "profile": ..., "region": ..., "account_id": ...
+    }
+
+``type``/``service``/``region`` and edge ``type``/``label`` are indices into
+``strings``; edge ``src``/``dst`` are positions in ``resources``. Empty
+properties and tags are sent as null. ``decode_graph`` (and decodeGraph in the
+frontend) turn a payload back into the InfraGraph.to_dict() shape.
+"""
+
+import gzip
+import json
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+from .compact_graph import CompactGraph
+
+WIRE_VERSION = 1
+GZIP_LEVEL = 6  # level 9 is ~3x slower for a few percent smaller payloads
+
+
+def _dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _loads(data: bytes):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def encode_graph(graph: CompactGraph) -> bytes:
+    """Gzip-compressed wire payload for a stored graph."""
+    strings: list[str] = []
+    index: dict[str, int] = {}
+
+    def ref(value: str) -> int:
+        idx = index.get(value)
+        if idx is None:
+            idx = index[value] = len(strings)
+            strings.append(value)
+        return idx
+
+    resources = [
+        [cr.id, cr.arn, ref(cr.resource_type), ref(cr.service), cr.name, ref(cr.region),
+         cr.properties, cr.tags]
+        for cr in graph.resources
+    ]
+    # The graph's own edge-type/label tables become slices of the shared table
+    type_refs = [ref(s) for s in graph.types.strings]
+    label_refs = [ref(s) for s in graph.labels.strings]
+    edges: list[int] = []
+    for src, dst, edge_type, label in zip(graph.edge_src, graph.edge_dst,
+                                          graph.edge_type, graph.edge_label):
+        edges += (src, dst, type_refs[edge_type], label_refs[label])
+
+    payload = {
+        "v": WIRE_VERSION,
+        "strings": strings,
+        "resources": resources,
+        "edges": edges,
+        "scan_errors": graph.scan_errors,
+        "scan_meta": graph.scan_meta,
+        "profile": graph.profile,
+        "region": graph.region,
+        "account_id": graph.account_id,
+    }
+    return gzip.compress(_dumps(payload), compresslevel=GZIP_LEVEL)
+
+
+def decode_graph(data: bytes) -> dict:
+    """Inverse of encode_graph: the InfraGraph.to_dict() payload."""
+    wire = _loads(gzip.decompress(data))
+    if wire.get("v") != WIRE_VERSION:
+        raise ValueError(f"Unsupported graph wire version: {wire.get('v')}")
+    strings = wire["strings"]
+    resources = {}
+    ids = []
+    for rid, arn, rtype, service, name, region, props, tags in wire["resources"]:
+        ids.append(rid)
+        resources[rid] = {
+            "id": rid, "arn": arn, "resource_type": strings[rtype], "service": strings[service],
+            "name": name, "region": strings[region], "properties": props or {}, "tags": tags or {},
+        }
+    flat = wire["edges"]
+    edges = [
+        {"source_id": ids[flat[i]], "target_id": ids[flat[i + 1]],
+         "edge_type": strings[flat[i + 2]], "label": strings[flat[i + 3]]}
+        for i in range(0, len(flat), 4)
+    ]
+    return {
+        "resources": resources,
+        "edges": edges,
+        "scan_errors": wire["scan_errors"],
+        "scan_meta": wire["scan_meta"],
+        "profile": wire["profile"],
+        "region": wire["region"],
+        "account_id": wire["account_id"],
+    }
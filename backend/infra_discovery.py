@@ -1,23 +1,34 @@
 """AWS Infrastructure Discovery — scans resources and relationships across 17 services.
 
-Uses a scanner registry pattern with boto3 paginators. Each scanner populates an InfraGraph
-with DiscoveredResource nodes and ResourceEdge connections.
+Uses a scanner registry pattern with boto3 paginators. Discovery runs in two phases:
+each scanner fills its own InfraGraph fragment with DiscoveredResource nodes and
+unresolved ResourceLink references (IDs, ARNs, DNS names); once every scanner has
+finished, the fragments are merged and the links are joined into ResourceEdges.
 """
 
+import contextvars
 import time
 import logging
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
-from typing import Callable
+from typing import Callable, Iterable, Iterator
 
 from botocore.exceptions import ClientError
 
+from . import scan_control, scan_metrics, tag_hydration
+from .scan_control import DEFAULT_SCANNER_TIMEOUT, ScanCancelled, ScanControl, ScanTimeout
+from .rate_limit import call_with_retry, paginate_with_retry
+
 log = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
 # Data classes
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class DiscoveredResource:
     id: str
     arn: str
@@ -29,7 +40,7 @@ class DiscoveredResource:
     tags: dict = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class ResourceEdge:
     source_id: str
     target_id: str
@@ -37,41 +48,306 @@ class ResourceEdge:
     label: str = ""
 
 
+@dataclass(slots=True)
+class ResourceLink:
+    """A reference recorded by a scanner, resolved into a ResourceEdge after discovery.
+
+    Each end is looked up by ``*_kind``: ``id`` (resource ID), ``arn`` or ``dns``
+    (load balancer / CloudFront domain name).
+    """
+    source: str
+    target: str
+    edge_type: str
+    label: str = ""
+    source_kind: str = "id"
+    target_kind: str = "id"
+    service: str = ""  # scanner that recorded the link
+    resolved: bool = field(default=False, compare=False)
+    edge_key: tuple = field(default=(), compare=False, repr=False)
+
+
+def _normalize_dns(name: str) -> str:
+    name = name.lower().rstrip(".")
+    return name[len("dualstack."):] if name.startswith("dualstack.") else name
+
+
 @dataclass
 class InfraGraph:
+    """Resources, edges and pending links, with secondary indexes kept in step.
+
+    Mutate through add_resource/add_edge/merge/resolve_links/replace_services so
+    the indexes (by type, ARN, DNS name, VPC, subnet and edge adjacency) stay
+    current; call reindex() after writing ``resources``/``edges`` directly.
+    """
     resources: dict[str, DiscoveredResource] = field(default_factory=dict)
     edges: list[ResourceEdge] = field(default_factory=list)
+    links: list[ResourceLink] = field(default_factory=list)
     scan_errors: list[dict] = field(default_factory=list)
+    scan_meta: dict = field(default_factory=dict)
     profile: str = ""
     region: str = ""
     account_id: str = ""
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    # Secondary indexes — resource IDs kept in insertion order (dicts as ordered sets)
+    _by_type: dict[str, dict[str, None]] = field(default_factory=dict, repr=False, compare=False)
+    _by_arn: dict[str, str] = field(default_factory=dict, repr=False, compare=False)
+    _by_dns: dict[str, str] = field(default_factory=dict, repr=False, compare=False)
+    _by_vpc: dict[str, dict[str, None]] = field(default_factory=dict, repr=False, compare=False)
+    _by_subnet: dict[str, dict[str, None]] = field(default_factory=dict, repr=False, compare=False)
+    _out: dict[str, list[ResourceEdge]] = field(default_factory=dict, repr=False, compare=False)
+    _in: dict[str, list[ResourceEdge]] = field(default_factory=dict, repr=False, compare=False)
+    _edge_keys: set[tuple] = field(default_factory=set, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.resources or self.edges:
+            self.reindex()
+
+    # -- index maintenance (callers hold the lock) --
+
+    def _index(self, r: DiscoveredResource):
+        self._by_type.setdefault(r.resource_type, {})[r.id] = None
+        if r.arn:
+            self._by_arn[r.arn] = r.id
+        dns = r.properties.get("dns") or r.properties.get("domain")
+        if dns:
+            self._by_dns[_normalize_dns(dns)] = r.id
+        if r.properties.get("vpc_id"):
+            self._by_vpc.setdefault(r.properties["vpc_id"], {})[r.id] = None
+        if r.properties.get("subnet_id"):
+            self._by_subnet.setdefault(r.properties["subnet_id"], {})[r.id] = None
+
+    def _unindex(self, r: DiscoveredResource):
+        self._by_type.get(r.resource_type, {}).pop(r.id, None)
+        if self._by_arn.get(r.arn) == r.id:
+            del self._by_arn[r.arn]
+        dns = r.properties.get("dns") or r.properties.get("domain")
+        if dns and self._by_dns.get(_normalize_dns(dns)) == r.id:
+            del self._by_dns[_normalize_dns(dns)]
+        self._by_vpc.get(r.properties.get("vpc_id", ""), {}).pop(r.id, None)
+        self._by_subnet.get(r.properties.get("subnet_id", ""), {}).pop(r.id, None)
+
+    def _put(self, r: DiscoveredResource):
+        old = self.resources.get(r.id)
+        if old is not None:
+            self._unindex(old)
+        self.resources[r.id] = r
+        self._index(r)
+
+    def _index_edge(self, e: ResourceEdge):
+        self._out.setdefault(e.source_id, []).append(e)
+        self._in.setdefault(e.target_id, []).append(e)
+        self._edge_keys.add((e.source_id, e.target_id, e.edge_type))
+
+    def _reindex_edges(self):
+        self._out, self._in, self._edge_keys = {}, {}, set()
+        for e in self.edges:
+            self._index_edge(e)
+
+    def reindex(self):
+        """Rebuild every index from ``resources`` and ``edges``."""
+        with self._lock:
+            self._by_type, self._by_arn, self._by_dns = {}, {}, {}
+            self._by_vpc, self._by_subnet = {}, {}
+            for r in self.resources.values():
+                self._index(r)
+            self._reindex_edges()
+
+    # -- mutation --
 
     def add_resource(self, r: DiscoveredResource):
-        self.resources[r.id] = r
+        with self._lock:
+            self._put(r)
 
     def add_edge(self, source_id: str, target_id: str, edge_type: str, label: str = ""):
-        self.edges.append(ResourceEdge(source_id, target_id, edge_type, label))
-
-    def to_dict(self) -> dict:
-        return {
-            "resources": {
-                rid: {
-                    "id": r.id, "arn": r.arn, "resource_type": r.resource_type,
-                    "service": r.service, "name": r.name, "region": r.region,
-                    "properties": r.properties, "tags": r.tags,
-                }
-                for rid, r in self.resources.items()
-            },
-            "edges": [
-                {"source_id": e.source_id, "target_id": e.target_id,
-                 "edge_type": e.edge_type, "label": e.label}
-                for e in self.edges
-            ],
+        with self._lock:
+            edge = ResourceEdge(source_id, target_id, edge_type, label)
+            self.edges.append(edge)
+            self._index_edge(edge)
+
+    def link(self, source: str, target: str, edge_type: str, label: str = "",
+             source_kind: str = "id", target_kind: str = "id"):
+        """Record a reference to be resolved into an edge by resolve_links()."""
+        if source and target:
+            self.links.append(ResourceLink(source, target, edge_type, label,
+                                           source_kind, target_kind))
+
+    def merge(self, fragment: "InfraGraph", service: str = ""):
+        """Add a scanner's fragment (resources, links, errors) to this graph."""
+        with self._lock:
+            for r in fragment.resources.values():
+                self._put(r)
+            for lk in fragment.links:
+                lk.service = lk.service or service
+                self.links.append(lk)
+            for e in fragment.edges:
+                self.edges.append(e)
+                self._index_edge(e)
+            self.scan_errors.extend(fragment.scan_errors)
+
+    def resolve_links(self) -> list[ResourceEdge]:
+        """Join unresolved links against the resource indexes.
+
+        Links whose ends are not (yet) in the graph stay pending, so this can be
+        called again after more fragments are merged; each call only costs the
+        pending links. Returns the new edges.
+        """
+        with self._lock:
+            lookup = {"id": self.resources, "arn": self._by_arn, "dns": self._by_dns}
+
+            def _find(kind: str, ref: str) -> str | None:
+                if kind == "id":
+                    return ref if ref in self.resources else None
+                return lookup[kind].get(_normalize_dns(ref) if kind == "dns" else ref)
+
+            new_edges = []
+            for lk in self.links:
+                if lk.resolved:
+                    continue
+                src = _find(lk.source_kind, lk.source)
+                tgt = _find(lk.target_kind, lk.target)
+                if not src or not tgt:
+                    continue
+                key = (src, tgt, lk.edge_type)
+                lk.resolved = True
+                lk.edge_key = key
+                if key in self._edge_keys:
+                    continue
+                edge = ResourceEdge(src, tgt, lk.edge_type, lk.label)
+                self.edges.append(edge)
+                self._index_edge(edge)
+                new_edges.append(edge)
+            return new_edges
+
+    def replace_services(self, services: list[str], fresh: "InfraGraph") -> list[ResourceEdge]:
+        """Swap the resources and links of ``services`` for a fresh scan of them.
+
+        Every link touches a resource of the scanner that recorded it, so dropping
+        the edges around the old resources removes all edges those services made.
+        Only the fresh links, and older links that pointed at replaced resources,
+        are resolved again. Returns the new edges.
+        """
+        replaced = set(services)
+        with self._lock:
+            removed = {rid for rid, r in self.resources.items() if r.service in replaced}
+            for rid in removed:
+                self._unindex(self.resources.pop(rid))
+            removed_keys = set()
+            kept_edges = []
+            for e in self.edges:
+                if e.source_id in removed or e.target_id in removed:
+                    removed_keys.add((e.source_id, e.target_id, e.edge_type))
+                else:
+                    kept_edges.append(e)
+            self.edges = kept_edges
+            self._reindex_edges()
+            self.links = [lk for lk in self.links if lk.service not in replaced]
+            for lk in self.links:
+                if lk.resolved and lk.edge_key in removed_keys:
+                    lk.resolved = False
+            self.scan_errors = [e for e in self.scan_errors if e.get("service") not in replaced]
+        self.merge(fresh)
+        return self.resolve_links()
+
+    # -- queries --
+
+    def _resolve_ids(self, ids) -> list[DiscoveredResource]:
+        return [self.resources[rid] for rid in ids if rid in self.resources]
+
+    def of_type(self, *resource_types: str) -> list[DiscoveredResource]:
+        with self._lock:
+            return [r for t in resource_types
+                    for r in self._resolve_ids(self._by_type.get(t, ()))]
+
+    def by_arn(self, arn: str) -> DiscoveredResource | None:
+        with self._lock:
+            rid = self._by_arn.get(arn)
+            return self.resources.get(rid) if rid else None
+
+    def by_dns(self, name: str) -> DiscoveredResource | None:
+        with self._lock:
+            rid = self._by_dns.get(_normalize_dns(name))
+            return self.resources.get(rid) if rid else None
+
+    def in_vpc(self, vpc_id: str) -> list[DiscoveredResource]:
+        """Resources whose ``vpc_id`` property is ``vpc_id``."""
+        with self._lock:
+            return self._resolve_ids(self._by_vpc.get(vpc_id, ()))
+
+    def in_subnet(self, subnet_id: str) -> list[DiscoveredResource]:
+        """Resources whose ``subnet_id`` property is ``subnet_id``."""
+        with self._lock:
+            return self._resolve_ids(self._by_subnet.get(subnet_id, ()))
+
+    def out_edges(self, rid: str) -> list[ResourceEdge]:
+        with self._lock:
+            return list(self._out.get(rid, ()))
+
+    def in_edges(self, rid: str) -> list[ResourceEdge]:
+        with self._lock:
+            return list(self._in.get(rid, ()))
+
+    def to_dict(self, include_links: bool = False) -> dict:
+        d = {
+            **graph_delta(self.resources, self.edges),
             "scan_errors": self.scan_errors,
+            "scan_meta": self.scan_meta,
             "profile": self.profile,
             "region": self.region,
             "account_id": self.account_id,
         }
+        if include_links:
+            d["links"] = [
+                {"source": lk.source, "target": lk.target, "edge_type": lk.edge_type,
+                 "label": lk.label, "source_kind": lk.source_kind,
+                 "target_kind": lk.target_kind, "service": lk.service}
+                for lk in self.links
+            ]
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "InfraGraph":
+        """Rebuild a graph from to_dict() output (links are re-resolved, not trusted)."""
+        graph = cls(
+            scan_errors=list(d.get("scan_errors", [])),
+            scan_meta=dict(d.get("scan_meta", {})),
+            profile=d.get("profile", ""), region=d.get("region", ""),
+            account_id=d.get("account_id", ""),
+        )
+        for rid, r in d.get("resources", {}).items():
+            # Intern the strings repeated across thousands of parsed resources
+            graph.resources[rid] = DiscoveredResource(
+                id=r["id"], arn=r.get("arn", ""), resource_type=sys.intern(r["resource_type"]),
+                service=sys.intern(r["service"]), name=r.get("name", rid),
+                region=sys.intern(r.get("region", "")),
+                properties=r.get("properties", {}), tags=r.get("tags", {}),
+            )
+        graph.edges = [
+            ResourceEdge(e["source_id"], e["target_id"], sys.intern(e["edge_type"]),
+                         e.get("label", ""))
+            for e in d.get("edges", [])
+        ]
+        graph.links = [ResourceLink(**lk) for lk in d.get("links", [])]
+        graph.reindex()
+        return graph
+
+
+def graph_delta(resources: dict[str, DiscoveredResource], edges: list[ResourceEdge]) -> dict:
+    """Serialize a set of resources and edges (a whole graph or a scan delta)."""
+    return {
+        "resources": {
+            rid: {
+                "id": r.id, "arn": r.arn, "resource_type": r.resource_type,
+                "service": r.service, "name": r.name, "region": r.region,
+                "properties": r.properties, "tags": r.tags,
+            }
+            for rid, r in resources.items()
+        },
+        "edges": [
+            {"source_id": e.source_id, "target_id": e.target_id,
+             "edge_type": e.edge_type, "label": e.label}
+            for e in edges
+        ],
+    }
 
 
 # ---------------------------------------------------------------------------
@@ -89,7 +365,23 @@ def register_scanner(service_name: str):
     return decorator
 
 
-MAX_RESOURCES_PER_TYPE = 500
+def scanner_names() -> list[str]:
+    return list(_SCANNERS)
+
+
+MAX_RESOURCES_PER_TYPE = 500  # default listing cap per resource type; 0 = no cap
+# Types that used to be capped lower than the default inside their scanner
+DEFAULT_TYPE_LIMITS = {
+    "iam_role": 100,
+    "kms_key": 100,
+    "log_group": 200,
+    "cloudwatch_alarm": 200,
+}
+DEFAULT_SCAN_WORKERS = 8
+DEFAULT_ENRICH_WORKERS = 8  # concurrent per-item calls within one scanner
+
+# Account-wide services: the same resources are returned whatever the region
+GLOBAL_SERVICES = ("S3", "CloudFront", "Route53", "IAM")
 
 
 def _extract_tags(tag_list: list[dict] | None) -> dict:
@@ -103,32 +395,22 @@ def _tag_name(tags: dict) -> str:
     return tags.get("Name", "")
 
 
-def _paginate(client, method: str, key: str, **kwargs) -> list:
-    """Paginate a boto3 API call, returning up to MAX_RESOURCES_PER_TYPE items."""
-    results = []
-    try:
-        paginator = client.get_paginator(method)
-        for page in paginator.paginate(**kwargs):
-            results.extend(page.get(key, []))
-            if len(results) >= MAX_RESOURCES_PER_TYPE:
-                results = results[:MAX_RESOURCES_PER_TYPE]
-                break
-    except ClientError as e:
-        if e.response["Error"]["Code"] == "Throttling":
-            time.sleep(2)
-            # Retry once
-            try:
-                paginator = client.get_paginator(method)
-                for page in paginator.paginate(**kwargs):
-                    results.extend(page.get(key, []))
-                    if len(results) >= MAX_RESOURCES_PER_TYPE:
-                        results = results[:MAX_RESOURCES_PER_TYPE]
-                        break
-            except Exception:
-                raise
-        else:
-            raise
-    return results
+def _page_items(page: dict, key: str) -> list:
+    """Items of a response page; ``key`` may be a dotted path ("DistributionList.Items")."""
+    for part in key.split("."):
+        page = page.get(part) or {}
+    return page or []
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 
 
 # ---------------------------------------------------------------------------
@@ -136,13 +418,12 @@ def _paginate(client, method: str, key: str, **kwargs) -> list:
 # ---------------------------------------------------------------------------
 
 @register_scanner("VPC")
-def scan_vpc(svc: "InfraDiscoveryService"):
-    ec2 = svc.session.client("ec2", region_name=svc.region)
+def scan_vpc(svc: "ScanContext"):
+    ec2 = svc.client("ec2", region_name=svc.region)
     region = svc.region
 
     # VPCs
-    vpcs = _paginate(ec2, "describe_vpcs", "Vpcs")
-    for v in vpcs:
+    for v in svc.paginate(ec2, "describe_vpcs", "Vpcs", "vpc"):
         vid = v["VpcId"]
         tags = _extract_tags(v.get("Tags"))
         svc.graph.add_resource(DiscoveredResource(
@@ -154,8 +435,7 @@ def scan_vpc(svc: "InfraDiscoveryService"):
         ))
 
     # Subnets
-    subnets = _paginate(ec2, "describe_subnets", "Subnets")
-    for s in subnets:
+    for s in svc.paginate(ec2, "describe_subnets", "Subnets", "subnet"):
         sid = s["SubnetId"]
         tags = _extract_tags(s.get("Tags"))
         svc.graph.add_resource(DiscoveredResource(
@@ -166,12 +446,10 @@ def scan_vpc(svc: "InfraDiscoveryService"):
                         "vpc_id": s.get("VpcId", "")},
             tags=tags,
         ))
-        if s.get("VpcId") in svc.graph.resources:
-            svc.graph.add_edge(s["VpcId"], sid, "contains", "subnet")
+        svc.graph.link(s.get("VpcId", ""), sid, "contains", "subnet")
 
     # Route Tables
-    rts = _paginate(ec2, "describe_route_tables", "RouteTables")
-    for rt in rts:
+    for rt in svc.paginate(ec2, "describe_route_tables", "RouteTables", "route_table"):
         rtid = rt["RouteTableId"]
         tags = _extract_tags(rt.get("Tags"))
         svc.graph.add_resource(DiscoveredResource(
@@ -182,13 +460,11 @@ def scan_vpc(svc: "InfraDiscoveryService"):
             tags=tags,
         ))
         for assoc in rt.get("Associations", []):
-            subnet_id = assoc.get("SubnetId")
-            if subnet_id and subnet_id in svc.graph.resources:
-                svc.graph.add_edge(subnet_id, rtid, "attached_to", "route table")
+            svc.graph.link(assoc.get("SubnetId", ""), rtid, "attached_to", "route table")
 
     # Internet Gateways
-    igws = _paginate(ec2, "describe_internet_gateways", "InternetGateways")
-    for igw in igws:
+    for igw in svc.paginate(ec2, "describe_internet_gateways", "InternetGateways",
+                            "internet_gateway"):
         igw_id = igw["InternetGatewayId"]
         tags = _extract_tags(igw.get("Tags"))
         svc.graph.add_resource(DiscoveredResource(
@@ -198,13 +474,10 @@ def scan_vpc(svc: "InfraDiscoveryService"):
             properties={}, tags=tags,
         ))
         for att in igw.get("Attachments", []):
-            vpc_id = att.get("VpcId")
-            if vpc_id and vpc_id in svc.graph.resources:
-                svc.graph.add_edge(vpc_id, igw_id, "attached_to", "IGW")
+            svc.graph.link(att.get("VpcId", ""), igw_id, "attached_to", "IGW")
 
     # NAT Gateways
-    nats = _paginate(ec2, "describe_nat_gateways", "NatGateways")
-    for nat in nats:
+    for nat in svc.paginate(ec2, "describe_nat_gateways", "NatGateways", "nat_gateway"):
         nid = nat["NatGatewayId"]
         tags = _extract_tags(nat.get("Tags"))
         subnet_id = nat.get("SubnetId", "")
@@ -215,18 +488,17 @@ def scan_vpc(svc: "InfraDiscoveryService"):
             properties={"subnet_id": subnet_id, "state": nat.get("State", "")},
             tags=tags,
         ))
-        if subnet_id and subnet_id in svc.graph.resources:
-            svc.graph.add_edge(subnet_id, nid, "contains", "NAT GW")
+        svc.graph.link(subnet_id, nid, "contains", "NAT GW")
 
 
 @register_scanner("EC2")
-def scan_ec2(svc: "InfraDiscoveryService"):
-    ec2 = svc.session.client("ec2", region_name=svc.region)
+def scan_ec2(svc: "ScanContext"):
+    ec2 = svc.client("ec2", region_name=svc.region)
     region = svc.region
 
     # Instances
-    reservations = _paginate(ec2, "describe_instances", "Reservations")
-    for res in reservations:
+    # Reservations are the listed items; each holds one or more instances
+    for res in svc.paginate(ec2, "describe_instances", "Reservations", "ec2_instance"):
         for inst in res.get("Instances", []):
             iid = inst["InstanceId"]
             tags = _extract_tags(inst.get("Tags"))
@@ -248,14 +520,16 @@ def scan_ec2(svc: "InfraDiscoveryService"):
                 },
                 tags=tags,
             ))
-            if subnet_id and subnet_id in svc.graph.resources:
-                svc.graph.add_edge(subnet_id, iid, "contains", "instance")
-            elif vpc_id and vpc_id in svc.graph.resources:
-                svc.graph.add_edge(vpc_id, iid, "contains", "instance")
+            if subnet_id:
+                svc.graph.link(subnet_id, iid, "contains", "instance")
+            else:
+                svc.graph.link(vpc_id, iid, "contains", "instance")
+            for sgid in sg_ids:
+                svc.graph.link(iid, sgid, "attached_to", "SG")
 
     # Security Groups
-    sgs = _paginate(ec2, "describe_security_groups", "SecurityGroups")
-    for sg in sgs:
+    for sg in svc.paginate(ec2, "describe_security_groups", "SecurityGroups",
+                           "security_group"):
         sgid = sg["GroupId"]
         vpc_id = sg.get("VpcId", "")
         svc.graph.add_resource(DiscoveredResource(
@@ -266,16 +540,8 @@ def scan_ec2(svc: "InfraDiscoveryService"):
             tags=_extract_tags(sg.get("Tags")),
         ))
 
-    # Link instances to security groups
-    for rid, r in list(svc.graph.resources.items()):
-        if r.resource_type == "ec2_instance":
-            for sgid in r.properties.get("security_groups", []):
-                if sgid in svc.graph.resources:
-                    svc.graph.add_edge(rid, sgid, "attached_to", "SG")
-
     # EBS Volumes
-    volumes = _paginate(ec2, "describe_volumes", "Volumes")
-    for vol in volumes:
+    for vol in svc.paginate(ec2, "describe_volumes", "Volumes", "ebs_volume"):
         vid = vol["VolumeId"]
         tags = _extract_tags(vol.get("Tags"))
         svc.graph.add_resource(DiscoveredResource(
@@ -287,19 +553,16 @@ def scan_ec2(svc: "InfraDiscoveryService"):
             tags=tags,
         ))
         for att in vol.get("Attachments", []):
-            iid = att.get("InstanceId")
-            if iid and iid in svc.graph.resources:
-                svc.graph.add_edge(iid, vid, "attached_to", "EBS")
+            svc.graph.link(att.get("InstanceId", ""), vid, "attached_to", "EBS")
 
 
 @register_scanner("RDS")
-def scan_rds(svc: "InfraDiscoveryService"):
-    rds = svc.session.client("rds", region_name=svc.region)
+def scan_rds(svc: "ScanContext"):
+    rds = svc.client("rds", region_name=svc.region)
     region = svc.region
 
     # DB Instances
-    instances = _paginate(rds, "describe_db_instances", "DBInstances")
-    for db in instances:
+    for db in svc.paginate(rds, "describe_db_instances", "DBInstances", "rds_instance"):
         dbid = db["DBInstanceIdentifier"]
         arn = db.get("DBInstanceArn", "")
         vpc_id = db.get("DBSubnetGroup", {}).get("VpcId", "")
@@ -317,15 +580,12 @@ def scan_rds(svc: "InfraDiscoveryService"):
             },
             tags={},
         ))
-        if vpc_id and vpc_id in svc.graph.resources:
-            svc.graph.add_edge(vpc_id, dbid, "contains", "RDS")
+        svc.graph.link(vpc_id, dbid, "contains", "RDS")
         for sgid in sg_ids:
-            if sgid in svc.graph.resources:
-                svc.graph.add_edge(dbid, sgid, "attached_to", "SG")
+            svc.graph.link(dbid, sgid, "attached_to", "SG")
 
     # DB Clusters
-    clusters = _paginate(rds, "describe_db_clusters", "DBClusters")
-    for cl in clusters:
+    for cl in svc.paginate(rds, "describe_db_clusters", "DBClusters", "rds_cluster"):
         cid = cl["DBClusterIdentifier"]
         arn = cl.get("DBClusterArn", "")
         svc.graph.add_resource(DiscoveredResource(
@@ -338,11 +598,11 @@ def scan_rds(svc: "InfraDiscoveryService"):
 
 
 @register_scanner("S3")
-def scan_s3(svc: "InfraDiscoveryService"):
-    s3 = svc.session.client("s3", region_name=svc.region)
+def scan_s3(svc: "ScanContext"):
+    s3 = svc.client("s3", region_name=svc.region)
     try:
-        resp = s3.list_buckets()
-        for b in resp.get("Buckets", [])[:MAX_RESOURCES_PER_TYPE]:
+        resp = call_with_retry(s3, "list_buckets")
+        for b in svc.capped(resp.get("Buckets", []), "s3_bucket"):
             name = b["Name"]
             svc.graph.add_resource(DiscoveredResource(
                 id=f"s3-{name}", arn=f"arn:aws:s3:::{name}",
@@ -356,12 +616,11 @@ def scan_s3(svc: "InfraDiscoveryService"):
 
 
 @register_scanner("Lambda")
-def scan_lambda(svc: "InfraDiscoveryService"):
-    lam = svc.session.client("lambda", region_name=svc.region)
+def scan_lambda(svc: "ScanContext"):
+    lam = svc.client("lambda", region_name=svc.region)
     region = svc.region
 
-    functions = _paginate(lam, "list_functions", "Functions")
-    for fn in functions:
+    for fn in svc.paginate(lam, "list_functions", "Functions", "lambda_function"):
         fname = fn["FunctionName"]
         arn = fn.get("FunctionArn", "")
         role_arn = fn.get("Role", "")
@@ -384,46 +643,37 @@ def scan_lambda(svc: "InfraDiscoveryService"):
             tags={},
         ))
         # Link to IAM role
-        if role_arn:
-            role_name = role_arn.split("/")[-1] if "/" in role_arn else role_arn
-            if role_name in svc.graph.resources:
-                svc.graph.add_edge(fname, role_name, "attached_to", "IAM Role")
+        svc.graph.link(fname, role_arn, "attached_to", "IAM Role", target_kind="arn")
         # Link to VPC subnets
         for sid in subnet_ids:
-            if sid in svc.graph.resources:
-                svc.graph.add_edge(sid, fname, "contains", "Lambda")
+            svc.graph.link(sid, fname, "contains", "Lambda")
 
     # Event source mappings
-    mappings = _paginate(lam, "list_event_source_mappings", "EventSourceMappings")
-    for m in mappings:
+    for m in svc.paginate(lam, "list_event_source_mappings", "EventSourceMappings",
+                          "event_source_mapping"):
         fn_arn = m.get("FunctionArn", "")
         fn_name = fn_arn.split(":")[-1] if ":" in fn_arn else fn_arn
         source_arn = m.get("EventSourceArn", "")
         if "dynamodb" in source_arn.lower():
-            table_name = source_arn.split("/")[1] if "/" in source_arn else source_arn
-            if table_name in svc.graph.resources and fn_name in svc.graph.resources:
-                svc.graph.add_edge(table_name, fn_name, "triggers", "DynamoDB Stream")
+            # Stream ARN: arn:aws:dynamodb:…:table/<name>/stream/<label>
+            table_arn = source_arn.split("/stream/")[0]
+            svc.graph.link(table_arn, fn_name, "triggers", "DynamoDB Stream", source_kind="arn")
         elif "sqs" in source_arn.lower():
-            # Extract queue name from ARN
-            queue_parts = source_arn.split(":")
-            queue_name = queue_parts[-1] if queue_parts else source_arn
-            queue_id = f"sqs-{queue_name}"
-            if queue_id in svc.graph.resources and fn_name in svc.graph.resources:
-                svc.graph.add_edge(queue_id, fn_name, "triggers", "SQS")
+            svc.graph.link(source_arn, fn_name, "triggers", "SQS", source_kind="arn")
         elif "kinesis" in source_arn.lower():
             stream_name = source_arn.split("/")[-1] if "/" in source_arn else source_arn
-            if stream_name in svc.graph.resources and fn_name in svc.graph.resources:
-                svc.graph.add_edge(stream_name, fn_name, "triggers", "Kinesis")
+            svc.graph.link(stream_name, fn_name, "triggers", "Kinesis")
 
 
 @register_scanner("ELB")
-def scan_elb(svc: "InfraDiscoveryService"):
-    elbv2 = svc.session.client("elbv2", region_name=svc.region)
+def scan_elb(svc: "ScanContext"):
+    elbv2 = svc.client("elbv2", region_name=svc.region)
     region = svc.region
 
-    lbs = _paginate(elbv2, "describe_load_balancers", "LoadBalancers")
-    for lb in lbs:
+    lb_arns = []
+    for lb in svc.paginate(elbv2, "describe_load_balancers", "LoadBalancers", "load_balancer"):
         lb_arn = lb["LoadBalancerArn"]
+        lb_arns.append(lb_arn)
         lb_name = lb["LoadBalancerName"]
         lb_type = lb.get("Type", "application")
         vpc_id = lb.get("VpcId", "")
@@ -438,12 +688,19 @@ def scan_elb(svc: "InfraDiscoveryService"):
                         "subnet_ids": subnet_ids},
             tags={},
         ))
-        if vpc_id and vpc_id in svc.graph.resources:
-            svc.graph.add_edge(vpc_id, lb_arn, "contains", "ELB")
-
-    # Target Groups
-    tgs = _paginate(elbv2, "describe_target_groups", "TargetGroups")
-    for tg in tgs:
+        svc.graph.link(vpc_id, lb_arn, "contains", "ELB")
+
+    def _lambda_targets(tg: dict) -> list[str] | None:
+        if tg.get("TargetType") != "lambda":
+            return None
+        health = call_with_retry(elbv2, "describe_target_health",
+                                 TargetGroupArn=tg["TargetGroupArn"])
+        return [desc.get("Target", {}).get("Id", "")
+                for desc in health.get("TargetHealthDescriptions", [])]
+
+    # Target Groups (Lambda targets fetched concurrently)
+    tgs = svc.paginate(elbv2, "describe_target_groups", "TargetGroups", "target_group")
+    for tg, lambda_targets in svc.enrich(tgs, _lambda_targets):
         tg_arn = tg["TargetGroupArn"]
         tg_name = tg["TargetGroupName"]
         svc.graph.add_resource(DiscoveredResource(
@@ -456,47 +713,31 @@ def scan_elb(svc: "InfraDiscoveryService"):
             tags={},
         ))
         for lb_arn_ref in tg.get("LoadBalancerArns", []):
-            if lb_arn_ref in svc.graph.resources:
-                svc.graph.add_edge(lb_arn_ref, tg_arn, "routes_to", "target group")
+            svc.graph.link(lb_arn_ref, tg_arn, "routes_to", "target group")
 
-        # If target type is lambda, try to link
-        if tg.get("TargetType") == "lambda":
-            try:
-                health = elbv2.describe_target_health(TargetGroupArn=tg_arn)
-                for desc in health.get("TargetHealthDescriptions", []):
-                    target_id = desc.get("Target", {}).get("Id", "")
-                    # Lambda ARN — extract function name
-                    if ":function:" in target_id:
-                        fn_name = target_id.split(":")[-1]
-                        if fn_name in svc.graph.resources:
-                            svc.graph.add_edge(tg_arn, fn_name, "targets", "Lambda")
-            except ClientError:
-                pass
+        # If target type is lambda, link the registered functions
+        for target_id in lambda_targets or []:
+            if ":function:" in target_id:
+                svc.graph.link(tg_arn, target_id, "targets", "Lambda", target_kind="arn")
 
     # Listeners
-    for lb in lbs:
-        try:
-            listeners = _paginate(elbv2, "describe_listeners", "Listeners",
-                                  LoadBalancerArn=lb["LoadBalancerArn"])
-            for _listener in listeners:
-                pass  # Listeners captured implicitly through target groups
-        except ClientError:
-            pass
+    def _listeners(lb_arn: str) -> list[dict]:
+        return list(svc.paginate(elbv2, "describe_listeners", "Listeners", "listener",
+                                 LoadBalancerArn=lb_arn))
+
+    for _lb_arn, _listeners_found in svc.enrich(lb_arns, _listeners):
+        pass  # Listeners captured implicitly through target groups
 
 
 @register_scanner("ECS")
-def scan_ecs(svc: "InfraDiscoveryService"):
-    ecs = svc.session.client("ecs", region_name=svc.region)
+def scan_ecs(svc: "ScanContext"):
+    ecs = svc.client("ecs", region_name=svc.region)
     region = svc.region
 
-    cluster_arns = _paginate(ecs, "list_clusters", "clusterArns")
-    if not cluster_arns:
-        return
-
     # Describe clusters in batches of 100
-    for i in range(0, len(cluster_arns), 100):
-        batch = cluster_arns[i:i + 100]
-        resp = ecs.describe_clusters(clusters=batch)
+    cluster_arns = svc.paginate(ecs, "list_clusters", "clusterArns", "ecs_cluster")
+    for batch in _chunks(cluster_arns, 100):
+        resp = call_with_retry(ecs, "describe_clusters", clusters=batch)
         for cl in resp.get("clusters", []):
             c_arn = cl["clusterArn"]
             c_name = cl["clusterName"]
@@ -514,105 +755,100 @@ def scan_ecs(svc: "InfraDiscoveryService"):
 
             # Services in cluster
             try:
-                svc_arns = _paginate(ecs, "list_services", "serviceArns", cluster=c_arn)
-                if svc_arns:
-                    for j in range(0, len(svc_arns), 10):
-                        svc_batch = svc_arns[j:j + 10]
-                        svc_resp = ecs.describe_services(cluster=c_arn, services=svc_batch)
-                        for es in svc_resp.get("services", []):
-                            s_arn = es["serviceArn"]
-                            s_name = es["serviceName"]
-                            lb_list = es.get("loadBalancers", [])
-                            svc.graph.add_resource(DiscoveredResource(
-                                id=s_arn, arn=s_arn,
-                                resource_type="ecs_service", service="ECS",
-                                name=s_name, region=region,
-                                properties={
-                                    "status": es.get("status", ""),
-                                    "desired_count": es.get("desiredCount", 0),
-                                    "running_count": es.get("runningCount", 0),
-                                    "launch_type": es.get("launchType", ""),
-                                },
-                                tags={},
-                            ))
-                            svc.graph.add_edge(c_arn, s_arn, "contains", "service")
-                            # Link to ELB target groups
-                            for lb_cfg in lb_list:
-                                tg_arn = lb_cfg.get("targetGroupArn", "")
-                                if tg_arn and tg_arn in svc.graph.resources:
-                                    svc.graph.add_edge(tg_arn, s_arn, "targets", "ECS service")
+                svc_arns = svc.paginate(ecs, "list_services", "serviceArns", "ecs_service",
+                                        cluster=c_arn)
+                for svc_batch in _chunks(svc_arns, 10):
+                    svc_resp = call_with_retry(ecs, "describe_services",
+                                               cluster=c_arn, services=svc_batch)
+                    for es in svc_resp.get("services", []):
+                        s_arn = es["serviceArn"]
+                        s_name = es["serviceName"]
+                        lb_list = es.get("loadBalancers", [])
+                        svc.graph.add_resource(DiscoveredResource(
+                            id=s_arn, arn=s_arn,
+                            resource_type="ecs_service", service="ECS",
+                            name=s_name, region=region,
+                            properties={
+                                "status": es.get("status", ""),
+                                "desired_count": es.get("desiredCount", 0),
+                                "running_count": es.get("runningCount", 0),
+                                "launch_type": es.get("launchType", ""),
+                            },
+                            tags={},
+                        ))
+                        svc.graph.link(c_arn, s_arn, "contains", "service")
+                        # Link to ELB target groups
+                        for lb_cfg in lb_list:
+                            svc.graph.link(lb_cfg.get("targetGroupArn", ""), s_arn,
+                                           "targets", "ECS service")
             except ClientError:
                 pass
 
 
 @register_scanner("DynamoDB")
-def scan_dynamodb(svc: "InfraDiscoveryService"):
-    ddb = svc.session.client("dynamodb", region_name=svc.region)
+def scan_dynamodb(svc: "ScanContext"):
+    ddb = svc.client("dynamodb", region_name=svc.region)
     region = svc.region
 
-    table_names = _paginate(ddb, "list_tables", "TableNames")
-    for tname in table_names:
-        try:
-            desc = ddb.describe_table(TableName=tname)["Table"]
-            arn = desc.get("TableArn", "")
-            has_stream = bool(desc.get("StreamSpecification", {}).get("StreamEnabled"))
-            svc.graph.add_resource(DiscoveredResource(
-                id=tname, arn=arn,
-                resource_type="dynamodb_table", service="DynamoDB",
-                name=tname, region=region,
-                properties={
-                    "status": desc.get("TableStatus", ""),
-                    "item_count": desc.get("ItemCount", 0),
-                    "size_bytes": desc.get("TableSizeBytes", 0),
-                    "billing_mode": desc.get("BillingModeSummary", {}).get("BillingMode", ""),
-                    "has_stream": has_stream,
-                },
-                tags={},
-            ))
-        except ClientError:
-            pass
+    def _describe(tname: str) -> dict:
+        return call_with_retry(ddb, "describe_table", TableName=tname)["Table"]
+
+    table_names = svc.paginate(ddb, "list_tables", "TableNames", "dynamodb_table")
+    for tname, desc in svc.enrich(table_names, _describe):
+        if desc is None:
+            continue
+        arn = desc.get("TableArn", "")
+        has_stream = bool(desc.get("StreamSpecification", {}).get("StreamEnabled"))
+        svc.graph.add_resource(DiscoveredResource(
+            id=tname, arn=arn,
+            resource_type="dynamodb_table", service="DynamoDB",
+            name=tname, region=region,
+            properties={
+                "status": desc.get("TableStatus", ""),
+                "item_count": desc.get("ItemCount", 0),
+                "size_bytes": desc.get("TableSizeBytes", 0),
+                "billing_mode": desc.get("BillingModeSummary", {}).get("BillingMode", ""),
+                "has_stream": has_stream,
+            },
+            tags={},
+        ))
 
 
 @register_scanner("SQS")
-def scan_sqs(svc: "InfraDiscoveryService"):
-    sqsc = svc.session.client("sqs", region_name=svc.region)
+def scan_sqs(svc: "ScanContext"):
+    sqsc = svc.client("sqs", region_name=svc.region)
     region = svc.region
 
-    try:
-        resp = sqsc.list_queues()
-        queue_urls = resp.get("QueueUrls", [])
-    except ClientError:
-        return
-
-    for url in queue_urls[:MAX_RESOURCES_PER_TYPE]:
-        try:
-            attrs = sqsc.get_queue_attributes(
-                QueueUrl=url,
-                AttributeNames=["QueueArn", "ApproximateNumberOfMessages"]
-            ).get("Attributes", {})
-            arn = attrs.get("QueueArn", "")
-            qname = url.split("/")[-1]
-            svc.graph.add_resource(DiscoveredResource(
-                id=f"sqs-{qname}", arn=arn,
-                resource_type="sqs_queue", service="SQS",
-                name=qname, region=region,
-                properties={
-                    "url": url,
-                    "approx_messages": int(attrs.get("ApproximateNumberOfMessages", 0)),
-                },
-                tags={},
-            ))
-        except ClientError:
-            pass
+    def _attributes(url: str) -> dict:
+        return call_with_retry(
+            sqsc, "get_queue_attributes", QueueUrl=url,
+            AttributeNames=["QueueArn", "ApproximateNumberOfMessages"]
+        ).get("Attributes", {})
+
+    queue_urls = svc.paginate(sqsc, "list_queues", "QueueUrls", "sqs_queue")
+    for url, attrs in svc.enrich(queue_urls, _attributes):
+        if attrs is None:
+            continue
+        arn = attrs.get("QueueArn", "")
+        qname = url.split("/")[-1]
+        svc.graph.add_resource(DiscoveredResource(
+            id=f"sqs-{qname}", arn=arn,
+            resource_type="sqs_queue", service="SQS",
+            name=qname, region=region,
+            properties={
+                "url": url,
+                "approx_messages": int(attrs.get("ApproximateNumberOfMessages", 0)),
+            },
+            tags={},
+        ))
 
 
 @register_scanner("SNS")
-def scan_sns(svc: "InfraDiscoveryService"):
-    sns = svc.session.client("sns", region_name=svc.region)
+def scan_sns(svc: "ScanContext"):
+    sns = svc.client("sns", region_name=svc.region)
     region = svc.region
 
-    topics = _paginate(sns, "list_topics", "Topics")
-    for t in topics:
+    for t in svc.paginate(sns, "list_topics", "Topics", "sns_topic"):
         arn = t["TopicArn"]
         name = arn.split(":")[-1]
         svc.graph.add_resource(DiscoveredResource(
@@ -623,36 +859,26 @@ def scan_sns(svc: "InfraDiscoveryService"):
         ))
 
     # Subscriptions
-    subs = _paginate(sns, "list_subscriptions", "Subscriptions")
-    for sub in subs:
+    for sub in svc.paginate(sns, "list_subscriptions", "Subscriptions", "sns_subscription"):
         topic_arn = sub.get("TopicArn", "")
         endpoint = sub.get("Endpoint", "")
         protocol = sub.get("Protocol", "")
-        topic_name = topic_arn.split(":")[-1]
-        topic_id = f"sns-{topic_name}"
 
-        if protocol == "lambda" and topic_id in svc.graph.resources:
-            fn_name = endpoint.split(":")[-1] if ":" in endpoint else endpoint
-            if fn_name in svc.graph.resources:
-                svc.graph.add_edge(topic_id, fn_name, "triggers", "SNS→Lambda")
-        elif protocol == "sqs" and topic_id in svc.graph.resources:
-            queue_name = endpoint.split(":")[-1] if ":" in endpoint else endpoint
-            queue_id = f"sqs-{queue_name}"
-            if queue_id in svc.graph.resources:
-                svc.graph.add_edge(topic_id, queue_id, "targets", "SNS→SQS")
+        if protocol == "lambda":
+            svc.graph.link(topic_arn, endpoint, "triggers", "SNS→Lambda",
+                           source_kind="arn", target_kind="arn")
+        elif protocol == "sqs":
+            svc.graph.link(topic_arn, endpoint, "targets", "SNS→SQS",
+                           source_kind="arn", target_kind="arn")
 
 
 @register_scanner("CloudFront")
-def scan_cloudfront(svc: "InfraDiscoveryService"):
-    cf = svc.session.client("cloudfront", region_name="us-east-1")
+def scan_cloudfront(svc: "ScanContext"):
+    cf = svc.client("cloudfront", region_name="us-east-1")
 
-    try:
-        resp = cf.list_distributions()
-        items = resp.get("DistributionList", {}).get("Items", []) or []
-    except ClientError:
-        return
-
-    for dist in (items or []):
+    dists = svc.paginate(cf, "list_distributions", "DistributionList.Items",
+                         "cloudfront_distribution")
+    for dist in dists:
         dist_id = dist["Id"]
         arn = dist.get("ARN", "")
         domain = dist.get("DomainName", "")
@@ -669,26 +895,31 @@ def scan_cloudfront(svc: "InfraDiscoveryService"):
             domain_name = origin.get("DomainName", "")
             if ".s3." in domain_name or domain_name.endswith(".s3.amazonaws.com"):
                 bucket_name = domain_name.split(".")[0]
-                bucket_id = f"s3-{bucket_name}"
-                if bucket_id in svc.graph.resources:
-                    svc.graph.add_edge(dist_id, bucket_id, "routes_to", "S3 origin")
+                svc.graph.link(dist_id, f"s3-{bucket_name}", "routes_to", "S3 origin")
             elif "elb" in domain_name.lower() or "loadbalancer" in domain_name.lower():
-                for rid, r in svc.graph.resources.items():
-                    if r.resource_type in ("alb", "nlb") and r.properties.get("dns") == domain_name:
-                        svc.graph.add_edge(dist_id, rid, "routes_to", "ELB origin")
-                        break
+                svc.graph.link(dist_id, domain_name, "routes_to", "ELB origin", target_kind="dns")
 
 
 @register_scanner("Route53")
-def scan_route53(svc: "InfraDiscoveryService"):
-    r53 = svc.session.client("route53", region_name="us-east-1")
-
-    try:
-        zones = _paginate(r53, "list_hosted_zones", "HostedZones")
-    except ClientError:
-        return
-
-    for zone in zones:
+def scan_route53(svc: "ScanContext"):
+    r53 = svc.client("route53", region_name="us-east-1")
+
+    def _alias_targets(zone: dict) -> list[tuple[str, str]]:
+        """(alias DNS name, record name) of the zone's CloudFront / ELB alias records."""
+        targets = []
+        records = svc.paginate(r53, "list_resource_record_sets", "ResourceRecordSets",
+                               "dns_record", HostedZoneId=zone["Id"].split("/")[-1])
+        for rec in records:
+            alias = rec.get("AliasTarget", {})
+            if alias:
+                dns_name = alias.get("DNSName", "").rstrip(".")
+                if "cloudfront" in dns_name or "elb" in dns_name.lower():
+                    targets.append((dns_name, rec.get("Name", "").rstrip(".")))
+        return targets
+
+    # Record sets of every zone are listed concurrently
+    zones = svc.paginate(r53, "list_hosted_zones", "HostedZones", "hosted_zone")
+    for zone, alias_targets in svc.enrich(zones, _alias_targets):
         zone_id = zone["Id"].split("/")[-1]
         zone_name = zone["Name"].rstrip(".")
         svc.graph.add_resource(DiscoveredResource(
@@ -700,40 +931,19 @@ def scan_route53(svc: "InfraDiscoveryService"):
             tags={},
         ))
 
-        # Record sets
-        try:
-            records = _paginate(r53, "list_resource_record_sets", "ResourceRecordSets",
-                                HostedZoneId=zone_id)
-            for rec in records:
-                alias = rec.get("AliasTarget", {})
-                if alias:
-                    dns_name = alias.get("DNSName", "").rstrip(".")
-                    rec_name = rec.get("Name", "").rstrip(".")
-                    # Link to CloudFront
-                    if "cloudfront" in dns_name:
-                        for rid, r in svc.graph.resources.items():
-                            if r.resource_type == "cloudfront_distribution" and r.properties.get("domain", "") in dns_name:
-                                svc.graph.add_edge(f"r53-{zone_id}", rid, "routes_to", rec_name)
-                                break
-                    # Link to ELB
-                    elif "elb" in dns_name.lower():
-                        for rid, r in svc.graph.resources.items():
-                            if r.resource_type in ("alb", "nlb") and r.properties.get("dns", "") in dns_name:
-                                svc.graph.add_edge(f"r53-{zone_id}", rid, "routes_to", rec_name)
-                                break
-        except ClientError:
-            pass
+        # Link to CloudFront / ELB by alias DNS name
+        for dns_name, rec_name in alias_targets or []:
+            svc.graph.link(f"r53-{zone_id}", dns_name, "routes_to", rec_name, target_kind="dns")
 
 
 @register_scanner("API Gateway")
-def scan_apigateway(svc: "InfraDiscoveryService"):
+def scan_apigateway(svc: "ScanContext"):
     region = svc.region
 
     # REST APIs (v1)
     try:
-        apigw = svc.session.client("apigateway", region_name=region)
-        apis = _paginate(apigw, "get_rest_apis", "items")
-        for api in apis:
+        apigw = svc.client("apigateway", region_name=region)
+        for api in svc.paginate(apigw, "get_rest_apis", "items", "api_gateway"):
             api_id = api["id"]
             name = api.get("name", api_id)
             svc.graph.add_resource(DiscoveredResource(
@@ -748,9 +958,8 @@ def scan_apigateway(svc: "InfraDiscoveryService"):
 
     # HTTP/WebSocket APIs (v2)
     try:
-        apigw2 = svc.session.client("apigatewayv2", region_name=region)
-        apis_v2 = _paginate(apigw2, "get_apis", "Items")
-        for api in apis_v2:
+        apigw2 = svc.client("apigatewayv2", region_name=region)
+        for api in svc.paginate(apigw2, "get_apis", "Items", "api_gateway_v2"):
             api_id = api["ApiId"]
             name = api.get("Name", api_id)
             proto = api.get("ProtocolType", "HTTP")
@@ -767,12 +976,12 @@ def scan_apigateway(svc: "InfraDiscoveryService"):
 
 
 @register_scanner("ElastiCache")
-def scan_elasticache(svc: "InfraDiscoveryService"):
-    ec = svc.session.client("elasticache", region_name=svc.region)
+def scan_elasticache(svc: "ScanContext"):
+    ec = svc.client("elasticache", region_name=svc.region)
     region = svc.region
 
-    clusters = _paginate(ec, "describe_cache_clusters", "CacheClusters")
-    for cl in clusters:
+    for cl in svc.paginate(ec, "describe_cache_clusters", "CacheClusters",
+                           "elasticache_cluster"):
         cid = cl["CacheClusterId"]
         arn = cl.get("ARN", "")
         svc.graph.add_resource(DiscoveredResource(
@@ -790,18 +999,15 @@ def scan_elasticache(svc: "InfraDiscoveryService"):
         ))
         # ElastiCache security groups → VPC link
         for sg in cl.get("SecurityGroups", []):
-            sgid = sg.get("SecurityGroupId", "")
-            if sgid and sgid in svc.graph.resources:
-                svc.graph.add_edge(cid, sgid, "attached_to", "SG")
+            svc.graph.link(cid, sg.get("SecurityGroupId", ""), "attached_to", "SG")
 
 
 @register_scanner("IAM")
-def scan_iam(svc: "InfraDiscoveryService"):
-    iam = svc.session.client("iam", region_name="us-east-1")
+def scan_iam(svc: "ScanContext"):
+    iam = svc.client("iam", region_name="us-east-1")
 
-    # Only list roles (limited scope)
-    roles = _paginate(iam, "list_roles", "Roles")
-    for role in roles[:100]:  # Cap at 100 IAM roles
+    # Only list roles (limited scope, capped by DEFAULT_TYPE_LIMITS)
+    for role in svc.paginate(iam, "list_roles", "Roles", "iam_role"):
         rname = role["RoleName"]
         arn = role.get("Arn", "")
         svc.graph.add_resource(DiscoveredResource(
@@ -815,23 +1021,21 @@ def scan_iam(svc: "InfraDiscoveryService"):
 
 
 @register_scanner("KMS")
-def scan_kms(svc: "InfraDiscoveryService"):
-    kms = svc.session.client("kms", region_name=svc.region)
+def scan_kms(svc: "ScanContext"):
+    kms = svc.client("kms", region_name=svc.region)
     region = svc.region
 
-    keys = _paginate(kms, "list_keys", "Keys")
-    # Also get aliases for naming
+    # Aliases first, for naming the keys as they stream in
     aliases = {}
     try:
-        alias_list = _paginate(kms, "list_aliases", "Aliases")
-        for a in alias_list:
+        for a in svc.paginate(kms, "list_aliases", "Aliases", "kms_alias"):
             kid = a.get("TargetKeyId", "")
             if kid:
                 aliases[kid] = a.get("AliasName", "")
     except ClientError:
         pass
 
-    for key in keys[:100]:  # Cap at 100
+    for key in svc.paginate(kms, "list_keys", "Keys", "kms_key"):
         kid = key["KeyId"]
         arn = key.get("KeyArn", "")
         alias = aliases.get(kid, "")
@@ -845,13 +1049,12 @@ def scan_kms(svc: "InfraDiscoveryService"):
 
 
 @register_scanner("CloudWatch")
-def scan_cloudwatch(svc: "InfraDiscoveryService"):
+def scan_cloudwatch(svc: "ScanContext"):
     region = svc.region
 
     # Log Groups
-    logs = svc.session.client("logs", region_name=region)
-    log_groups = _paginate(logs, "describe_log_groups", "logGroups")
-    for lg in log_groups[:200]:  # Cap at 200
+    logs = svc.client("logs", region_name=region)
+    for lg in svc.paginate(logs, "describe_log_groups", "logGroups", "log_group"):
         name = lg["logGroupName"]
         arn = lg.get("arn", "")
         svc.graph.add_resource(DiscoveredResource(
@@ -864,9 +1067,8 @@ def scan_cloudwatch(svc: "InfraDiscoveryService"):
         ))
 
     # Alarms
-    cw = svc.session.client("cloudwatch", region_name=region)
-    alarms = _paginate(cw, "describe_alarms", "MetricAlarms")
-    for alarm in alarms[:200]:
+    cw = svc.client("cloudwatch", region_name=region)
+    for alarm in svc.paginate(cw, "describe_alarms", "MetricAlarms", "cloudwatch_alarm"):
         aname = alarm["AlarmName"]
         arn = alarm.get("AlarmArn", "")
         actions = alarm.get("AlarmActions", [])
@@ -882,52 +1084,270 @@ def scan_cloudwatch(svc: "InfraDiscoveryService"):
         # Link alarm actions to SNS
         for action_arn in actions:
             if ":sns:" in action_arn:
-                topic_name = action_arn.split(":")[-1]
-                topic_id = f"sns-{topic_name}"
-                if topic_id in svc.graph.resources:
-                    svc.graph.add_edge(f"alarm-{aname}", topic_id, "targets", "SNS action")
+                svc.graph.link(f"alarm-{aname}", action_arn, "targets", "SNS action",
+                               target_kind="arn")
 
 
 # ---------------------------------------------------------------------------
 # Discovery Service
 # ---------------------------------------------------------------------------
 
-class InfraDiscoveryService:
-    """Orchestrates infrastructure scanning across registered scanners."""
+def _stopped_error(service: str, exc: ScanCancelled, message: str) -> dict:
+    kind = "timeout" if isinstance(exc, ScanTimeout) else "cancelled"
+    return {"service": service, "error": message, kind: True}
+
+
+class ScanContext:
+    """What a scanner sees: the service's session/region and its own fragment graph."""
+
+    def __init__(self, svc: "InfraDiscoveryService", service: str):
+        self.svc = svc
+        self.service = service
+        self.session = svc.session
+        self.region = svc.region
+        self.graph = InfraGraph(region=svc.region)
+
+    def client(self, service_name: str, region_name: str | None = None):
+        return self.svc.client(service_name, region_name=region_name)
+
+    def paginate(self, client, method: str, key: str, resource_type: str,
+                 **kwargs) -> Iterator[dict]:
+        """Stream the items of a paginated call, page by page, up to the type's limit.
+
+        Pages go through the shared rate limiter; throttled pages are retried.
+        Stopping at the limit is reported as a truncation, never silently.
+        """
+        limit = self.svc.limit_for(resource_type)
+        count = 0
+        for page in paginate_with_retry(client, method, **kwargs):
+            scan_metrics.record_page(client, method)
+            for item in _page_items(page, key):
+                if limit and count >= limit:
+                    self.truncated(resource_type, limit)
+                    return
+                count += 1
+                yield item
+
+    def capped(self, items: list, resource_type: str) -> list:
+        """Apply the type's limit to an already-fetched list."""
+        limit = self.svc.limit_for(resource_type)
+        if limit and len(items) > limit:
+            self.truncated(resource_type, limit)
+            return items[:limit]
+        return items
+
+    def enrich(self, items: Iterable, fn: Callable, max_workers: int = DEFAULT_ENRICH_WORKERS
+               ) -> Iterator[tuple]:
+        """Yield ``(item, fn(item))`` in input order, running ``fn`` on a bounded pool.
+
+        For the per-item describe calls scanners make after listing. ``fn`` should
+        call AWS through call_with_retry/paginate so the pool shares the rate
+        limiter. A ClientError for one item yields ``(item, None)``.
+        """
+        def _call(item):
+            try:
+                return fn(item)
+            except ClientError as e:
+                log.debug("%s: enrichment call failed: %s", self.service, e)
+                return None
+
+        window = max_workers * 4
+        with ThreadPoolExecutor(max_workers=max_workers,
+                                thread_name_prefix="infra-enrich") as pool:
+            pending = deque()
+            for item in items:
+                scan_control.check()
+                # Each task runs in a copy of this context, so its API calls count
+                # towards this scanner's metrics
+                task = contextvars.copy_context().run
+                pending.append((item, pool.submit(task, _call, item)))
+                if len(pending) >= window:
+                    head, fut = pending.popleft()
+                    yield head, fut.result()
+            while pending:
+                head, fut = pending.popleft()
+                yield head, fut.result()
+
+    def truncated(self, resource_type: str, limit: int):
+        log.info("%s: %s listing stopped at %d items", self.service, resource_type, limit)
+        self.graph.scan_errors.append({
+            "service": self.service, "resource_type": resource_type, "truncated": True,
+            "error": f"Only the first {limit} {resource_type} items were scanned (limit reached)",
+        })
+
 
-    def __init__(self, session, region: str, event_callback: Callable | None = None):
+class InfraDiscoveryService:
+    """Orchestrates infrastructure scanning across registered scanners.
+
+    Scanners are independent of each other: each writes a fragment, fragments are
+    merged as scanners finish and links are resolved once at the end. With
+    ``max_workers > 1`` the scanners run side by side on a bounded thread pool.
+    With ``stream_deltas`` links are resolved after every merge instead and each
+    scanner's resources and new edges are emitted as an ``infra_scan_delta`` event.
+
+    ``limits`` caps how many items are listed per resource type ("ec2_instance",
+    …, or "default" for every other type); 0 lifts the cap. Truncated listings are
+    recorded in ``scan_errors`` with ``"truncated": True``.
+
+    ``control`` (a scan_control.ScanControl) cancels the scan or bounds it with a
+    deadline; each scanner additionally stops after ``scanner_timeout`` seconds.
+    A stopped scanner keeps what it found and records the timeout or cancellation
+    in ``scan_errors``; scanners not yet started are skipped.
+
+    With ``hydrate_tags`` the tags of resources whose scanner did not fetch them
+    are filled in afterwards with batched Tagging API calls (see tag_hydration).
+    """
+
+    def __init__(self, session, region: str, event_callback: Callable | None = None,
+                 max_workers: int = 1, client_lock=None, snapshots=None,
+                 stream_deltas: bool = False, limits: dict[str, int] | None = None,
+                 control: ScanControl | None = None,
+                 scanner_timeout: float | None = DEFAULT_SCANNER_TIMEOUT,
+                 hydrate_tags: bool = True):
         self.session = session
         self.region = region
         self.event_callback = event_callback
+        self.max_workers = max(1, max_workers)
+        # Optional scan_store.SnapshotPolicy: serve fresh fragments, store new ones
+        self.snapshots = snapshots
         self.graph = InfraGraph(region=region)
+        self.stream_deltas = stream_deltas
+        self.limits = {"default": MAX_RESOURCES_PER_TYPE, **DEFAULT_TYPE_LIMITS, **(limits or {})}
+        # Share the lock when several services use one session
+        self._client_lock = client_lock or threading.Lock()
+        # Merge + resolve + emit as one step so a delta never references a node
+        # that has not been sent yet
+        self._delta_lock = threading.Lock()
+        self.metrics = scan_metrics.ScanMetrics()
+        self.control = control or ScanControl()
+        self.scanner_timeout = scanner_timeout
+        self.hydrate_tags = hydrate_tags
 
     def _emit(self, event: str, data: dict):
         if self.event_callback:
             self.event_callback(event, data)
 
-    def scan_all(self, selected_services: list[str] | None = None) -> InfraGraph:
-        """Run all registered scanners (or a subset) and return the populated graph."""
+    def limit_for(self, resource_type: str) -> int:
+        return self.limits.get(resource_type, self.limits["default"])
+
+    def client(self, service_name: str, region_name: str | None = None):
+        """Create a boto3 client. Sessions are not thread-safe, clients are."""
+        with self._client_lock:
+            client = self.session.client(service_name, region_name=region_name or self.region)
+        return scan_metrics.instrument(client)
+
+    def scan_all(self, selected_services: list[str] | None = None,
+                 resolve_links: bool = True) -> InfraGraph:
+        """Run all registered scanners (or a subset) and return the populated graph.
+
+        Pass ``resolve_links=False`` to leave links pending, e.g. when the graph
+        will be merged with others before resolution.
+        """
         scanners = _SCANNERS
         if selected_services:
             scanners = {k: v for k, v in _SCANNERS.items() if k in selected_services}
 
         total = len(scanners)
-        for idx, (name, scanner_fn) in enumerate(scanners.items()):
-            self._emit("infra_scan_progress", {
-                "service": name, "index": idx, "total": total, "status": "scanning",
-            })
-            try:
-                scanner_fn(self)
+        if self.max_workers > 1 and total > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers,
+                                    thread_name_prefix="infra-scan") as pool:
+                futures = [
+                    pool.submit(self._run_scanner, name, scanner_fn, idx, total)
+                    for idx, (name, scanner_fn) in enumerate(scanners.items())
+                ]
+                for fut in as_completed(futures):
+                    fut.result()
+        else:
+            for idx, (name, scanner_fn) in enumerate(scanners.items()):
+                self._run_scanner(name, scanner_fn, idx, total)
+
+        if self.hydrate_tags:
+            self._hydrate_tags()
+        self.graph.scan_meta["metrics"] = {self.region: self.metrics.to_dict()}
+        if resolve_links:
+            self.graph.resolve_links()
+        return self.graph
+
+    def _hydrate_tags(self):
+        """Fill in missing tags for the whole graph with bulk Tagging API lookups."""
+        started = time.monotonic()
+        try:
+            with scan_metrics.scanner_scope(self.metrics, "Tags"), \
+                    scan_control.active(self.control.child(self.scanner_timeout)):
+                errors = tag_hydration.hydrate_tags(
+                    self.graph, self.client, max_workers=self.max_workers)
+        except ScanCancelled as e:
+            errors = [_stopped_error("Tags", e, f"{e}; tags not hydrated")]
+        except Exception as e:
+            log.warning("Tag hydration failed: %s", e)
+            errors = [{"service": "Tags", "error": str(e)[:200]}]
+        finally:
+            self.metrics.record_scanner("Tags", time.monotonic() - started)
+        self.graph.scan_errors.extend(errors)
+
+    def _run_scanner(self, name: str, scanner_fn: Callable, idx: int, total: int):
+        try:
+            self.control.check()
+        except ScanCancelled as e:
+            self.graph.scan_errors.append(_stopped_error(name, e, f"Not scanned: {e}"))
+            return
+        snapshot_region = "global" if name in GLOBAL_SERVICES else self.region
+        if self.snapshots:
+            cached = self.snapshots.get(snapshot_region, name)
+            if cached is not None:
+                self.metrics.record_scanner(name, 0.0, cached=True)
+                self._merge_fragment(name, cached)
                 self._emit("infra_scan_progress", {
                     "service": name, "index": idx, "total": total, "status": "done",
+                    "cached": True,
                 })
-            except Exception as e:
-                error_msg = str(e)[:200]
-                log.warning("Scanner %s failed: %s", name, error_msg)
-                self.graph.scan_errors.append({"service": name, "error": error_msg})
-                self._emit("infra_scan_progress", {
-                    "service": name, "index": idx, "total": total,
-                    "status": "error", "error": error_msg,
-                })
+                return
 
-        return self.graph
+        self._emit("infra_scan_progress", {
+            "service": name, "index": idx, "total": total, "status": "scanning",
+        })
+        ctx = ScanContext(self, name)
+        started = time.monotonic()
+        try:
+            with scan_metrics.scanner_scope(self.metrics, name), \
+                    scan_control.active(self.control.child(self.scanner_timeout)):
+                scanner_fn(ctx)
+            if self.snapshots:
+                self.snapshots.put(snapshot_region, name, ctx.graph)
+            self._emit("infra_scan_progress", {
+                "service": name, "index": idx, "total": total, "status": "done",
+            })
+        except ScanCancelled as e:
+            # Partial results: merged below, never stored as a snapshot
+            error_msg = f"{e}; partial results kept"
+            log.info("Scanner %s stopped: %s", name, error_msg)
+            ctx.graph.scan_errors.append(_stopped_error(name, e, error_msg))
+            self._emit("infra_scan_progress", {
+                "service": name, "index": idx, "total": total,
+                "status": "error", "error": error_msg,
+            })
+        except Exception as e:
+            error_msg = str(e)[:200]
+            log.warning("Scanner %s failed: %s", name, error_msg)
+            ctx.graph.scan_errors.append({"service": name, "error": error_msg})
+            self._emit("infra_scan_progress", {
+                "service": name, "index": idx, "total": total,
+                "status": "error", "error": error_msg,
+            })
+        finally:
+            self.metrics.record_scanner(name, time.monotonic() - started)
+            # Keep whatever the scanner found before failing
+            self._merge_fragment(name, ctx.graph)
+
+    def _merge_fragment(self, name: str, fragment: InfraGraph):
+        if not self.stream_deltas:
+            self.graph.merge(fragment, service=name)
+            return
+        with self._delta_lock:
+            self.graph.merge(fragment, service=name)
+            new_edges = self.graph.resolve_links()
+            if fragment.resources or new_edges:
+                self._emit("infra_scan_delta", {
+                    "service": name, "region": self.region,
+                    **graph_delta(fragment.resources, new_edges),
+                })
@@ -0,0 +1,293 @@
+"""Quick inventory — a first-pass InfraGraph from bulk inventory APIs.
+
+Instead of the per-service describe calls of the detailed scanners, the inventory
+lists every resource of a region with paginated Resource Groups Tagging API
+``GetResources`` calls (100 resources per page), or every resource of an
+organization/account set with one AWS Config aggregator query. Resource ARNs
+are mapped to the same resource types, IDs and scanner services the detailed
+scanners produce, so ``InfraGraph.replace_services`` later swaps inventory
+nodes for fully described ones: the detailed scanners run lazily, only for the
+services the user expands (``ApiService.infra_expand``).
+
+Caveats: the Tagging API only returns resources that carry (or once carried)
+tags, and neither source knows relationships beyond what Config records about
+VPC/subnet placement. Resource types no scanner covers are skipped.
+"""
+
+import json
+import logging
+from typing import Callable
+
+from . import scan_control, scan_metrics
+from .infra_discovery import DiscoveredResource, InfraGraph, GLOBAL_SERVICES
+from .rate_limit import paginate_with_retry
+from .scan_control import ScanCancelled, ScanControl
+from .scan_orchestrator import merge_region_graph
+
+log = logging.getLogger(__name__)
+
+INVENTORY_PAGE_SIZE = 100  # GetResources maximum
+
+# (ARN service, resource kind) -> resource type; "" is for ARNs without a kind (S3, SQS, SNS)
+_ARN_TYPES = {
+    ("ec2", "vpc"): "vpc",
+    ("ec2", "subnet"): "subnet",
+    ("ec2", "route-table"): "route_table",
+    ("ec2", "internet-gateway"): "internet_gateway",
+    ("ec2", "natgateway"): "nat_gateway",
+    ("ec2", "instance"): "ec2_instance",
+    ("ec2", "security-group"): "security_group",
+    ("ec2", "volume"): "ebs_volume",
+    ("rds", "db"): "rds_instance",
+    ("rds", "cluster"): "rds_cluster",
+    ("s3", ""): "s3_bucket",
+    ("lambda", "function"): "lambda_function",
+    ("elasticloadbalancing", "loadbalancer"): "alb",  # "nlb" for loadbalancer/net/…
+    ("elasticloadbalancing", "targetgroup"): "target_group",
+    ("ecs", "cluster"): "ecs_cluster",
+    ("ecs", "service"): "ecs_service",
+    ("dynamodb", "table"): "dynamodb_table",
+    ("sqs", ""): "sqs_queue",
+    ("sns", ""): "sns_topic",
+    ("cloudfront", "distribution"): "cloudfront_distribution",
+    ("route53", "hostedzone"): "hosted_zone",
+    ("apigateway", "restapis"): "api_gateway",
+    ("apigateway", "apis"): "api_gateway_v2",
+    ("elasticache", "cluster"): "elasticache_cluster",
+    ("iam", "role"): "iam_role",
+    ("kms", "key"): "kms_key",
+    ("logs", "log-group"): "log_group",
+    ("cloudwatch", "alarm"): "cloudwatch_alarm",
+}
+
+# Resource type -> scanner (service) that describes it in detail
+TYPE_SERVICES = {
+    "vpc": "VPC", "subnet": "VPC", "route_table": "VPC", "internet_gateway": "VPC",
+    "nat_gateway": "VPC",
+    "ec2_instance": "EC2", "security_group": "EC2", "ebs_volume": "EC2",
+    "rds_instance": "RDS", "rds_cluster": "RDS",
+    "s3_bucket": "S3",
+    "lambda_function": "Lambda",
+    "alb": "ELB", "nlb": "ELB", "target_group": "ELB",
+    "ecs_cluster": "ECS", "ecs_service": "ECS",
+    "dynamodb_table": "DynamoDB",
+    "sqs_queue": "SQS",
+    "sns_topic": "SNS",
+    "cloudfront_distribution": "CloudFront",
+    "hosted_zone": "Route53",
+    "api_gateway": "API Gateway", "api_gateway_v2": "API Gateway",
+    "elasticache_cluster": "ElastiCache",
+    "iam_role": "IAM",
+    "kms_key": "KMS",
+    "log_group": "CloudWatch", "cloudwatch_alarm": "CloudWatch",
+}
+
+# Scanners prefix some IDs; ELB and ECS resources are keyed by their ARN
+_ID_PREFIXES = {
+    "s3_bucket": "s3-", "sqs_queue": "sqs-", "sns_topic": "sns-", "hosted_zone": "r53-",
+    "api_gateway": "apigw-", "api_gateway_v2": "apigw2-", "kms_key": "kms-",
+    "log_group": "loggroup-", "cloudwatch_alarm": "alarm-",
+}
+_ARN_ID_TYPES = frozenset({"alb", "nlb", "target_group", "ecs_cluster", "ecs_service"})
+
+# AWS Config resource types queried through an aggregator
+CONFIG_RESOURCE_TYPES = (
+    "AWS::EC2::VPC", "AWS::EC2::Subnet", "AWS::EC2::RouteTable", "AWS::EC2::InternetGateway",
+    "AWS::EC2::NatGateway", "AWS::EC2::Instance", "AWS::EC2::SecurityGroup", "AWS::EC2::Volume",
+    "AWS::RDS::DBInstance", "AWS::RDS::DBCluster", "AWS::S3::Bucket", "AWS::Lambda::Function",
+    "AWS::ElasticLoadBalancingV2::LoadBalancer", "AWS::ECS::Cluster", "AWS::ECS::Service",
+    "AWS::DynamoDB::Table", "AWS::SQS::Queue", "AWS::SNS::Topic",
+    "AWS::CloudFront::Distribution", "AWS::Route53::HostedZone", "AWS::ApiGateway::RestApi",
+    "AWS::ApiGatewayV2::Api", "AWS::ElastiCache::CacheCluster", "AWS::IAM::Role",
+    "AWS::KMS::Key", "AWS::Logs::LogGroup", "AWS::CloudWatch::Alarm",
+)
+
+
+def services_for_types(resource_types) -> list[str]:
+    """Scanner services that describe ``resource_types`` in detail."""
+    return sorted({TYPE_SERVICES[t] for t in resource_types if t in TYPE_SERVICES})
+
+
+def parse_arn(arn: str) -> tuple[str, str, str, str] | None:
+    """(resource_type, scanner service, resource id, name) for a supported ARN."""
+    parts = arn.split(":", 5)
+    if len(parts) < 6:
+        return None
+    service, resource = parts[2], parts[5]
+    if service == "apigateway":
+        resource = resource.lstrip("/")
+    # The kind ends at the first "/" or ":" (log-group:/aws/…, function:name, vpc/vpc-…)
+    cut = min((i for i in (resource.find("/"), resource.find(":")) if i >= 0), default=-1)
+    kind, raw = (resource[:cut], resource[cut + 1:]) if cut >= 0 else ("", resource)
+    resource_type = _ARN_TYPES.get((service, kind))
+    if resource_type is None:
+        return None
+
+    if resource_type in _ARN_ID_TYPES:
+        segments = raw.split("/")
+        if resource_type == "alb":
+            # loadbalancer/app/NAME/ID or loadbalancer/net/NAME/ID
+            resource_type = "nlb" if segments[0] == "net" else "alb"
+            name = segments[1] if len(segments) > 1 else raw
+        elif resource_type == "target_group":
+            name = segments[0]  # targetgroup/NAME/ID
+        else:
+            name = segments[-1]  # cluster/NAME, service/CLUSTER/NAME
+        return resource_type, TYPE_SERVICES[resource_type], arn, name
+
+    if resource_type in ("lambda_function", "rds_instance", "rds_cluster", "elasticache_cluster"):
+        raw = raw.split(":")[0]  # drop version/alias qualifiers
+    elif resource_type == "log_group":
+        raw = raw.removesuffix(":*")
+    elif resource_type == "iam_role":
+        raw = raw.rsplit("/", 1)[-1]  # role/path/name
+    else:
+        raw = raw.split("/")[0]  # e.g. restapis/ID/stages/prod
+    return resource_type, TYPE_SERVICES[resource_type], _ID_PREFIXES.get(resource_type, "") + raw, raw
+
+
+class InventoryDiscovery:
+    """Build a first-pass graph of one account from bulk inventory APIs.
+
+    Without ``aggregator`` each region is listed with the Resource Groups Tagging
+    API; with it, one AWS Config aggregator query covers every region (filtered
+    to ``regions``) and is limited to ``account_id``, since an organization
+    aggregator also holds every member account's resources. Several regions
+    produce region-qualified IDs exactly as MultiRegionScanner does.
+    """
+
+    def __init__(self, session, regions: list[str], event_callback: Callable | None = None,
+                 aggregator: str | None = None, control: ScanControl | None = None,
+                 account_id: str = ""):
+        self.session = session
+        self.regions = list(dict.fromkeys(regions))
+        self.event_callback = event_callback
+        self.aggregator = aggregator
+        self.account_id = account_id
+        self.control = control or ScanControl()
+        self.metrics = scan_metrics.ScanMetrics()
+
+    def _emit(self, event: str, data: dict):
+        if self.event_callback:
+            self.event_callback(event, data)
+
+    def _client(self, service_name: str, region: str):
+        return scan_metrics.instrument(self.session.client(service_name, region_name=region))
+
+    def scan(self) -> InfraGraph:
+        source = "config" if self.aggregator else "tagging"
+        region_graphs = {region: InfraGraph(region=region) for region in self.regions}
+        fragments: dict[tuple[str, str], InfraGraph] = {}
+        errors: list[dict] = []
+
+        def fragment(region: str, service: str) -> InfraGraph:
+            # One fragment per (region, scanner service), merged like a scanner's
+            key = (region, service)
+            if key not in fragments:
+                fragments[key] = InfraGraph(region=region)
+            return fragments[key]
+
+        total = 1 if self.aggregator else len(self.regions)
+        for idx, region in enumerate([self.regions[0]] if self.aggregator else self.regions):
+            label = "Inventory (Config)" if self.aggregator else f"Inventory ({region})"
+            self._emit("infra_scan_progress", {
+                "service": label, "index": idx, "total": total, "status": "scanning",
+            })
+            try:
+                with scan_metrics.scanner_scope(self.metrics, "Inventory"), \
+                        scan_control.active(self.control):
+                    if self.aggregator:
+                        self._list_config(fragment)
+                    else:
+                        self._list_tagged(region, fragment)
+                status = {"status": "done"}
+            except ScanCancelled as e:
+                errors.append({"service": "Inventory", "region": region,
+                               "error": f"{e}; partial results kept", "cancelled": True})
+                status = {"status": "error", "error": str(e)}
+            except Exception as e:
+                error_msg = str(e)[:200]
+                log.warning("Inventory of %s failed: %s", region, error_msg)
+                errors.append({"service": "Inventory", "region": region, "error": error_msg})
+                status = {"status": "error", "error": error_msg}
+            self._emit("infra_scan_progress", {
+                "service": label, "index": idx, "total": total, **status,
+            })
+
+        for (region, service), frag in fragments.items():
+            region_graphs[region].merge(frag, service=service)
+
+        if len(self.regions) == 1:
+            graph = region_graphs[self.regions[0]]
+        else:
+            graph = InfraGraph(region="multi-region")
+            for region, region_graph in region_graphs.items():
+                merge_region_graph(graph, region_graph, region)
+        graph.scan_errors.extend(errors)
+        graph.resolve_links()
+        graph.scan_meta["regions"] = self.regions
+        graph.scan_meta["inventory"] = {"source": source, "expanded": []}
+        graph.scan_meta["metrics"] = {self.regions[0]: self.metrics.to_dict()}
+        return graph
+
+    def _add(self, fragment, region: str, arn: str, tags: dict,
+             properties: dict | None = None) -> tuple[str, str, str] | None:
+        """Add the resource behind ``arn``; returns (home region, id, resource type)."""
+        parsed = parse_arn(arn)
+        if parsed is None:
+            return None
+        resource_type, service, rid, name = parsed
+        if service in GLOBAL_SERVICES:
+            region = "global"
+        # Global resources show up in whichever region lists them; keep them once
+        home = self.regions[0] if region == "global" else region
+        if home not in self.regions:
+            return None
+        fragment(home, service).add_resource(DiscoveredResource(
+            id=rid, arn=arn, resource_type=resource_type, service=service,
+            name=tags.get("Name") or name, region=region,
+            properties=properties or {}, tags=tags,
+        ))
+        return home, rid, resource_type
+
+    def _list_tagged(self, region: str, fragment):
+        client = self._client("resourcegroupstaggingapi", region)
+        for page in paginate_with_retry(client, "get_resources",
+                                        ResourcesPerPage=INVENTORY_PAGE_SIZE):
+            scan_metrics.record_page(client, "get_resources")
+            for item in page.get("ResourceTagMappingList", []):
+                tags = {t["Key"]: t["Value"] for t in item.get("Tags", [])}
+                self._add(fragment, region, item.get("ResourceARN", ""), tags)
+
+    def _list_config(self, fragment):
+        if not self.account_id.isdigit():
+            raise ValueError("Account ID unknown; cannot limit the Config aggregator "
+                             "to this account")
+        client = self._client("config", self.regions[0])
+        types = ", ".join(f"'{t}'" for t in CONFIG_RESOURCE_TYPES)
+        expression = (
+            "SELECT resourceId, resourceType, awsRegion, arn, tags, "
+            "configuration.vpcId, configuration.subnetId "
+            f"WHERE resourceType IN ({types}) AND accountId = '{self.account_id}'"
+        )
+        for page in paginate_with_retry(client, "select_aggregate_resource_config",
+                                        Expression=expression,
+                                        ConfigurationAggregatorName=self.aggregator):
+            scan_metrics.record_page(client, "select_aggregate_resource_config")
+            for raw in page.get("Results", []):
+                item = json.loads(raw)
+                tags = {t["key"]: t["value"] for t in item.get("tags", [])}
+                config = item.get("configuration") or {}
+                properties = {k: v for k, v in (("vpc_id", config.get("vpcId")),
+                                                ("subnet_id", config.get("subnetId"))) if v}
+                added = self._add(fragment, item.get("awsRegion", ""), item.get("arn", ""),
+                                  tags, properties)
+                if added is None or not properties:
+                    continue
+                home, rid, r_type = added
+                # Placement Config records: VPC -> subnet, subnet (or VPC) -> instance
+                if r_type == "subnet" and "vpc_id" in properties:
+                    fragment(home, "VPC").link(properties["vpc_id"], rid, "contains", "subnet")
+                elif r_type == "ec2_instance":
+                    parent = properties.get("subnet_id") or properties.get("vpc_id")
+                    fragment(home, "EC2").link(parent, rid, "contains", "instance")
@@ -0,0 +1,191 @@
+"""Content-addressed cache of diagram layouts.
+
+A layout (positions, collapse map and visible resources) depends only on the
+graph's resources and edges and on the layout engine's options, so it is cached
+under a hash of both. Switching between React Flow and draw.io output, or
+reopening a diagram, then skips collapsing, containment and positioning.
+
+Graphs the server stored carry ``scan_meta["content_hash"]`` (see
+CompactGraph.content_hash), which is used as the graph part of the key instead
+of hashing the whole posted graph; other graphs (e.g. partial ones rendered
+while a scan streams) are hashed in full.
+
+Stored graphs that differ little from their predecessor carry a
+``scan_meta["diff"]``; when the predecessor's layout is cached, the new one is
+derived from it incrementally instead (AlgorithmicLayoutEngine.relayout).
+
+Entries live in an in-memory LRU; with ``disk_dir`` set, they are also written
+there as gzip-compressed JSON (pruned to ``max_disk_entries`` by age), so they
+survive restarts.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+log = logging.getLogger(__name__)
+
+DEFAULT_LAYOUT_CACHE_ENTRIES = 32
+DEFAULT_DISK_ENTRIES = 128
+# Stored graphs get a diff against their predecessor when at most this share changed
+INCREMENTAL_MAX_CHANGE = 0.25
+
+
+def graph_key(content_hash: str, n_resources: int, n_edges: int) -> str:
+    """Graph part of the cache key for a graph the server hashed."""
+    # Counts guard against a payload edited after the server hashed it
+    return f"{content_hash}:{n_resources}:{n_edges}"
+
+
+def graph_hash(graph_dict: dict) -> str:
+    """Stable hash of a graph payload's resources and edges."""
+    resources = graph_dict.get("resources", {})
+    edges = graph_dict.get("edges", [])
+    content_hash = (graph_dict.get("scan_meta") or {}).get("content_hash")
+    if content_hash:
+        return graph_key(content_hash, len(resources), len(edges))
+    if orjson is not None:
+        data = orjson.dumps([resources, edges], option=orjson.OPT_SORT_KEYS, default=str)
+    else:
+        data = json.dumps([resources, edges], sort_keys=True, separators=(",", ":"),
+                          default=str).encode()
+    return hashlib.sha256(data).hexdigest()
+
+
+def _rebind(result: tuple, graph_dict: dict) -> tuple[dict, dict, dict]:
+    """A cached layout whose visible resources are those of ``graph_dict``.
+
+    The key leaves out volatile properties (CompactGraph.content_hash), so the
+    cached resources may carry stale alarm states, queue depths and the like.
+    """
+    positions, collapse_map, visible = result
+    resources = graph_dict.get("resources", {})
+    return positions, collapse_map, {rid: resources.get(rid, r) for rid, r in visible.items()}
+
+
+class LayoutCache:
+    """LRU of layouts keyed by graph hash + engine options, with an optional disk tier."""
+
+    def __init__(self, max_entries: int = DEFAULT_LAYOUT_CACHE_ENTRIES,
+                 disk_dir: Path | None = None, max_disk_entries: int = DEFAULT_DISK_ENTRIES):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self._entries: OrderedDict[str, tuple] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(graph_dict: dict, engine, graph_part: str | None = None) -> str:
+        options = json.dumps(engine.options(), sort_keys=True)
+        graph_part = graph_part or graph_hash(graph_dict)
+        return hashlib.sha256(f"{graph_part}|{options}".encode()).hexdigest()
+
+    def layout(self, graph_dict: dict, engine) -> tuple[dict, dict, dict]:
+        """engine.layout(graph_dict), served from the cache when possible.
+
+        A graph whose ``scan_meta["diff"]`` names a base graph with a cached
+        layout is laid out incrementally from it (engine.relayout), so nodes
+        that were already on screen stay where they were.
+
+        The result is shared between callers: treat it as read-only.
+        """
+        key = self.key(graph_dict, engine)
+        cached = self._get(key)
+        if cached is not None:
+            return _rebind(cached, graph_dict)
+        diff = (graph_dict.get("scan_meta") or {}).get("diff")
+        base = self._get(self.key({}, engine, diff["base"])) if diff else None
+        if base is not None:
+            result = engine.relayout(base, graph_dict, diff)
+        else:
+            result = engine.layout(graph_dict)
+        self._put(key, result)
+        return result
+
+    def _get(self, key: str) -> tuple | None:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+        result = self._read_disk(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, result)
+        return result
+
+    def _put(self, key: str, result: tuple):
+        with self._lock:
+            self._remember(key, result)
+        self._write_disk(key, result)
+
+    def _remember(self, key: str, result: tuple):
+        # Caller holds the lock
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.disk_dir is not None:
+            for path in self.disk_dir.glob("*.json.gz"):
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "disk": str(self.disk_dir) if self.disk_dir else None}
+
+    # -- disk tier --
+
+    def _path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.json.gz"
+
+    def _read_disk(self, key: str) -> tuple | None:
+        if self.disk_dir is None:
+            return None
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rb") as f:
+                positions, collapse_map, visible = json.loads(f.read())
+            os.utime(path)  # pruning goes by age of last use
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log.warning("Dropping unreadable layout cache entry %s: %s", path.name, e)
+            path.unlink(missing_ok=True)
+            return None
+        return positions, collapse_map, visible
+
+    def _write_disk(self, key: str, result: tuple):
+        if self.disk_dir is None:
+            return
+        try:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self.disk_dir / f"{key}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp, "wb", compresslevel=6) as f:
+                f.write(json.dumps(list(result), separators=(",", ":"), default=str).encode())
+            tmp.replace(self._path(key))
+            entries = sorted(self.disk_dir.glob("*.json.gz"), key=lambda p: p.stat().st_mtime)
+            for path in entries[:max(0, len(entries) - self.max_disk_entries)]:
+                path.unlink(missing_ok=True)
+        except OSError as e:
+            log.warning("Could not write layout cache entry: %s", e)
@@ -88,9 +88,8 @@ class BedrockProvider(LlmProvider):
         self.model_id = config.get("model", "anthropic.claude-sonnet-4-5-20250929-v1:0")
 
     def _get_client(self):
-        import boto3
-        session = boto3.Session(profile_name=self.profile)
-        return session.client("bedrock-runtime", region_name=self.region)
+        from .aws_clients import clients
+        return clients.client(self.profile, "bedrock-runtime", self.region)
 
     def generate(self, system_prompt: str, user_message: str) -> Generator[str, None, None]:
         client = self._get_client()
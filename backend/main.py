@@ -4,14 +4,16 @@ Ported from legacy/app.py L393-491 (Handler class + server setup).
 """
 
 import asyncio
+import gzip
 import queue as qmod
+import re
 import threading
 from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, StreamingResponse
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, Response, StreamingResponse
 
 from .api_service import ApiService
 from .event_bus import events
@@ -23,11 +25,16 @@ from .models import (
     BulkRunRequest,
     DeleteCategoryRequest,
     DeleteProfileRequest,
+    DiagramViewportRequest,
     DiscoverServicesRequest,
     DiscoverSsoRequest,
+    DrawioExportRequest,
     EditCategoryRequest,
+    FleetScanRequest,
     InfraDiagramRequest,
     InfraLlmLayoutRequest,
+    InfraExpandRequest,
+    InfraRescanRequest,
     InfraScanRequest,
     SetEncodingRequest,
     GetCostRequest,
@@ -36,6 +43,9 @@ from .models import (
     RunCommandRequest,
     SaveLlmConfigRequest,
     SetProfileCategoryRequest,
+    SetLayoutCacheRequest,
+    SetScanCacheTtlRequest,
+    SetScanSchedulesRequest,
     SetThemeRequest,
     TestLlmProviderRequest,
     ToggleCollapsedRequest,
@@ -59,7 +69,9 @@ async def lifespan(app: FastAPI):
             events.send("sso_status", sso)
 
     threading.Thread(target=startup, daemon=True).start()
+    api.scheduler.start()
     yield
+    api.scheduler.stop()
 
 
 app = FastAPI(title="AWS Profile Manager", lifespan=lifespan)
@@ -298,12 +310,96 @@ async def import_json(request: Request):
 
 @app.post("/api/infra_scan")
 async def infra_scan(req: InfraScanRequest):
-    return api.infra_scan(req.profile, req.region, req.services)
+    return api.infra_scan(req.profile, req.region, req.services, req.regions, req.max_age,
+                          req.limits, req.timeout, req.mode, req.config_aggregator)
+
+
+@app.post("/api/infra_rescan")
+async def infra_rescan(req: InfraRescanRequest):
+    return api.infra_rescan(req.profile, req.services)
+
+
+@app.post("/api/infra_expand")
+async def infra_expand(req: InfraExpandRequest):
+    return api.infra_expand(req.profile, req.resource_types)
+
+
+@app.post("/api/set_scan_cache_ttl")
+async def set_scan_cache_ttl(req: SetScanCacheTtlRequest):
+    return api.set_scan_cache_ttl(req.ttl)
+
+
+@app.get("/api/scan_schedules")
+async def scan_schedules():
+    return api.get_scan_schedules()
+
+
+@app.post("/api/scan_schedules")
+async def set_scan_schedules(req: SetScanSchedulesRequest):
+    return api.set_scan_schedules([s.model_dump() for s in req.schedules])
+
+
+@app.post("/api/fleet_scan")
+async def fleet_scan(req: FleetScanRequest):
+    return api.fleet_scan(req.profiles, req.category_id, req.regions, req.services)
+
+
+@app.get("/api/infra_graph/{profile}")
+async def infra_graph(profile: str):
+    return api.get_infra_graph(profile)
+
+
+@app.get("/api/infra_latest")
+async def infra_latest(profile: str | None = None):
+    return api.get_latest_scan(profile)
+
+
+@app.get("/api/infra_scans/{scan_id}")
+async def infra_scan_graph(scan_id: str, request: Request):
+    payload = await asyncio.to_thread(api.get_infra_scan, scan_id)
+    if payload is None:
+        return JSONResponse({"error": f"Scan {scan_id} not found"}, status_code=404)
+    if "gzip" not in request.headers.get("accept-encoding", ""):
+        return Response(gzip.decompress(payload), media_type="application/json")
+    return Response(payload, media_type="application/json",
+                    headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"})
+
+
+@app.post("/api/infra_scans/{scan_id}/cancel")
+async def cancel_infra_scan(scan_id: str):
+    return api.cancel_scan(scan_id)
+
+
+@app.get("/api/infra_scans/{scan_id}/metrics")
+async def infra_scan_metrics(scan_id: str):
+    return api.get_scan_metrics(scan_id)
 
 
 @app.post("/api/infra_diagram")
 async def infra_diagram(req: InfraDiagramRequest):
-    return api.generate_diagram(req.graph, req.layout_mode, req.format, req.llm_result)
+    return api.generate_diagram(req.graph, req.layout_mode, req.format, req.llm_result,
+                                req.lod)
+
+
+@app.post("/api/infra_diagram/viewport")
+async def infra_diagram_viewport(req: DiagramViewportRequest):
+    return api.diagram_viewport(req.key, req.x, req.y, req.width, req.height, req.zoom)
+
+
+@app.post("/api/infra_diagram/drawio")
+async def export_drawio(req: DrawioExportRequest):
+    chunks = await asyncio.to_thread(api.export_drawio, req.graph, req.compressed)
+    profile = re.sub(r"[^\w.-]", "_", req.graph.get("profile") or "diagram", flags=re.ASCII)
+    return StreamingResponse(
+        chunks,
+        media_type="application/xml",
+        headers={"Content-Disposition": f'attachment; filename="aws-architecture-{profile}.drawio"'},
+    )
+
+
+@app.post("/api/set_layout_cache")
+async def set_layout_cache(req: SetLayoutCacheRequest):
+    return api.set_layout_cache(req.on_disk)
 
 
 @app.post("/api/infra_llm_layout")
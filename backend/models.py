@@ -113,12 +113,60 @@ class InfraScanRequest(BaseModel):
     profile: str | None = None
     region: str | None = None
     services: list[str] | None = None
+    regions: list[str] | None = None  # more than one → multi-region scan
+    max_age: float | None = None  # snapshot TTL override in seconds; 0 forces a rescan
+    limits: dict[str, int] | None = None  # items listed per resource type / "default"; 0 = all
+    timeout: float | None = None  # whole-scan deadline in seconds
+    mode: str = "detailed"  # "detailed" or "inventory" (quick first pass)
+    config_aggregator: str | None = None  # inventory mode: query this AWS Config aggregator
+
+class InfraRescanRequest(BaseModel):
+    profile: str | None = None
+    services: list[str]
+
+class InfraExpandRequest(BaseModel):
+    profile: str | None = None
+    resource_types: list[str]
+
+class SetScanCacheTtlRequest(BaseModel):
+    ttl: float
+
+class SetLayoutCacheRequest(BaseModel):
+    on_disk: bool
+
+class ScanSchedule(BaseModel):
+    profile: str
+    regions: list[str] | None = None  # empty → the profile's default region
+    services: list[str] | None = None
+    interval: float | None = None  # seconds between rescans (jittered)
+
+class SetScanSchedulesRequest(BaseModel):
+    schedules: list[ScanSchedule]
+
+class FleetScanRequest(BaseModel):
+    profiles: list[str] | None = None
+    category_id: str | None = None
+    regions: list[str] | None = None
+    services: list[str] | None = None
 
 class InfraDiagramRequest(BaseModel):
     graph: dict
     layout_mode: str = "algorithmic"  # "algorithmic" or "llm"
     format: str = "reactflow"  # "reactflow" or "drawio"
     llm_result: dict | None = None
+    lod: bool = False  # large diagrams: overview + /api/infra_diagram/viewport queries
+
+class DiagramViewportRequest(BaseModel):
+    key: str
+    x: float
+    y: float
+    width: float
+    height: float
+    zoom: float
+
+class DrawioExportRequest(BaseModel):
+    graph: dict
+    compressed: bool = False  # draw.io's deflate+base64 diagram encoding
 
 class InfraLlmLayoutRequest(BaseModel):
     graph: dict
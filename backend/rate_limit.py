@@ -0,0 +1,180 @@
+"""Shared AWS API rate limiting and throttle retries for infrastructure scans.
+
+Every API call made by a scanner takes a token from the bucket for its
+(service, region) before it goes out. Buckets are process-wide, so concurrent
+scanners, regions and profiles hitting the same endpoint share one budget.
+The rate adapts AIMD-style: it halves when AWS throttles and creeps back up
+with every successful call. Throttled calls are retried with exponential backoff
+and full jitter; paginated calls are made page by page, following the service's
+pagination tokens, so only the throttled page is retried.
+Waits and calls honour the current scan's cancellation and deadline (scan_control).
+"""
+
+import functools
+import logging
+import random
+import threading
+import time
+from typing import Iterator
+
+import botocore.session
+import jmespath
+from botocore.exceptions import ClientError, PaginationError
+
+from . import scan_control
+
+log = logging.getLogger(__name__)
+
+THROTTLE_CODES = frozenset({
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestLimitExceeded",
+    "RequestThrottled",
+    "RequestThrottledException",
+    "TooManyRequestsException",
+    "SlowDown",
+})
+
+DEFAULT_RATE = 50.0  # requests per second per (service, region)
+MIN_RATE = 0.5
+RATE_INCREASE = 0.2  # added to the rate after each successful call
+# Services with documented per-account limits far from the default
+_SERVICE_RATES = {
+    "dynamodb": 100.0,
+    "sqs": 100.0,
+    "route53": 5.0,
+    "cloudfront": 5.0,
+    "iam": 10.0,
+    "apigateway": 10.0,
+}
+
+MAX_ATTEMPTS = 6
+BACKOFF_BASE = 0.5  # seconds
+BACKOFF_CAP = 20.0
+
+
+def is_throttle(exc: Exception) -> bool:
+    return isinstance(exc, ClientError) and exc.response.get("Error", {}).get("Code") in THROTTLE_CODES
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given (0-based) retry attempt."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+class TokenBucket:
+    """Token bucket whose refill rate adapts to throttling (AIMD)."""
+
+    def __init__(self, rate: float = DEFAULT_RATE):
+        self.max_rate = rate
+        self.rate = rate
+        self.tokens = rate
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.rate, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            scan_control.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + RATE_INCREASE)
+
+    def on_throttle(self):
+        with self._lock:
+            self.rate = max(MIN_RATE, self.rate / 2)
+            self.tokens = min(self.tokens, 0)
+
+
+_buckets: dict[tuple[str, str], TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def bucket_for(service: str, region: str) -> TokenBucket:
+    key = (service, region)
+    with _buckets_lock:
+        if key not in _buckets:
+            _buckets[key] = TokenBucket(_SERVICE_RATES.get(service, DEFAULT_RATE))
+        return _buckets[key]
+
+
+def _client_bucket(client) -> TokenBucket:
+    meta = client.meta
+    return bucket_for(meta.service_model.service_name, meta.region_name or "")
+
+
+def call_with_retry(client, method: str, **kwargs) -> dict:
+    """Call ``client.<method>(**kwargs)`` under the rate limiter, retrying throttles."""
+    bucket = _client_bucket(client)
+    for attempt in range(MAX_ATTEMPTS):
+        scan_control.check()
+        bucket.acquire()
+        try:
+            resp = getattr(client, method)(**kwargs)
+        except ClientError as e:
+            if not is_throttle(e) or attempt == MAX_ATTEMPTS - 1:
+                raise
+            bucket.on_throttle()
+            delay = backoff_delay(attempt)
+            log.info("Throttled on %s, retrying in %.1fs", method, delay)
+            scan_control.sleep(delay)
+            continue
+        bucket.on_success()
+        return resp
+
+
+@functools.lru_cache(maxsize=1)
+def _botocore_session() -> botocore.session.Session:
+    return botocore.session.get_session()
+
+
+@functools.lru_cache(maxsize=None)
+def _pagination_tokens(service: str, api_version: str, operation: str):
+    """(input token names, compiled output token expressions, more-results expression)."""
+    config = _botocore_session().get_paginator_model(service, api_version).get_paginator(operation)
+    inputs = config["input_token"]
+    outputs = config["output_token"]
+    inputs = inputs if isinstance(inputs, list) else [inputs]
+    outputs = outputs if isinstance(outputs, list) else [outputs]
+    more = config.get("more_results")
+    return inputs, [jmespath.compile(o) for o in outputs], more and jmespath.compile(more)
+
+
+def paginate_with_retry(client, method: str, **kwargs) -> Iterator[dict]:
+    """Yield the pages of a paginated call, each one fetched with call_with_retry.
+
+    The next page's token is read from the service's paginator model, so a
+    throttled page is retried on its own and pages already yielded are never
+    fetched twice.
+    """
+    meta = client.meta
+    inputs, outputs, more = _pagination_tokens(
+        meta.service_model.service_name, meta.service_model.api_version,
+        meta.method_to_api_mapping[method])
+    previous = None
+    while True:
+        page = call_with_retry(client, method, **kwargs)
+        yield page
+        if more is not None and not more.search(page):
+            return
+        tokens = {name: value for name, expr in zip(inputs, outputs)
+                  if (value := expr.search(page))}
+        if not tokens:
+            return
+        if tokens == previous:
+            raise PaginationError(message=f"The same next token was received twice: {tokens}")
+        previous = tokens
+        kwargs = {**{k: v for k, v in kwargs.items() if k not in inputs}, **tokens}
@@ -0,0 +1,110 @@
+"""Cooperative cancellation and deadlines for infrastructure scans.
+
+A ScanControl is created per scan. Each scanner runs under a child control
+carrying its own deadline, installed in a context variable that the enrichment
+pool copies into its tasks. The rate limiter checks the current control before
+every API call and page, and sleeps through it during backoff, so cancelling a
+scan or passing a deadline stops pagination at the next page boundary. A call
+that is already in flight is not interrupted; botocore's own timeouts bound it.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_SCAN_TIMEOUT = 1800.0  # seconds for a whole scan (all regions)
+DEFAULT_SCANNER_TIMEOUT = 600.0  # seconds for one scanner in one region
+
+_current: contextvars.ContextVar = contextvars.ContextVar("scan_control", default=None)
+
+
+class ScanCancelled(Exception):
+    """Raised inside a scan once it has been cancelled."""
+
+
+class ScanTimeout(ScanCancelled):
+    """Raised inside a scan, or one of its scanners, past its deadline."""
+
+
+class ScanControl:
+    """Cancellation flag plus an optional deadline, checked cooperatively."""
+
+    def __init__(self, timeout: float | None = None, parent: "ScanControl | None" = None):
+        self.parent = parent
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.reason = ""
+        self._cancelled = threading.Event()
+
+    def child(self, timeout: float | None = None) -> "ScanControl":
+        """A control that also stops at its own deadline (e.g. one scanner's)."""
+        return ScanControl(timeout, parent=self)
+
+    def cancel(self, reason: str = "Scan cancelled"):
+        self.reason = reason
+        self._cancelled.set()
+
+    def check(self):
+        """Raise ScanCancelled/ScanTimeout if this control or any parent has stopped."""
+        if self.parent is not None:
+            self.parent.check()
+        if self._cancelled.is_set():
+            raise ScanCancelled(self.reason)
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise ScanTimeout(f"Timed out after {self.timeout:g}s")
+
+    def state(self) -> str | None:
+        """None while running, else "cancelled" or "timeout"."""
+        try:
+            self.check()
+        except ScanTimeout:
+            return "timeout"
+        except ScanCancelled:
+            return "cancelled"
+        return None
+
+    def _remaining(self) -> float | None:
+        remaining = None if self.deadline is None else self.deadline - time.monotonic()
+        if self.parent is not None:
+            parent = self.parent._remaining()
+            if parent is not None:
+                remaining = parent if remaining is None else min(remaining, parent)
+        return remaining
+
+    def sleep(self, seconds: float):
+        """Sleep up to ``seconds``, waking early on cancellation or the deadline."""
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        remaining = self._remaining()
+        if remaining is not None:
+            seconds = min(seconds, max(0.0, remaining))
+        root._cancelled.wait(seconds)
+        self.check()
+
+
+@contextmanager
+def active(control: ScanControl):
+    """Make ``control`` the current one for this context (and copies of it)."""
+    token = _current.set(control)
+    try:
+        yield control
+    finally:
+        _current.reset(token)
+
+
+def check():
+    """Check the current scan's control, if any."""
+    control = _current.get()
+    if control is not None:
+        control.check()
+
+
+def sleep(seconds: float):
+    """time.sleep that a cancelled scan or expired deadline cuts short."""
+    control = _current.get()
+    if control is None:
+        time.sleep(seconds)
+    else:
+        control.sleep(seconds)
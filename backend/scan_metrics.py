@@ -0,0 +1,196 @@
+"""Per-scan AWS API call instrumentation, collected through botocore event hooks.
+
+Every client a scan creates gets ``before-call``/``after-call`` handlers. While a
+scanner runs, its ScanMetrics and name are held in a context variable (copied into
+the enrichment pool), so each API call is attributed to the scanner and operation
+that made it. Pooled clients shared by other code record nothing outside a scan.
+
+Per scanner and operation a scan records calls, pages, latency (total, max and a
+fixed-bucket histogram), botocore-level retries, throttled responses and errors.
+The result lands in ``InfraGraph.scan_meta["metrics"]``, keyed by region
+("global" for the global services of a multi-region scan) and scanner name.
+"""
+
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from .rate_limit import THROTTLE_CODES
+
+# Upper bounds of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_START_KEY = "scan_metrics_start"
+_OPERATION_KEY = "scan_metrics_operation"
+# (ScanMetrics, scanner name) for the scanner running in this context
+_current: contextvars.ContextVar = contextvars.ContextVar("scan_metrics", default=None)
+
+
+def _new_op() -> dict:
+    return {
+        "calls": 0, "pages": 0, "retries": 0, "throttles": 0, "errors": 0,
+        "latency_ms": {"total": 0.0, "max": 0.0, "buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1)},
+    }
+
+
+class ScanMetrics:
+    """Thread-safe counters for one InfraDiscoveryService scan."""
+
+    def __init__(self):
+        self._scanners: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _scanner(self, scanner: str) -> dict:
+        stats = self._scanners.get(scanner)
+        if stats is None:
+            stats = self._scanners[scanner] = {"duration_s": 0.0, "cached": False, "operations": {}}
+        return stats
+
+    def _op(self, scanner: str, operation: str) -> dict:
+        ops = self._scanner(scanner)["operations"]
+        if operation not in ops:
+            ops[operation] = _new_op()
+        return ops[operation]
+
+    def record_call(self, scanner: str, operation: str, latency_ms: float, retries: int = 0,
+                    throttled: bool = False, error: bool = False):
+        with self._lock:
+            op = self._op(scanner, operation)
+            op["calls"] += 1
+            op["retries"] += retries
+            op["throttles"] += throttled
+            op["errors"] += error
+            latency = op["latency_ms"]
+            latency["total"] += latency_ms
+            latency["max"] = max(latency["max"], latency_ms)
+            latency["buckets"][bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+
+    def record_page(self, scanner: str, operation: str):
+        with self._lock:
+            self._op(scanner, operation)["pages"] += 1
+
+    def record_scanner(self, scanner: str, duration_s: float, cached: bool = False):
+        with self._lock:
+            stats = self._scanner(scanner)
+            stats["duration_s"] = round(duration_s, 3)
+            stats["cached"] = cached
+
+    def to_dict(self) -> dict:
+        """{scanner: {duration_s, cached, calls, …, operations: {operation: {...}}}}."""
+        with self._lock:
+            out = {}
+            for name, stats in self._scanners.items():
+                ops = {
+                    op: {**counts, "latency_ms": {
+                        "total": round(counts["latency_ms"]["total"], 1),
+                        "max": round(counts["latency_ms"]["max"], 1),
+                        "buckets": list(counts["latency_ms"]["buckets"]),
+                    }}
+                    for op, counts in stats["operations"].items()
+                }
+                totals = {
+                    key: sum(op[key] for op in ops.values())
+                    for key in ("calls", "pages", "retries", "throttles", "errors")
+                }
+                out[name] = {"duration_s": stats["duration_s"], "cached": stats["cached"],
+                             **totals, "operations": ops}
+            return out
+
+
+@contextmanager
+def scanner_scope(metrics: ScanMetrics, scanner: str):
+    """Attribute API calls made in this context (and contexts copied from it) to ``scanner``."""
+    token = _current.set((metrics, scanner))
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def record_page(client, method: str):
+    """Count one page of a paginated ``method`` call made by the current scanner."""
+    scope = _current.get()
+    if scope is not None:
+        metrics, scanner = scope
+        metrics.record_page(scanner, client.meta.method_to_api_mapping.get(method, method))
+
+
+def _before_call(model, context, **kwargs):
+    context[_START_KEY] = time.perf_counter()
+    context[_OPERATION_KEY] = model.name
+
+
+def _after_call(http_response, parsed, model, context, **kwargs):
+    scope = _current.get()
+    if scope is None:
+        return
+    metrics, scanner = scope
+    started = context.get(_START_KEY)
+    latency_ms = (time.perf_counter() - started) * 1000 if started else 0.0
+    code = (parsed or {}).get("Error", {}).get("Code")
+    metrics.record_call(
+        scanner, model.name, latency_ms,
+        retries=(parsed or {}).get("ResponseMetadata", {}).get("RetryAttempts", 0),
+        throttled=code in THROTTLE_CODES,
+        error=code is not None,
+    )
+
+
+def _after_call_error(exception, context, **kwargs):
+    # Connection errors and the like: no response was parsed
+    scope = _current.get()
+    if scope is None:
+        return
+    metrics, scanner = scope
+    started = context.get(_START_KEY)
+    latency_ms = (time.perf_counter() - started) * 1000 if started else 0.0
+    metrics.record_call(scanner, context.get(_OPERATION_KEY, "unknown"), latency_ms, error=True)
+
+
+def instrument(client):
+    """Register the metrics hooks on ``client`` (idempotent)."""
+    hooks = client.meta.events
+    # First, so a stubbed response (which short-circuits before-call) is still timed
+    hooks.register_first("before-call", _before_call, unique_id="scan-metrics-before")
+    hooks.register("after-call", _after_call, unique_id="scan-metrics-after")
+    hooks.register("after-call-error", _after_call_error, unique_id="scan-metrics-error")
+    return client
+
+
+def merge_metrics(base: dict, metrics: dict) -> dict:
+    """``base`` with the scanners in ``metrics`` (e.g. from a rescan) replaced, per region."""
+    merged = {region: dict(scanners) for region, scanners in base.items()}
+    for region, scanners in metrics.items():
+        merged.setdefault(region, {}).update(scanners)
+    return merged
+
+
+def summarize(metrics: dict, top: int = 10) -> dict:
+    """Totals plus the slowest scanners and operations across all regions."""
+    scanners = []
+    operations = []
+    totals = {"calls": 0, "pages": 0, "retries": 0, "throttles": 0, "errors": 0}
+    for region, by_scanner in metrics.items():
+        for name, stats in by_scanner.items():
+            for key in totals:
+                totals[key] += stats[key]
+            scanners.append({"region": region, "scanner": name, "duration_s": stats["duration_s"],
+                             "calls": stats["calls"], "throttles": stats["throttles"]})
+            for op, counts in stats["operations"].items():
+                latency = counts["latency_ms"]
+                operations.append({
+                    "region": region, "scanner": name, "operation": op,
+                    "calls": counts["calls"], "total_ms": latency["total"],
+                    "mean_ms": round(latency["total"] / counts["calls"], 1) if counts["calls"] else 0.0,
+                    "max_ms": latency["max"], "throttles": counts["throttles"],
+                })
+    scanners.sort(key=lambda s: s["duration_s"], reverse=True)
+    operations.sort(key=lambda o: o["total_ms"], reverse=True)
+    return {
+        **totals,
+        "latency_buckets_ms": list(LATENCY_BUCKETS_MS),
+        "slowest_scanners": scanners[:top],
+        "slowest_operations": operations[:top],
+    }
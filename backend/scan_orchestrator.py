@@ -0,0 +1,372 @@
+"""Scan orchestration on top of InfraDiscoveryService — multi-region fan-out.
+
+Each region is scanned by its own InfraDiscoveryService with links left pending.
+Region graphs are merged into one InfraGraph with region-qualified IDs
+("eu-west-1/vpc-0abc…"), then links are resolved once across the merged graph.
+Global services (S3, IAM, CloudFront, Route53) are scanned once per account per
+scan session through a GlobalServiceLayer and shared by every region.
+FleetScanner runs multi-region scans for many profiles under a fleet-wide and a
+per-account concurrency cap.
+"""
+
+import logging
+import threading
+import time
+from contextlib import ExitStack
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import replace
+from typing import Callable
+
+from .infra_discovery import (
+    DEFAULT_SCAN_WORKERS,
+    GLOBAL_SERVICES,
+    InfraDiscoveryService,
+    InfraGraph,
+    graph_delta,
+    scanner_names,
+)
+from .scan_control import DEFAULT_SCANNER_TIMEOUT, ScanControl
+from .scan_store import DEFAULT_SNAPSHOT_TTL, SnapshotPolicy, SnapshotStore
+
+log = logging.getLogger(__name__)
+
+DEFAULT_REGION_WORKERS = 4
+DEFAULT_FLEET_WORKERS = 8   # region scans running at once across the whole fleet
+DEFAULT_ACCOUNT_WORKERS = 2  # region scans running at once per account
+
+# Properties holding resource IDs — rewritten so containment survives qualification
+_ID_PROPERTIES = ("vpc_id", "subnet_id")
+_ID_LIST_PROPERTIES = ("subnet_ids", "security_groups", "vpc_subnet_ids", "vpc_sg_ids")
+
+
+def qualify_id(region: str, rid: str) -> str:
+    return f"{region}/{rid}"
+
+
+def merge_region_graph(target: InfraGraph, graph: InfraGraph, region: str) -> InfraGraph:
+    """Merge a single-region graph into ``target`` with region-qualified IDs.
+
+    Global resources (S3, IAM, CloudFront, Route53) keep their IDs so every region
+    shares one node. ARN and DNS references are already unique and kept as-is.
+    Returns the qualified fragment that was merged.
+    """
+    global_ids = {rid for rid, r in graph.resources.items() if r.region == "global"}
+
+    def q(rid: str) -> str:
+        return rid if not rid or rid in global_ids else qualify_id(region, rid)
+
+    fragment = InfraGraph(region=region)
+    for rid, r in graph.resources.items():
+        if rid in global_ids:
+            fragment.add_resource(r)
+            continue
+        props = dict(r.properties)
+        for key in _ID_PROPERTIES:
+            if props.get(key):
+                props[key] = q(props[key])
+        for key in _ID_LIST_PROPERTIES:
+            if props.get(key):
+                props[key] = [q(v) for v in props[key]]
+        fragment.add_resource(replace(r, id=q(rid), properties=props))
+
+    for lk in graph.links:
+        fragment.links.append(replace(
+            lk,
+            source=q(lk.source) if lk.source_kind == "id" else lk.source,
+            target=q(lk.target) if lk.target_kind == "id" else lk.target,
+            resolved=False,
+        ))
+    for e in graph.edges:
+        fragment.add_edge(q(e.source_id), q(e.target_id), e.edge_type, e.label)
+    fragment.scan_errors = [{**err, "region": region} for err in graph.scan_errors]
+
+    target.merge(fragment)
+    return fragment
+
+
+def _copy_graph(graph: InfraGraph) -> InfraGraph:
+    """Copy a shared graph so merging it cannot touch the original's link state."""
+    copy = InfraGraph(region=graph.region)
+    copy.resources = dict(graph.resources)
+    copy.links = [replace(lk, resolved=False) for lk in graph.links]
+    copy.edges = list(graph.edges)
+    copy.scan_errors = list(graph.scan_errors)
+    copy.scan_meta = dict(graph.scan_meta)
+    copy.reindex()
+    return copy
+
+
+class GlobalServiceLayer:
+    """Scan global services once per account and share the result for a scan session.
+
+    Concurrent callers asking for the same account wait on the first caller's scan
+    instead of starting their own.
+    """
+
+    def __init__(self):
+        self._results: dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+
+    def get(self, account_key: str, services: list[str],
+            scan_fn: Callable[[], InfraGraph]) -> tuple[InfraGraph, bool]:
+        """Return (graph copy, scanned_now) for ``services`` of ``account_key``."""
+        key = (account_key, frozenset(services))
+        with self._lock:
+            fut = self._results.get(key)
+            owner = fut is None
+            if owner:
+                fut = self._results[key] = Future()
+        if owner:
+            try:
+                fut.set_result(scan_fn())
+            except Exception as e:
+                fut.set_exception(e)
+        return _copy_graph(fut.result()), owner
+
+
+class MultiRegionScanner:
+    """Scan several regions of one account concurrently into a merged InfraGraph.
+
+    With ``stream_deltas`` an ``infra_scan_delta`` event is emitted as each region
+    (and the global layer) is merged: its qualified resources and the edges that
+    became resolvable. Region graphs are only qualified once complete, so deltas
+    are per region rather than per scanner.
+    """
+
+    def __init__(self, session, regions: list[str], event_callback: Callable | None = None,
+                 max_regions: int = DEFAULT_REGION_WORKERS,
+                 max_workers: int = DEFAULT_SCAN_WORKERS,
+                 global_layer: GlobalServiceLayer | None = None, account_key: str = "",
+                 slots: tuple = (), snapshots: SnapshotPolicy | None = None,
+                 stream_deltas: bool = False, limits: dict[str, int] | None = None,
+                 control: ScanControl | None = None,
+                 scanner_timeout: float | None = DEFAULT_SCANNER_TIMEOUT):
+        self.session = session
+        self.regions = list(dict.fromkeys(regions))
+        self.event_callback = event_callback
+        self.max_regions = max(1, max_regions)
+        self.max_workers = max_workers
+        self.global_layer = global_layer or GlobalServiceLayer()
+        self.account_key = account_key or str(getattr(session, "profile_name", "") or "")
+        # Semaphores (fleet-wide, per-account) held while a region is being scanned
+        self.slots = slots
+        self.snapshots = snapshots
+        self.stream_deltas = stream_deltas
+        self.limits = limits
+        # Shared by every region's discovery: cancelling it stops the whole scan
+        self.control = control or ScanControl()
+        self.scanner_timeout = scanner_timeout
+        self._client_lock = threading.Lock()
+
+    def _emit(self, event: str, data: dict):
+        if self.event_callback:
+            self.event_callback(event, data)
+
+    def _acquire_slots(self) -> ExitStack:
+        stack = ExitStack()
+        for slot in self.slots:
+            stack.enter_context(slot)
+        return stack
+
+    def _scan_region(self, region: str, selected_services: list[str] | None) -> InfraGraph:
+        def _callback(event: str, data: dict):
+            self._emit(event, {**data, "region": region})
+
+        discovery = InfraDiscoveryService(
+            session=self.session, region=region, event_callback=_callback,
+            max_workers=self.max_workers, client_lock=self._client_lock,
+            snapshots=self.snapshots, limits=self.limits,
+            control=self.control, scanner_timeout=self.scanner_timeout,
+        )
+        with self._acquire_slots():
+            return discovery.scan_all(selected_services=selected_services, resolve_links=False)
+
+    def _scan_global(self, services: list[str]) -> tuple[InfraGraph, bool]:
+        def _scan() -> InfraGraph:
+            def _callback(event: str, data: dict):
+                self._emit(event, {**data, "region": "global"})
+
+            discovery = InfraDiscoveryService(
+                session=self.session, region=self.regions[0], event_callback=_callback,
+                max_workers=self.max_workers, client_lock=self._client_lock,
+                snapshots=self.snapshots, limits=self.limits,
+                control=self.control, scanner_timeout=self.scanner_timeout,
+            )
+            with self._acquire_slots():
+                return discovery.scan_all(selected_services=services, resolve_links=False)
+
+        return self.global_layer.get(self.account_key, services, _scan)
+
+    def scan(self, selected_services: list[str] | None = None,
+             resolve_links: bool = True) -> InfraGraph:
+        merged = InfraGraph(region=self.regions[0] if len(self.regions) == 1 else "multi-region")
+        merged.scan_meta["regions"] = self.regions
+        durations: dict[str, float] = {}
+        metrics: dict[str, dict] = {}
+        started = time.monotonic()
+
+        selected = selected_services or scanner_names()
+        global_services = [s for s in selected if s in GLOBAL_SERVICES]
+        regional_services = [s for s in selected if s not in GLOBAL_SERVICES]
+        regions = self.regions if regional_services else []
+        total = len(regions) + (1 if global_services else 0)
+
+        with ThreadPoolExecutor(max_workers=self.max_regions,
+                                thread_name_prefix="infra-region") as pool:
+            futures = {
+                pool.submit(self._scan_region, region, regional_services): region
+                for region in regions
+            }
+            if global_services:
+                futures[pool.submit(self._scan_global, global_services)] = "global"
+            for done_idx, fut in enumerate(as_completed(futures)):
+                region = futures[fut]
+                try:
+                    if region == "global":
+                        graph, scanned_now = fut.result()
+                        # Without the layer every region would repeat the owning scan's calls
+                        calls = sum(stats["calls"]
+                                    for by_scanner in graph.scan_meta.get("metrics", {}).values()
+                                    for stats in by_scanner.values())
+                        merged.scan_meta["global_calls_saved"] = (
+                            len(self.regions) * calls - (calls if scanned_now else 0)
+                        )
+                    else:
+                        graph = fut.result()
+                except Exception as e:
+                    error_msg = str(e)[:200]
+                    log.warning("Region %s scan failed: %s", region, error_msg)
+                    merged.scan_errors.append({"service": "init", "region": region, "error": error_msg})
+                    self._emit("infra_scan_region", {
+                        "region": region, "index": done_idx, "total": total,
+                        "status": "error", "error": error_msg,
+                    })
+                    continue
+                # A reused global result made no calls for this scan
+                if region != "global" or scanned_now:
+                    for region_metrics in graph.scan_meta.get("metrics", {}).values():
+                        metrics[region] = region_metrics
+                if region == "global":
+                    merged.merge(graph)
+                    fragment = graph
+                else:
+                    fragment = merge_region_graph(merged, graph, region)
+                if self.stream_deltas:
+                    self._emit("infra_scan_delta", {
+                        "region": region,
+                        **graph_delta(fragment.resources, merged.resolve_links()),
+                    })
+                durations[region] = round(time.monotonic() - started, 2)
+                self._emit("infra_scan_region", {
+                    "region": region, "index": done_idx, "total": total, "status": "done",
+                    "resources": len(graph.resources), "errors": len(graph.scan_errors),
+                })
+
+        merged.scan_meta["region_durations"] = durations
+        merged.scan_meta["metrics"] = metrics
+        if resolve_links:
+            merged.resolve_links()
+        return merged
+
+
+class FleetScanner:
+    """Scan many profiles (accounts) concurrently, reporting each account as it finishes.
+
+    ``max_concurrent`` caps region scans across the whole fleet, ``max_per_account``
+    caps them per AWS account (several profiles may point at the same account).
+    """
+
+    def __init__(self, session_factory: Callable[[str], object], profiles: dict[str, list[str]],
+                 event_callback: Callable | None = None,
+                 on_result: Callable[[str, InfraGraph], None] | None = None,
+                 max_concurrent: int = DEFAULT_FLEET_WORKERS,
+                 max_per_account: int = DEFAULT_ACCOUNT_WORKERS,
+                 snapshot_store: SnapshotStore | None = None,
+                 max_age: float = DEFAULT_SNAPSHOT_TTL,
+                 control: ScanControl | None = None):
+        self.session_factory = session_factory
+        self.profiles = profiles  # profile -> regions to scan
+        self.event_callback = event_callback
+        self.on_result = on_result
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_per_account = max(1, max_per_account)
+        self.global_layer = GlobalServiceLayer()
+        self.snapshot_store = snapshot_store
+        self.max_age = max_age
+        self.control = control or ScanControl()
+        self._fleet_slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._account_slots: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _emit(self, event: str, data: dict):
+        if self.event_callback:
+            self.event_callback(event, data)
+
+    def _account_slot(self, account_key: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if account_key not in self._account_slots:
+                self._account_slots[account_key] = threading.BoundedSemaphore(self.max_per_account)
+            return self._account_slots[account_key]
+
+    def _scan_profile(self, profile: str, regions: list[str],
+                      selected_services: list[str] | None) -> InfraGraph:
+        session = self.session_factory(profile)
+        try:
+            ident = session.client("sts", region_name=regions[0]).get_caller_identity()
+            account_id = ident.get("Account", "")
+        except Exception:
+            account_id = ""
+        account_key = account_id or f"profile:{profile}"
+
+        def _callback(event: str, data: dict):
+            self._emit(event, {**data, "profile": profile})
+
+        scanner = MultiRegionScanner(
+            session=session, regions=regions, event_callback=_callback,
+            max_regions=self.max_per_account, global_layer=self.global_layer,
+            account_key=account_key,
+            slots=(self._account_slot(account_key), self._fleet_slots),
+            snapshots=SnapshotPolicy(self.snapshot_store, profile, account_id, self.max_age)
+            if self.snapshot_store else None,
+            control=self.control,
+        )
+        graph = scanner.scan(selected_services=selected_services)
+        graph.profile = profile
+        graph.account_id = account_id
+        return graph
+
+    def scan(self, selected_services: list[str] | None = None) -> dict[str, dict]:
+        """Scan every profile; returns a per-profile summary."""
+        summary: dict[str, dict] = {}
+        total = len(self.profiles)
+
+        # Profile threads mostly wait on slots; the semaphores bound the real work
+        with ThreadPoolExecutor(max_workers=self.max_concurrent,
+                                thread_name_prefix="infra-fleet") as pool:
+            futures = {
+                pool.submit(self._scan_profile, profile, regions, selected_services): profile
+                for profile, regions in self.profiles.items()
+            }
+            for done_idx, fut in enumerate(as_completed(futures)):
+                profile = futures[fut]
+                try:
+                    graph = fut.result()
+                except Exception as e:
+                    error_msg = str(e)[:200]
+                    log.warning("Fleet scan of %s failed: %s", profile, error_msg)
+                    summary[profile] = {"profile": profile, "status": "error", "error": error_msg}
+                else:
+                    if self.on_result:
+                        self.on_result(profile, graph)
+                    summary[profile] = {
+                        "profile": profile, "status": "done",
+                        "account_id": graph.account_id,
+                        "regions": graph.scan_meta.get("regions", []),
+                        "resources": len(graph.resources), "edges": len(graph.edges),
+                        "errors": len(graph.scan_errors),
+                    }
+                self._emit("fleet_scan_account", {
+                    **summary[profile], "index": done_idx, "total": total,
+                })
+
+        return summary
@@ -0,0 +1,127 @@
+"""Background re-scans of configured profiles, so diagrams are ready when opened.
+
+Each schedule names a profile, its regions (empty: the profile's default region),
+optionally the services to scan, and an interval. The scheduler thread wakes
+every ``SCHEDULER_TICK`` seconds and starts the schedules that are due, at most
+``max_concurrent`` at a time across all of them; a due schedule that finds the
+budget spent waits for the next tick. Every run is pushed back by the interval
+with ``jitter`` applied (±10% by default) so schedules sharing an interval drift
+apart instead of hitting the APIs together, and first runs are spread over the
+jitter window after startup.
+
+What a run does is up to ``run_job`` (ApiService._run_scheduled_scan): it scans
+under a child of ``ScanScheduler.control``, so stop() cancels every running scan.
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Callable
+
+from .scan_control import ScanControl
+
+log = logging.getLogger(__name__)
+
+DEFAULT_SCHEDULE_INTERVAL = 3600.0  # seconds
+MIN_SCHEDULE_INTERVAL = 300.0
+SCHEDULE_JITTER = 0.1  # fraction of the interval
+DEFAULT_SCHEDULER_CONCURRENCY = 2  # scheduled scans running at once
+SCHEDULER_TICK = 5.0  # seconds
+
+
+def schedule_key(job: dict) -> tuple:
+    return job["profile"], tuple(job.get("regions") or ()), tuple(sorted(job.get("services") or ()))
+
+
+class ScanScheduler:
+    """Runs ``run_job(job, control)`` for each due schedule listed by ``jobs()``."""
+
+    def __init__(self, run_job: Callable[[dict, ScanControl], None],
+                 jobs: Callable[[], list[dict]],
+                 max_concurrent: int = DEFAULT_SCHEDULER_CONCURRENCY,
+                 jitter: float = SCHEDULE_JITTER, tick: float = SCHEDULER_TICK):
+        self.run_job = run_job
+        self.jobs = jobs
+        self.jitter = jitter
+        self.tick = tick
+        self.control = ScanControl()
+        self._budget = threading.BoundedSemaphore(max(1, max_concurrent))
+        self._due: dict[tuple, float] = {}  # schedule key -> monotonic due time
+        self._running: set[tuple] = set()
+        self._last_run: dict[tuple, float] = {}  # schedule key -> wall-clock finish time
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _interval(self, job: dict) -> float:
+        return max(MIN_SCHEDULE_INTERVAL, job.get("interval") or DEFAULT_SCHEDULE_INTERVAL)
+
+    def _delay(self, job: dict) -> float:
+        interval = self._interval(job)
+        return interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="scan-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop scheduling and cancel the scans still running."""
+        self._stop.set()
+        self.control.cancel("Scan scheduler stopped")
+
+    def _loop(self):
+        while not self._stop.wait(self.tick):
+            try:
+                self._start_due()
+            except Exception as e:
+                log.warning("Scan scheduler tick failed: %s", e)
+
+    def _start_due(self):
+        now = time.monotonic()
+        jobs = {schedule_key(job): job for job in self.jobs()}
+        with self._lock:
+            # Forget schedules that were removed
+            for key in set(self._due) - set(jobs):
+                del self._due[key]
+            for key, job in jobs.items():
+                if key in self._running:
+                    continue
+                due = self._due.setdefault(
+                    key, now + random.uniform(0, self.jitter * self._interval(job)))
+                if due > now:
+                    continue
+                if not self._budget.acquire(blocking=False):
+                    return
+                self._running.add(key)
+                threading.Thread(target=self._run, args=(key, job), daemon=True,
+                                 name=f"scheduled-scan-{job['profile']}").start()
+
+    def _run(self, key: tuple, job: dict):
+        try:
+            self.run_job(job, self.control)
+        except Exception as e:
+            log.warning("Scheduled scan of %s failed: %s", job["profile"], e)
+        finally:
+            with self._lock:
+                self._running.discard(key)
+                self._last_run[key] = time.time()
+                if key in self._due:
+                    self._due[key] = time.monotonic() + self._delay(job)
+            self._budget.release()
+
+    def status(self) -> list[dict]:
+        """Per schedule: running, last finished (epoch seconds) and seconds until due."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "profile": key[0], "regions": list(key[1]), "services": list(key[2]) or None,
+                    "running": key in self._running,
+                    "last_run": self._last_run.get(key),
+                    "next_in": round(max(0.0, due - now), 1),
+                }
+                for key, due in self._due.items()
+            ]
@@ -0,0 +1,122 @@
+"""Persistent infrastructure scan snapshots.
+
+One SQLite row per (profile, account, region, service) holding that scanner's
+fragment graph (resources + unresolved links). Scans read fragments that are
+younger than the TTL and only rerun the scanners whose snapshot is stale.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from .constants import SCAN_DB_FILE
+from .infra_discovery import InfraGraph
+
+log = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_TTL = 900  # seconds
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    profile    TEXT NOT NULL,
+    account_id TEXT NOT NULL,
+    region     TEXT NOT NULL,
+    service    TEXT NOT NULL,
+    scanned_at REAL NOT NULL,
+    payload    TEXT NOT NULL,
+    PRIMARY KEY (profile, account_id, region, service)
+)
+"""
+
+
+class SnapshotStore:
+    """SQLite-backed snapshot store. Safe to share between threads."""
+
+    def __init__(self, path=SCAN_DB_FILE):
+        self.path = path
+        self._init_lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=10)
+        if not self._ready:
+            with self._init_lock:
+                if not self._ready:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute(_SCHEMA)
+                    conn.commit()
+                    self._ready = True
+        return conn
+
+    def get(self, profile: str, account_id: str, region: str, service: str,
+            max_age: float) -> InfraGraph | None:
+        """Return the stored fragment if it is younger than ``max_age`` seconds."""
+        if max_age <= 0:
+            return None
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT scanned_at, payload FROM snapshots "
+                    "WHERE profile=? AND account_id=? AND region=? AND service=?",
+                    (profile, account_id, region, service),
+                ).fetchone()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            log.warning("Snapshot read failed: %s", e)
+            return None
+        if not row or time.time() - row[0] > max_age:
+            return None
+        return InfraGraph.from_dict(json.loads(row[1]))
+
+    def put(self, profile: str, account_id: str, region: str, service: str,
+            fragment: InfraGraph):
+        payload = json.dumps(fragment.to_dict(include_links=True), default=str)
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?, ?)",
+                    (profile, account_id, region, service, time.time(), payload),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            log.warning("Snapshot write failed: %s", e)
+
+    def invalidate(self, profile: str | None = None):
+        try:
+            conn = self._connect()
+            try:
+                if profile is None:
+                    conn.execute("DELETE FROM snapshots")
+                else:
+                    conn.execute("DELETE FROM snapshots WHERE profile=?", (profile,))
+                conn.commit()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            log.warning("Snapshot delete failed: %s", e)
+
+
+@dataclass
+class SnapshotPolicy:
+    """Binds a store to one profile/account and TTL for InfraDiscoveryService."""
+    store: SnapshotStore
+    profile: str
+    account_id: str
+    max_age: float = DEFAULT_SNAPSHOT_TTL
+
+    def get(self, region: str, service: str) -> InfraGraph | None:
+        return self.store.get(self.profile, self.account_id, region, service, self.max_age)
+
+    def put(self, region: str, service: str, fragment: InfraGraph):
+        self.store.put(self.profile, self.account_id, region, service, fragment)
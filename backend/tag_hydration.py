@@ -0,0 +1,174 @@
+"""Bulk tag hydration — fill in tags the per-service scanners do not fetch.
+
+Several scanners (RDS, Lambda, DynamoDB, SQS, ECS, IAM, CloudFront, …) list
+resources with calls that do not return tags, and a per-resource tag call for
+each of them would multiply the scan's API calls. Instead, once the scanners
+have finished, the ARNs of the untagged resources of those types
+(``HYDRATED_TYPES``) are grouped by the region in the ARN and sent to the
+Resource Groups Tagging API ``GetResources`` in batches of 100 (the
+``ResourceARNList`` maximum), several batches at a time. The EC2 and VPC
+scanners read tags themselves and build ARNs without an account ID, which the
+API would reject along with the rest of their batch, so ARNs missing the
+account are skipped unless their service never has one (S3, API Gateway,
+Route53).
+
+Results are cached per ARN for ``TAG_CACHE_TTL`` seconds, including ARNs the
+API did not return (untagged, or of a type it does not cover), so rescans and
+snapshot-served fragments cost no tag calls. A ``Name`` tag also becomes the
+resource's display name when the scanner only had its ID.
+
+Caveats: ARNs without a region (S3, IAM, CloudFront, Route53) are looked up in
+us-east-1, where the API only knows the us-east-1 buckets; and IAM roles are
+returned only where the account's Tagging API supports them.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable
+
+from .rate_limit import call_with_retry
+from .scan_control import ScanCancelled
+
+log = logging.getLogger(__name__)
+
+TAG_BATCH_SIZE = 100  # GetResources ResourceARNList maximum
+DEFAULT_TAG_WORKERS = 4
+TAG_CACHE_TTL = 900.0  # seconds
+GLOBAL_TAG_REGION = "us-east-1"  # for ARNs that carry no region
+
+# Resource types whose scanners list them without their tags
+HYDRATED_TYPES = frozenset({
+    "rds_instance", "rds_cluster", "s3_bucket", "lambda_function", "alb", "nlb",
+    "target_group", "ecs_cluster", "ecs_service", "dynamodb_table", "sqs_queue",
+    "sns_topic", "cloudfront_distribution", "hosted_zone", "api_gateway",
+    "api_gateway_v2", "elasticache_cluster", "iam_role", "kms_key", "log_group",
+    "cloudwatch_alarm",
+})
+# ARN services whose ARNs have an empty account field
+ACCOUNTLESS_ARN_SERVICES = frozenset({"s3", "apigateway", "route53"})
+
+
+class TagCache:
+    """Thread-safe ARN -> tags cache with a fixed time-to-live."""
+
+    def __init__(self, ttl: float = TAG_CACHE_TTL):
+        self.ttl = ttl
+        self._entries: dict[str, tuple[float, dict]] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, arns) -> dict[str, dict]:
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for arn in arns:
+                entry = self._entries.get(arn)
+                if entry is not None and entry[0] > now:
+                    found[arn] = entry[1]
+        return found
+
+    def put_many(self, tags_by_arn: dict[str, dict]):
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            for arn, tags in tags_by_arn.items():
+                self._entries[arn] = (expires, tags)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared by every scan in the process
+tag_cache = TagCache()
+
+
+def arn_region(arn: str) -> str:
+    """The region an ARN lives in, or GLOBAL_TAG_REGION for region-less ARNs.
+
+    "" for malformed ARNs, including those missing an account ID their service
+    requires.
+    """
+    parts = arn.split(":", 5)
+    if len(parts) < 6 or parts[0] != "arn":
+        return ""
+    if not parts[4] and parts[2] not in ACCOUNTLESS_ARN_SERVICES:
+        return ""
+    return parts[3] or GLOBAL_TAG_REGION
+
+
+def _fetch_batch(client, arns: list[str]) -> dict[str, dict]:
+    resp = call_with_retry(client, "get_resources", ResourceARNList=arns)
+    found = {
+        item["ResourceARN"]: {t["Key"]: t["Value"] for t in item.get("Tags", [])}
+        for item in resp.get("ResourceTagMappingList", [])
+    }
+    # Cache misses too, so untagged resources are not asked about again
+    return {arn: found.get(arn, {}) for arn in arns}
+
+
+def hydrate_tags(graph, client_factory: Callable, max_workers: int = DEFAULT_TAG_WORKERS,
+                 cache: TagCache | None = None) -> list[dict]:
+    """Set ``tags`` (and a Name-tag ``name``) on the untagged HYDRATED_TYPES resources of ``graph``.
+
+    ``client_factory(service_name, region_name)`` creates the Tagging API client
+    for each region. Returns scan_errors entries for regions whose lookup failed;
+    ScanCancelled propagates.
+    """
+    cache = tag_cache if cache is None else cache
+    pending: dict[str, list] = defaultdict(list)  # ARN -> resources carrying it
+    for r in graph.resources.values():
+        if r.resource_type in HYDRATED_TYPES and r.arn and not r.tags and arn_region(r.arn):
+            pending[r.arn].append(r)
+    if not pending:
+        return []
+
+    resolved = cache.get_many(pending)
+    by_region: dict[str, list[str]] = defaultdict(list)
+    for arn in pending:
+        if arn not in resolved:
+            by_region[arn_region(arn)].append(arn)
+
+    errors = []
+    if by_region:
+        clients = {region: client_factory("resourcegroupstaggingapi", region)
+                   for region in by_region}
+        batches = [
+            (region, arns[i:i + TAG_BATCH_SIZE])
+            for region, arns in by_region.items()
+            for i in range(0, len(arns), TAG_BATCH_SIZE)
+        ]
+        failed: dict[str, str] = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches))),
+                                thread_name_prefix="tag-hydrate") as pool:
+            # Copy the context so the pool sees the scan's control and metrics scope
+            futures = {
+                pool.submit(contextvars.copy_context().run, _fetch_batch, clients[region], arns): region
+                for region, arns in batches
+            }
+            for fut in as_completed(futures):
+                region = futures[fut]
+                try:
+                    fetched = fut.result()
+                except ScanCancelled:
+                    raise
+                except Exception as e:
+                    failed.setdefault(region, str(e)[:200])
+                    continue
+                cache.put_many(fetched)
+                resolved.update(fetched)
+        for region, error_msg in failed.items():
+            log.warning("Tag lookup in %s failed: %s", region, error_msg)
+            errors.append({"service": "Tags", "region": region, "error": error_msg})
+
+    for arn, tags in resolved.items():
+        if not tags:
+            continue
+        for r in pending[arn]:
+            r.tags = dict(tags)
+            name = tags.get("Name")
+            if name and r.name in ("", r.id):
+                r.name = name
+    return errors
@@ -1,4 +1,4 @@
-import { useCallback } from "react";
+import { useCallback, useEffect, useRef } from "react";
 import {
   ReactFlow,
   Controls,
@@ -9,9 +9,13 @@ import {
   useEdgesState,
   type Node,
   type Edge,
+  type Viewport,
 } from "@xyflow/react";
 import "@xyflow/react/dist/style.css";
 
+import { useStore } from "@/store";
+import type { InfraInventoryMeta } from "@/types";
+
 import { AwsResourceNode } from "./AwsResourceNode";
 import { AwsGroupNode } from "./AwsGroupNode";
 
@@ -36,8 +40,34 @@ interface Props {
 }
 
 export function DiagramCanvas({ initialNodes, initialEdges }: Props) {
-  const [nodes, , onNodesChange] = useNodesState(initialNodes);
-  const [edges, , onEdgesChange] = useEdgesState(initialEdges);
+  const [nodes, setNodes, onNodesChange] = useNodesState(initialNodes);
+  const [edges, setEdges, onEdgesChange] = useEdgesState(initialEdges);
+  const view = useStore((s) => s.infraDiagramView);
+  const queryDiagramViewport = useStore((s) => s.queryDiagramViewport);
+  const wrapperRef = useRef<HTMLDivElement>(null);
+  const inventory = useStore((s) => s.infraGraph?.scan_meta?.inventory) as InfraInventoryMeta | undefined;
+  const expandInfraTypes = useStore((s) => s.expandInfraTypes);
+
+  // Quick-inventory graphs: double-click a resource to scan its service in detail
+  const onNodeDoubleClick = useCallback((_: unknown, node: Node) => {
+    const d = node.data as Record<string, unknown>;
+    if (!inventory || d?.resourceType === "aggregate" || inventory.expanded.includes(d?.service as string)) return;
+    expandInfraTypes([d.resourceType as string]);
+  }, [inventory, expandInfraTypes]);
+
+  // Large diagrams: the store swaps in the nodes of each viewport
+  useEffect(() => {
+    if (!view) return;
+    setNodes(initialNodes);
+    setEdges(initialEdges);
+  }, [view, initialNodes, initialEdges, setNodes, setEdges]);
+
+  const onMoveEnd = useCallback((_: unknown, viewport: Viewport) => {
+    const el = wrapperRef.current;
+    if (!view || !el) return;
+    const { x, y, zoom } = viewport;
+    queryDiagramViewport(-x / zoom, -y / zoom, el.clientWidth / zoom, el.clientHeight / zoom, zoom);
+  }, [view, queryDiagramViewport]);
 
   const miniMapNodeColor = useCallback((node: Node) => {
     const d = node.data as Record<string, unknown>;
@@ -45,12 +75,14 @@ export function DiagramCanvas({ initialNodes, initialEdges }: Props) {
   }, []);
 
   return (
-    <div className="flex-1 w-full h-full relative">
+    <div ref={wrapperRef} className="flex-1 w-full h-full relative">
       <ReactFlow
         nodes={nodes}
         edges={edges}
         onNodesChange={onNodesChange}
         onEdgesChange={onEdgesChange}
+        onNodeDoubleClick={onNodeDoubleClick}
+        onMoveEnd={onMoveEnd}
         nodeTypes={nodeTypes}
         fitView
         fitViewOptions={{ padding: 0.15 }}
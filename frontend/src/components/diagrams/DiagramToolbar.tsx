@@ -1,14 +1,15 @@
 import { useStore } from "@/store";
 import { Button } from "@/components/ui/button";
 import { Tooltip, TooltipContent, TooltipTrigger, TooltipProvider } from "@/components/ui/tooltip";
-import { Download, RefreshCw, Maximize, Sparkles, Cpu, Loader2 } from "lucide-react";
+import { Download, RefreshCw, Maximize, Sparkles, Cpu, Loader2, Zap } from "lucide-react";
 import { useReactFlow } from "@xyflow/react";
 
 interface Props {
   onRescan: () => void;
+  onQuickInventory: () => void;
 }
 
-export function DiagramToolbar({ onRescan }: Props) {
+export function DiagramToolbar({ onRescan, onQuickInventory }: Props) {
   const infraLayoutMode = useStore((s) => s.infraLayoutMode);
   const setInfraLayoutMode = useStore((s) => s.setInfraLayoutMode);
   const exportDrawio = useStore((s) => s.exportDrawio);
@@ -72,6 +73,15 @@ export function DiagramToolbar({ onRescan }: Props) {
           <TooltipContent>Re-scan</TooltipContent>
         </Tooltip>
 
+        <Tooltip>
+          <TooltipTrigger asChild>
+            <Button variant="ghost" size="icon" className="h-7 w-7" onClick={onQuickInventory}>
+              <Zap className="w-3.5 h-3.5 text-[var(--t3)]" />
+            </Button>
+          </TooltipTrigger>
+          <TooltipContent>Quick inventory (double-click a resource for details)</TooltipContent>
+        </Tooltip>
+
         <Tooltip>
           <TooltipTrigger asChild>
             <Button variant="ghost" size="icon" className="h-7 w-7" onClick={() => exportDrawio()}>
@@ -21,6 +21,8 @@ interface Props {
 export function InfraDiagram({ data, onClose }: Props) {
   const profile = (data.profile as string) || undefined;
   const startInfraScan = useStore((s) => s.startInfraScan);
+  const openInfraDiagram = useStore((s) => s.openInfraDiagram);
+  const cancelInfraScan = useStore((s) => s.cancelInfraScan);
   const infraScanning = useStore((s) => s.infraScanning);
   const infraScanProgress = useStore((s) => s.infraScanProgress);
   const infraGraph = useStore((s) => s.infraGraph);
@@ -30,10 +32,26 @@ export function InfraDiagram({ data, onClose }: Props) {
   const infraLayoutMode = useStore((s) => s.infraLayoutMode);
 
   useEffect(() => {
-    startInfraScan(profile);
-  }, [profile, startInfraScan]);
+    openInfraDiagram(profile);
+  }, [profile, openInfraDiagram]);
+
+  // Leaving the page (or closing the dialog) stops the scan instead of letting it run on
+  useEffect(() => {
+    const onPageHide = () => {
+      const { infraScanId, infraScanning } = useStore.getState();
+      if (infraScanId && infraScanning) navigator.sendBeacon(`/api/infra_scans/${infraScanId}/cancel`);
+    };
+    window.addEventListener("pagehide", onPageHide);
+    return () => window.removeEventListener("pagehide", onPageHide);
+  }, []);
+
+  const handleClose = () => {
+    cancelInfraScan();
+    onClose();
+  };
 
   const handleRescan = () => startInfraScan(profile);
+  const handleQuickInventory = () => startInfraScan(profile, undefined, undefined, "inventory");
 
   const resourceCount = infraGraph ? Object.keys(infraGraph.resources).length : 0;
   const visibleNodeCount = infraDiagramNodes.length;
@@ -51,7 +69,7 @@ export function InfraDiagram({ data, onClose }: Props) {
   const annotations = infraLayoutMode === "llm" ? infraLlmResult?.annotations : null;
 
   return (
-    <Dialog open onOpenChange={(open) => !open && onClose()}>
+    <Dialog open onOpenChange={(open) => !open && handleClose()}>
       <DialogContent className="max-w-[95vw] w-[95vw] max-h-[90vh] h-[90vh] flex flex-col p-0 gap-0 overflow-hidden">
         <DialogHeader className="px-4 pt-3 pb-0 shrink-0">
           <DialogTitle className="text-[14px]">
@@ -93,7 +111,7 @@ export function InfraDiagram({ data, onClose }: Props) {
           {/* Diagram */}
           {showDiagram && (
             <ReactFlowProvider>
-              <DiagramToolbar onRescan={handleRescan} />
+              <DiagramToolbar onRescan={handleRescan} onQuickInventory={handleQuickInventory} />
               <div className="flex flex-1 min-h-0">
                 <DiagramCanvas initialNodes={nodes} initialEdges={edges} />
                 {/* LLM annotations sidebar */}
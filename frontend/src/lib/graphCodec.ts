@@ -0,0 +1,38 @@
+import type { DiscoveredResource, InfraGraph, InfraGraphWire, ResourceEdge } from "@/types";
+
+/** Expand the compact scan payload (backend/graph_codec.py) into an InfraGraph. */
+export function decodeGraph(wire: InfraGraphWire): InfraGraph {
+  const { strings } = wire;
+  const ids: string[] = [];
+  const resources: Record<string, DiscoveredResource> = {};
+  for (const [id, arn, type, service, name, region, properties, tags] of wire.resources) {
+    ids.push(id);
+    resources[id] = {
+      id, arn, name,
+      resource_type: strings[type],
+      service: strings[service],
+      region: strings[region],
+      properties: properties || {},
+      tags: tags || {},
+    };
+  }
+  const edges: ResourceEdge[] = [];
+  const flat = wire.edges;
+  for (let i = 0; i < flat.length; i += 4) {
+    edges.push({
+      source_id: ids[flat[i]],
+      target_id: ids[flat[i + 1]],
+      edge_type: strings[flat[i + 2]],
+      label: strings[flat[i + 3]],
+    });
+  }
+  return {
+    resources,
+    edges,
+    scan_errors: wire.scan_errors,
+    scan_meta: wire.scan_meta,
+    profile: wire.profile,
+    region: wire.region,
+    account_id: wire.account_id,
+  };
+}
@@ -1,13 +1,18 @@
 import { create } from "zustand";
 import { get, post } from "@/lib/api";
+import { decodeGraph } from "@/lib/graphCodec";
 import { applyTheme } from "@/lib/theme";
 import type {
   AppState,
   CostData,
   DialogState,
   Identity,
+  InfraDiagramView,
   InfraGraph,
+  InfraGraphWire,
+  InfraScanDelta,
   InfraScanProgress,
+  InfraScanRef,
   LlmConfig,
   LlmLayoutResult,
   LlmProviderConfig,
@@ -42,8 +47,10 @@ interface Store extends AppState {
   infraGraph: InfraGraph | null;
   infraScanProgress: InfraScanProgress[];
   infraScanning: boolean;
+  infraScanId: string | null;
   infraDiagramNodes: unknown[];
   infraDiagramEdges: unknown[];
+  infraDiagramView: InfraDiagramView | null;
   infraLayoutMode: "algorithmic" | "llm";
   infraLlmResult: LlmLayoutResult | null;
   infraLlmLoading: boolean;
@@ -80,10 +87,16 @@ interface Store extends AppState {
   setEncoding: (encoding: string) => Promise<{ ok?: boolean; error?: string }>;
 
   // Infrastructure diagram actions
-  startInfraScan: (profile?: string, region?: string, services?: string[]) => Promise<void>;
+  startInfraScan: (
+    profile?: string, region?: string, services?: string[], mode?: "detailed" | "inventory",
+  ) => Promise<void>;
+  openInfraDiagram: (profile?: string) => Promise<void>;
+  cancelInfraScan: () => Promise<void>;
+  expandInfraTypes: (resourceTypes: string[]) => Promise<void>;
   generateDiagram: (graph?: InfraGraph, llmResult?: LlmLayoutResult | null) => Promise<void>;
+  queryDiagramViewport: (x: number, y: number, width: number, height: number, zoom: number) => Promise<void>;
   requestLlmLayout: () => Promise<void>;
-  exportDrawio: () => Promise<void>;
+  exportDrawio: (compressed?: boolean) => Promise<void>;
   setInfraLayoutMode: (mode: "algorithmic" | "llm") => void;
 
   // AI actions
@@ -108,6 +121,18 @@ interface Store extends AppState {
   handleSSE: (event: string, data: Record<string, unknown>) => void;
 }
 
+// Partial diagrams are re-laid out at most this often while a scan streams deltas
+const DELTA_RENDER_INTERVAL_MS = 750;
+let deltaRenderTimer: ReturnType<typeof setTimeout> | null = null;
+// Scans replaced by a newer one; their late progress/delta events are dropped
+const staleScanIds = new Set<string>();
+
+/** Fetch and decode the stored scan a ref points at. */
+async function fetchScan(ref: InfraScanRef): Promise<InfraGraph> {
+  const wire = await get<InfraGraphWire>(`/infra_scans/${ref.scan_id}`);
+  return { ...decodeGraph(wire), scan_errors: ref.scan_errors };
+}
+
 export const useStore = create<Store>((set, _get) => ({
   // Initial state
   profiles: {},
@@ -143,8 +168,10 @@ export const useStore = create<Store>((set, _get) => ({
   infraGraph: null,
   infraScanProgress: [],
   infraScanning: false,
+  infraScanId: null,
   infraDiagramNodes: [],
   infraDiagramEdges: [],
+  infraDiagramView: null,
   infraLayoutMode: "algorithmic",
   infraLlmResult: null,
   infraLlmLoading: false,
@@ -317,9 +344,48 @@ export const useStore = create<Store>((set, _get) => ({
   },
 
   // Infrastructure diagram actions
-  startInfraScan: async (profile, region, services) => {
-    set({ infraScanning: true, infraScanProgress: [], infraGraph: null, infraDiagramNodes: [], infraDiagramEdges: [] });
-    await post("/infra_scan", { profile: profile || null, region: region || null, services: services || null });
+  startInfraScan: async (profile, region, services, mode) => {
+    const previous = _get().infraScanId;
+    if (previous) staleScanIds.add(previous);
+    set({
+      infraScanning: true, infraScanId: null, infraScanProgress: [], infraGraph: null,
+      infraDiagramNodes: [], infraDiagramEdges: [], infraDiagramView: null,
+    });
+    const result = await post<{ scan_id?: string }>("/infra_scan", {
+      profile: profile || null, region: region || null, services: services || null,
+      mode: mode || "detailed",
+    });
+    set({ infraScanId: result.scan_id || null });
+  },
+
+  openInfraDiagram: async (profile) => {
+    // Show the stored graph (kept fresh by scheduled scans) instead of scanning on open
+    const query = profile ? `?profile=${encodeURIComponent(profile)}` : "";
+    const ref = await get<InfraScanRef & { error?: string }>(`/infra_latest${query}`);
+    if (ref.error || !ref.scan_id) {
+      await _get().startInfraScan(profile);
+      return;
+    }
+    const graph = await fetchScan(ref);
+    set({ infraGraph: graph, infraScanning: false, infraScanId: ref.scan_id, infraScanProgress: [] });
+    _get().generateDiagram(graph);
+  },
+
+  expandInfraTypes: async (resourceTypes) => {
+    const graph = _get().infraGraph;
+    if (!graph) return;
+    // Runs the detailed scanners for these types; the spliced graph arrives as infra_scan_complete
+    const result = await post<{ scan_id?: string }>("/infra_expand", {
+      profile: graph.profile || null, resource_types: resourceTypes,
+    });
+    if (result.scan_id) set({ infraScanId: result.scan_id });
+  },
+
+  cancelInfraScan: async () => {
+    const { infraScanId, infraScanning } = _get();
+    if (!infraScanId || !infraScanning) return;
+    // The partial graph still arrives as infra_scan_complete
+    await post(`/infra_scans/${infraScanId}/cancel`);
   },
 
   generateDiagram: async (graphOverride, llmResultOverride) => {
@@ -327,10 +393,28 @@ export const useStore = create<Store>((set, _get) => ({
     const graph = graphOverride || store.infraGraph;
     if (!graph) return;
     const llmResult = llmResultOverride !== undefined ? llmResultOverride : store.infraLlmResult;
-    const result = await post<{ nodes?: unknown[]; edges?: unknown[] }>("/infra_diagram", {
-      graph, layout_mode: store.infraLayoutMode, format: "reactflow",
-      llm_result: store.infraLayoutMode === "llm" ? llmResult : null,
+    const result = await post<{ nodes?: unknown[]; edges?: unknown[]; view?: InfraDiagramView }>(
+      "/infra_diagram", {
+        graph, layout_mode: store.infraLayoutMode, format: "reactflow",
+        llm_result: store.infraLayoutMode === "llm" ? llmResult : null, lod: true,
+      });
+    set({
+      infraDiagramNodes: result.nodes || [], infraDiagramEdges: result.edges || [],
+      infraDiagramView: result.view || null,
     });
+  },
+
+  queryDiagramViewport: async (x, y, width, height, zoom) => {
+    const view = _get().infraDiagramView;
+    if (!view) return;
+    const result = await post<{ nodes?: unknown[]; edges?: unknown[]; error?: string }>(
+      "/infra_diagram/viewport", { key: view.key, x, y, width, height, zoom });
+    if (_get().infraDiagramView?.key !== view.key) return;  // diagram replaced meanwhile
+    if (result.error) {
+      // The server dropped this view: lay the diagram out again
+      _get().generateDiagram();
+      return;
+    }
     set({ infraDiagramNodes: result.nodes || [], infraDiagramEdges: result.edges || [] });
   },
 
@@ -341,21 +425,23 @@ export const useStore = create<Store>((set, _get) => ({
     await post("/infra_llm_layout", { graph: store.infraGraph });
   },
 
-  exportDrawio: async () => {
+  exportDrawio: async (compressed = false) => {
     const store = _get();
     if (!store.infraGraph) return;
-    const result = await post<{ xml?: string }>("/infra_diagram", {
-      graph: store.infraGraph, layout_mode: "algorithmic", format: "drawio",
+    // Streamed by the server; the browser assembles the file
+    const res = await fetch("/api/infra_diagram/drawio", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ graph: store.infraGraph, compressed }),
     });
-    if (result.xml) {
-      const blob = new Blob([result.xml], { type: "application/xml" });
-      const url = URL.createObjectURL(blob);
-      const a = document.createElement("a");
-      a.href = url;
-      a.download = `aws-architecture-${store.infraGraph.profile || "diagram"}.drawio`;
-      a.click();
-      URL.revokeObjectURL(url);
-    }
+    if (!res.ok) return;
+    const blob = await res.blob();
+    const url = URL.createObjectURL(blob);
+    const a = document.createElement("a");
+    a.href = url;
+    a.download = `aws-architecture-${store.infraGraph.profile || "diagram"}.drawio`;
+    a.click();
+    URL.revokeObjectURL(url);
   },
 
   setInfraLayoutMode: (mode) => {
@@ -434,6 +520,7 @@ export const useStore = create<Store>((set, _get) => ({
 
   // SSE event handlers
   handleSSE: (event, data) => {
+    if (typeof data.scan_id === "string" && staleScanIds.has(data.scan_id)) return;
     switch (event) {
       case "term":
         if ((data as { type: string }).type === "output") {
@@ -501,12 +588,55 @@ export const useStore = create<Store>((set, _get) => ({
         }));
         break;
       }
+      case "infra_scan_delta": {
+        const delta = data as unknown as InfraScanDelta;
+        if (!_get().infraScanning) break;
+        set((s) => {
+          const prev = s.infraGraph || {
+            resources: {}, edges: [], scan_errors: [], profile: "", region: delta.region, account_id: "",
+          };
+          return {
+            infraGraph: {
+              ...prev,
+              resources: { ...prev.resources, ...delta.resources },
+              edges: [...prev.edges, ...delta.edges],
+            },
+          };
+        });
+        if (!deltaRenderTimer) {
+          deltaRenderTimer = setTimeout(() => {
+            deltaRenderTimer = null;
+            const store = _get();
+            if (store.infraScanning) store.generateDiagram();
+          }, DELTA_RENDER_INTERVAL_MS);
+        }
+        break;
+      }
       case "infra_scan_complete": {
-        const graph = data as unknown as InfraGraph;
-        set({ infraGraph: graph, infraScanning: false });
-        // Auto-generate diagram
-        const store = _get();
-        store.generateDiagram(graph);
+        const ref = data as unknown as InfraScanRef & Partial<InfraGraph>;
+        const finish = (graph: InfraGraph) => {
+          set({ infraGraph: graph, infraScanning: false });
+          // Auto-generate diagram
+          _get().generateDiagram(graph);
+        };
+        if (!ref.scan_id) {
+          // Failed scans carry their (empty) graph inline
+          finish(ref as InfraGraph);
+          break;
+        }
+        fetchScan(ref).then(finish).catch(() => set({ infraScanning: false }));
+        break;
+      }
+      case "infra_graph_changed": {
+        // A scheduled scan found changes; refresh an open, idle diagram of that profile
+        const ref = data as unknown as InfraScanRef;
+        const { infraGraph, infraScanning } = _get();
+        if (infraScanning || !infraGraph || infraGraph.profile !== ref.profile) break;
+        fetchScan(ref).then((graph) => {
+          if (_get().infraScanning) return;
+          set({ infraGraph: graph, infraScanId: ref.scan_id });
+          _get().generateDiagram(graph);
+        }).catch(() => {});
         break;
       }
       case "infra_llm_layout_done": {
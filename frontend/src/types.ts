@@ -129,18 +129,73 @@ export interface ResourceEdge {
 export interface InfraGraph {
   resources: Record<string, DiscoveredResource>;
   edges: ResourceEdge[];
-  scan_errors: Array<{ service: string; error: string }>;
+  scan_errors: Array<{
+    service: string; error: string; region?: string; resource_type?: string; truncated?: boolean;
+    timeout?: boolean; cancelled?: boolean;
+  }>;
+  scan_meta?: Record<string, unknown>;
   profile: string;
   region: string;
   account_id: string;
 }
 
+/** infra_scan_complete event: the graph itself is fetched from /api/infra_scans/{scan_id}. */
+export interface InfraScanRef {
+  scan_id: string;
+  profile: string;
+  region: string;
+  account_id: string;
+  resource_count: number;
+  edge_count: number;
+  scan_errors: InfraGraph["scan_errors"];
+  scan_meta?: Record<string, unknown>;
+}
+
+/** Wire format served by /api/infra_scans/{scan_id} (see backend/graph_codec.py). */
+export interface InfraGraphWire {
+  v: number;
+  strings: string[];
+  resources: Array<[
+    string, string, number, number, string, number,
+    Record<string, unknown> | null, Record<string, string> | null,
+  ]>;
+  edges: number[];
+  scan_errors: InfraGraph["scan_errors"];
+  scan_meta?: Record<string, unknown>;
+  profile: string;
+  region: string;
+  account_id: string;
+}
+
+/** Large diagrams are served as an overview plus viewport queries (backend/diagram_viewport.py). */
+export interface InfraDiagramView {
+  key: string;
+  bounds: [number, number, number, number];  // x0, y0, x1, y1 in layout coordinates
+  total_nodes: number;
+  total_edges: number;
+  detail_zoom: number;  // below this zoom, leaves come back as aggregates
+}
+
+/** scan_meta.inventory of a quick-inventory graph. */
+export interface InfraInventoryMeta {
+  source: "tagging" | "config";
+  expanded: string[];  // services already scanned in detail
+}
+
+export interface InfraScanDelta {
+  resources: Record<string, DiscoveredResource>;
+  edges: ResourceEdge[];
+  service?: string;
+  region: string;
+}
+
 export interface InfraScanProgress {
   service: string;
   index: number;
   total: number;
   status: "scanning" | "done" | "error";
   error?: string;
+  scan_id?: string;
 }
 
 export interface LlmLayoutResult {